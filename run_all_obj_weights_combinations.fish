@@ -1,12 +1,9 @@
 #!/usr/bin/env fish
 
-set obj_weights_types min_econ min_tech min_soc econ_tech econ_soc tech_soc balanced
+# Each model is built once and re-solved for every objective weight type in obj_weights_map
+echo "=================================================="
+echo "Running all objective weight types"
+echo "=================================================="
 
-for obj in $obj_weights_types
-    echo "=================================================="
-    echo "Running objective weight type: $obj"
-    echo "=================================================="
-
-    env OBJ_WEIGHTS_TYPE=$obj python -m src.experiments.run_models
-    or exit 1
-end
\ No newline at end of file
+python -m src.experiments.run_obj_weights_sweep
+or exit 1
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pickle
 import os
+import numpy as np
 from collections import defaultdict
 from dataclasses import dataclass
 from copy import deepcopy
@@ -15,6 +16,9 @@ class EVData:
     soc_critical_dict: dict
     soc_max_dict: dict
     at_home_status_dict: dict
+    at_home: np.ndarray  # (EV, TIME) at home status, rows follow ev_position and columns follow time_position
+    ev_position: dict  # {ev_id: row in at_home}
+    time_position: dict  # {timestamp: column in at_home}
     t_arr_dict: dict
     t_dep_dict: dict
     travel_energy_dict: dict
@@ -23,25 +27,42 @@ class EVData:
 
 
 
-def load_ev_data() -> EVData:
-    # Load EV data
+def get_ev_instances_path() -> str:
     folder_path = (f'data/inputs/ev_data/EV_instances_100_avgdist{params.avg_travel_distance}km'
                    f'_min{params.min_initial_soc}_max{params.max_initial_soc}'
                    f'_cap{params.ev_capacity_range_low}_{params.ev_capacity_range_high}')
 
-    filename = os.path.join(params.project_root, folder_path)
-    with open(filename, 'rb') as f:
-        ev_instance_list = pickle.load(f)
+    return os.path.join(params.project_root, folder_path)
+
+
+def load_ev_instance_pool() -> list:
+    # Load all EV instances
+    with open(get_ev_instances_path(), 'rb') as f:
+        return pickle.load(f)
 
+
+def load_ev_data() -> EVData:
     # Slice data
-    ev_instance_list = deepcopy(ev_instance_list[:params.num_of_evs]
-)
+    ev_instance_list = deepcopy(load_ev_instance_pool()[:params.num_of_evs])
+
+    return build_ev_data(ev_instance_list, get_ev_instances_path())
+
+
+def build_ev_data(ev_instance_list: list, filename: str) -> EVData:
     # Initialise data
     soc_init_dict = {ev.ev_id: ev.soc_init for ev in ev_instance_list}
     soc_critical_dict = {ev.ev_id: ev.soc_critical for ev in ev_instance_list}
     soc_max_dict = {ev.ev_id: ev.soc_max for ev in ev_instance_list}
 
     at_home_status_dict = {ev.ev_id: ev.at_home_status for ev in ev_instance_list}
+
+    # At home status matrix, built once so models and simulators avoid per-cell DataFrame lookups
+    ev_position = {ev.ev_id: n for n, ev in enumerate(ev_instance_list)}
+    time_position = {t: k for k, t in enumerate(params.timestamps)}
+    at_home = np.vstack([
+        ev.at_home_status.iloc[:, 0].reindex(params.timestamps, fill_value=0).to_numpy(dtype=int)
+        for ev in ev_instance_list
+    ])
     t_arr_dict = {ev.ev_id: ev.t_arr for ev in ev_instance_list}
     t_dep_dict = {ev.ev_id: ev.t_dep for ev in ev_instance_list}
     travel_energy_dict = {ev.ev_id: ev.travel_energy for ev in ev_instance_list}
@@ -62,6 +83,9 @@ def load_ev_data() -> EVData:
         soc_critical_dict=soc_critical_dict,
         soc_max_dict=soc_max_dict,
         at_home_status_dict=at_home_status_dict,
+        at_home=at_home,
+        ev_position=ev_position,
+        time_position=time_position,
         t_arr_dict=t_arr_dict,
         t_dep_dict=t_dep_dict,
         travel_energy_dict=travel_energy_dict,
@@ -20,6 +20,8 @@ metrics_folder_path = os.path.join(project_root, 'data/outputs/metrics/')
 compiled_metrics_folder_path = os.path.join(project_root, 'data/outputs/metrics/compiled_metrics/')
 sensitivity_analysis_res_path = os.path.join(project_root, 'data/outputs/metrics/sensitivity_analysis/')
 plots_folder_path = os.path.join(project_root, 'data/outputs/plots/')
+model_cache_folder_path = os.path.join(project_root, 'data/outputs/model_cache/')
+model_cache_max_size_gb = 5  # least recently used models are evicted above this size
 
 # --------------------------
 # Filename formats
@@ -61,6 +63,13 @@ length_D_w = 7
 # Define a subset of T for week w
 T_w = tmp.groupby('week').apply(lambda x: x.index.tolist()).to_dict()
 
+# Number of time_resolution periods in each time slot, only more than one on a multi-resolution time grid
+slot_duration = {t: 1 for t in timestamps}
+
+# Multi-resolution time grid settings
+fine_resolution_windows = [('17:00', '21:00')]  # evening peak, time slots keep time_resolution
+coarse_time_resolution = 60  # minutes, longest time slot outside the fine resolution windows
+
 
 num_of_evs = 10
 num_of_households = 10
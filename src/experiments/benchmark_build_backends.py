@@ -0,0 +1,79 @@
+import time
+import pandas as pd
+from contextlib import contextmanager
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.utils.configs import BuildBackend
+from src.models.utils.mapping import config_map, strategy_map
+
+
+FLEET_SIZES = [10, 25, 50, 100]
+
+
+@contextmanager
+def temporary_fleet_size(num_of_evs: int):
+    original_values = {
+        'num_of_evs': params.num_of_evs,
+        'num_cp_max': params.num_cp_max,
+    }
+
+    params.num_of_evs = num_of_evs
+    params.num_cp_max = num_of_evs - 1
+
+    try:
+        yield
+    finally:
+        params.num_of_evs = original_values['num_of_evs']
+        params.num_cp_max = original_values['num_cp_max']
+
+
+def time_build(config: str, strategy: str, backend: BuildBackend, ev_data) -> float:
+    start_time = time.time()
+
+    BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        version='benchmark',
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data,
+        backend=backend
+    )
+
+    return time.time() - start_time
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    configurations = ['config_1', 'config_2', 'config_3']
+    strategies = ['opportunistic', 'flexible']
+
+    rows = []
+    for num_of_evs in FLEET_SIZES:
+        with temporary_fleet_size(num_of_evs):
+            ev_data = load_ev_data()
+
+            for config in configurations:
+                for strategy in strategies:
+                    row = {'num_of_evs': num_of_evs, 'config': config, 'strategy': strategy}
+
+                    for backend in BuildBackend:
+                        row[f'{backend.value}_build_time'] = time_build(config, strategy, backend, ev_data)
+
+                    row['speedup'] = row['rules_build_time'] / row['array_build_time']
+                    rows.append(row)
+
+                    print(f'{num_of_evs} EVs {config} {strategy}: '
+                          f'rules {row["rules_build_time"]:.2f}s, array {row["array_build_time"]:.2f}s, '
+                          f'speedup {row["speedup"]:.2f}x')
+
+    df = pd.DataFrame(rows)
+    print(f'\nBuild time scaling ({params.num_of_days} days)\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
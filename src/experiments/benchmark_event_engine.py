@@ -0,0 +1,89 @@
+import time
+import numpy as np
+import pandas as pd
+from copy import deepcopy
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.simulation_models.config_2 import UncoordinatedModelConfig2
+from src.models.simulation_models.config_3 import UncoordinatedModelConfig3
+
+
+FLEET_SIZES = [10, 50, 100]
+P_CP_RATED = 7.2  # (kW)
+EVS_PER_CP = 4
+
+
+def run_simulation(simulator_class, ev_data, event_driven: bool, **config_attributes) -> tuple:
+    ev_instances = deepcopy(ev_data.ev_instance_list)
+
+    start_time = time.time()
+    simulated = simulator_class(
+        ev_data=ev_instances,
+        household_load=params.household_load,
+        p_cp_rated_scaled=P_CP_RATED / params.charging_power_resolution_factor,
+        at_home=ev_data.at_home,
+        time_position=ev_data.time_position,
+        event_driven=event_driven,
+        **config_attributes
+    ).simulate()
+    run_time = time.time() - start_time
+
+    p_ev = np.vstack([ev.charging_power['charging_power'].to_numpy() for ev in simulated])
+    soc_ev = np.vstack([ev.soc['soc'].to_numpy() for ev in simulated])
+
+    return p_ev, soc_ev, run_time
+
+
+def main():
+    """
+    Compares the run time of the time step and event driven config 2 and config 3 uncoordinated simulators, and
+    checks that their charging power and soc are identical.
+    """
+    pd.options.display.max_columns = None
+
+    original_num_of_evs = params.num_of_evs
+
+    rows = []
+    try:
+        for num_of_evs in FLEET_SIZES:
+            params.num_of_evs = num_of_evs
+            ev_data = load_ev_data()
+
+            num_cp = max(1, num_of_evs // EVS_PER_CP)
+            ev_to_cp_assignment = {cp: [i for i in range(num_of_evs) if i % num_cp == cp] for cp in range(num_cp)}
+
+            simulators = {
+                'config_2': (UncoordinatedModelConfig2, {'num_cp': num_cp}),
+                'config_3': (UncoordinatedModelConfig3, {'ev_to_cp_assignment': ev_to_cp_assignment}),
+            }
+
+            for config, (simulator_class, config_attributes) in simulators.items():
+                p_ev, soc_ev, time_steps_time = run_simulation(simulator_class, ev_data, False, **config_attributes)
+                event_p_ev, event_soc_ev, event_driven_time = run_simulation(
+                    simulator_class, ev_data, True, **config_attributes
+                )
+
+                row = {
+                    'config': config,
+                    'num_of_evs': num_of_evs,
+                    'num_cp': num_cp,
+                    'time_steps_time': time_steps_time,
+                    'event_driven_time': event_driven_time,
+                    'identical': p_ev.tobytes() == event_p_ev.tobytes() and soc_ev.tobytes() == event_soc_ev.tobytes(),
+                }
+                rows.append(row)
+                print(f'{config} {num_of_evs} EVs: time steps {time_steps_time:.3f}s, '
+                      f'event driven {event_driven_time:.3f}s, identical: {row["identical"]}')
+
+    finally:
+        params.num_of_evs = original_num_of_evs
+
+    df = pd.DataFrame(rows)
+    df['speedup'] = df['time_steps_time'] / df['event_driven_time']
+    print(f'\nUncoordinated simulation run time\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
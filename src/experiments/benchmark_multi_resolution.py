@@ -0,0 +1,138 @@
+import os
+import time
+import pandas as pd
+
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.run_optimisation import run_optimisation_model
+from src.models.optimisation_models.time_grid import run_multi_resolution_model
+from src.models.results.model_results import EvaluationMetrics
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    obj_weights_type,
+    version,
+    configurations,
+    charging_strategies
+)
+
+
+COARSE_TIME_RESOLUTIONS = [30, 60, 120]  # minutes
+
+# Objective components and evaluation metrics compared with the uniform time grid
+COMPARED_VALUES = [
+    'economic_objective',
+    'technical_objective',
+    'social_objective',
+    'total_objective_value',
+    'p_cp_rated',
+    'num_cp',
+    'papr',
+    'avg_soc_t_dep_percent',
+    'lowest_soc',
+]
+
+
+def get_compared_values(results) -> dict:
+    metrics = EvaluationMetrics(results, results.ev_data).metrics
+    values = {**results.objective_components, **metrics}
+
+    return {name: values[name] for name in COMPARED_VALUES}
+
+
+def main():
+    """
+    Solves each model on the uniform time grid and on multi-resolution time grids, and compares the size of the TIME
+    set, the solve time, and the objective components and evaluation metrics of the expanded solutions.
+    """
+    pd.options.display.max_columns = None
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nBenchmarking Multi-Resolution Time Grids:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nFine resolution windows: {params.fine_resolution_windows}, coarse resolutions: {COARSE_TIME_RESOLUTIONS}",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+            solver_options = {'verbose': verbose, 'time_limit': time_limit, 'mip_gap': mip_gap, 'thread_count': thread_count}
+
+            start_time = time.time()
+            uniform_results = run_optimisation_model(
+                config=config,
+                charging_strategy=strategy,
+                version=f'{version}_uniform_grid',
+                obj_weights=obj_weights_dict[obj_weights_type],
+                ev_data=ev_data,
+                save_model=False,
+                **solver_options
+            )
+            uniform_time = time.time() - start_time
+
+            if uniform_results is None:
+                continue
+
+            uniform_values = get_compared_values(uniform_results)
+            rows.append({
+                'config': config,
+                'strategy': strategy,
+                'coarse_time_resolution': params.time_resolution,
+                'num_time_slots': len(params.timestamps),
+                'run_time': uniform_time,
+                **uniform_values,
+            })
+
+            for coarse_time_resolution in COARSE_TIME_RESOLUTIONS:
+                start_time = time.time()
+                results, _ = run_multi_resolution_model(
+                    config=config,
+                    charging_strategy=strategy,
+                    version=f'{version}_{coarse_time_resolution}min_grid',
+                    obj_weights=obj_weights_dict[obj_weights_type],
+                    ev_data=ev_data,
+                    coarse_time_resolution=coarse_time_resolution,
+                    save_model=False,
+                    **solver_options
+                )
+                run_time = time.time() - start_time
+
+                if results is None:
+                    continue
+
+                values = get_compared_values(results)
+                rows.append({
+                    'config': config,
+                    'strategy': strategy,
+                    'coarse_time_resolution': coarse_time_resolution,
+                    'num_time_slots': results.time_grid_timings['num_time_slots'],
+                    'run_time': run_time,
+                    **values,
+                    **{
+                        f'{name}_error_%': (values[name] - uniform_values[name]) / abs(uniform_values[name]) * 100
+                        for name in COMPARED_VALUES if uniform_values[name]
+                    },
+                })
+
+            print(f'\n{config} {strategy}\n{pd.DataFrame(rows[-len(COARSE_TIME_RESOLUTIONS) - 1:])}')
+
+    df = pd.DataFrame(rows)
+    print(f'\nMulti-resolution time grids against the uniform time grid\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import os
+import time
+import pandas as pd
+
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.run_optimisation import run_optimisation_model
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    obj_weights_type,
+    version,
+    configurations,
+    charging_strategies
+)
+
+
+def main():
+    """
+    Builds and solves each model with and without the presolve pass, and compares the end-to-end run time, the number
+    of rows and columns passed to the solver and the objective value.
+    """
+    pd.options.display.max_columns = None
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nBenchmarking Presolve:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+
+            for presolve in [False, True]:
+                start_time = time.time()
+                results = run_optimisation_model(
+                    config=config,
+                    charging_strategy=strategy,
+                    version=f'{version}_presolve' if presolve else version,
+                    obj_weights=obj_weights_dict[obj_weights_type],
+                    ev_data=ev_data,
+                    verbose=verbose,
+                    time_limit=time_limit,
+                    mip_gap=mip_gap,
+                    thread_count=thread_count,
+                    save_model=False,
+                    presolve=presolve
+                )
+                run_time = time.time() - start_time
+
+                if results is None:
+                    continue
+
+                report = results.presolve_report or {}
+                rows.append({
+                    'config': config,
+                    'strategy': strategy,
+                    'presolve': presolve,
+                    'run_time': run_time,
+                    'rows': report.get('rows_after'),
+                    'rows_removed': report.get('rows_before', 0) - report.get('rows_after', 0),
+                    'columns': report.get('columns_after'),
+                    'columns_removed': report.get('columns_before', 0) - report.get('columns_after', 0),
+                    'total_objective_value': results.objective_components['total_objective_value'],
+                    'mip_gap': results.mip_gap,
+                })
+
+    df = pd.DataFrame(rows)
+    print(f'\nEnd-to-end run time with and without presolve\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import time
+import pandas as pd
+
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.run_optimisation import run_optimisation_model
+from src.models.optimisation_models.representative_days import (
+    run_representative_days_model,
+    compare_with_full_horizon
+)
+from src.models.results.model_results import EvaluationMetrics
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    obj_weights_type,
+    version,
+    configurations,
+    charging_strategies
+)
+
+
+NUM_REPRESENTATIVE_DAYS = [2, 4, 7]
+
+
+def main():
+    """
+    Solves each model over the full horizon in params and over representative days, and compares the objective
+    components and investment of the expanded solutions with the full horizon solution.
+    """
+    pd.options.display.max_columns = None
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nBenchmarking Representative Days Models:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nHorizon: {params.num_of_days} days, {NUM_REPRESENTATIVE_DAYS} representative days",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+            solver_options = {'verbose': verbose, 'time_limit': time_limit, 'mip_gap': mip_gap, 'thread_count': thread_count}
+
+            start_time = time.time()
+            full_results = run_optimisation_model(
+                config=config,
+                charging_strategy=strategy,
+                version=f'{version}_full_horizon',
+                obj_weights=obj_weights_dict[obj_weights_type],
+                ev_data=ev_data,
+                save_model=False,
+                **solver_options
+            )
+            full_time = time.time() - start_time
+
+            for num_representative_days in NUM_REPRESENTATIVE_DAYS:
+                start_time = time.time()
+                results, _ = run_representative_days_model(
+                    config=config,
+                    charging_strategy=strategy,
+                    version=f'{version}_{num_representative_days}repdays',
+                    obj_weights=obj_weights_dict[obj_weights_type],
+                    ev_data=ev_data,
+                    num_representative_days=num_representative_days,
+                    save_model=False,
+                    **solver_options
+                )
+                representative_time = time.time() - start_time
+
+                if results is None or full_results is None:
+                    continue
+
+                EvaluationMetrics(results, results.ev_data).pprint_metrics()
+
+                comparison = compare_with_full_horizon(results, full_results)
+                print(f'\n{config} {strategy}, {num_representative_days} representative days\n{comparison}')
+
+                rows.append({
+                    'config': config,
+                    'strategy': strategy,
+                    'num_representative_days': num_representative_days,
+                    'full_horizon_time': full_time,
+                    'representative_days_time': representative_time,
+                    **{f'{name}_error_%': error for name, error in comparison['error_%'].items()},
+                })
+
+    df = pd.DataFrame(rows)
+    print(f'\nError of the expanded representative days solutions against the full horizon solution\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import time
+import numpy as np
+import pandas as pd
+from copy import deepcopy
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.simulation_models.config_1 import UncoordinatedModelConfig1
+
+
+FLEET_SIZES = [10, 100, 1000, 10000]
+REFERENCE_MAX_EVS = 1000  # the per EV loop takes minutes beyond this
+P_CP_RATED = 7.2  # (kW)
+
+
+def get_fleet(ev_data, num_of_evs: int) -> tuple[list, np.ndarray]:
+    """ Repeats the loaded EV instances up to num_of_evs EVs, with the at home matrix rows repeated alike. """
+    num_loaded = len(ev_data.ev_instance_list)
+    rows = [n % num_loaded for n in range(num_of_evs)]
+
+    ev_instances = []
+    for ev_id, n in enumerate(rows):
+        ev = deepcopy(ev_data.ev_instance_list[n])
+        ev.ev_id = ev_id
+        ev_instances.append(ev)
+
+    return ev_instances, ev_data.at_home[rows]
+
+
+def run_simulation(ev_instances: list, at_home: np.ndarray, ev_data, vectorised: bool) -> tuple:
+    ev_instances = deepcopy(ev_instances)
+    num_ev_at_home_df = pd.DataFrame(
+        {'num_ev_at_home': at_home.sum(axis=0)},
+        index=pd.Index(params.timestamps, name='timestamp')
+    )
+
+    start_time = time.time()
+    simulated = UncoordinatedModelConfig1(
+        ev_data=ev_instances,
+        household_load=params.household_load,
+        num_ev_at_home=num_ev_at_home_df,
+        p_cp_rated_scaled=P_CP_RATED / params.charging_power_resolution_factor,
+        at_home=at_home,
+        time_position=ev_data.time_position,
+        vectorised=vectorised
+    ).simulate()
+    run_time = time.time() - start_time
+
+    p_ev = np.vstack([ev.charging_power['charging_power'].to_numpy() for ev in simulated])
+    soc_ev = np.vstack([ev.soc['soc'].to_numpy() for ev in simulated])
+
+    return p_ev, soc_ev, run_time
+
+
+def main():
+    """ Compares the run time of the config_1 uncoordinated simulator per EV loop and NumPy kernel. """
+    pd.options.display.max_columns = None
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for num_of_evs in FLEET_SIZES:
+        ev_instances, at_home = get_fleet(ev_data, num_of_evs)
+        p_ev, soc_ev, vectorised_time = run_simulation(ev_instances, at_home, ev_data, vectorised=True)
+
+        row = {'num_of_evs': num_of_evs, 'vectorised_time': vectorised_time, 'loop_time': None, 'bit_identical': None}
+
+        if num_of_evs <= REFERENCE_MAX_EVS:
+            loop_p_ev, loop_soc_ev, row['loop_time'] = run_simulation(ev_instances, at_home, ev_data, vectorised=False)
+            row['bit_identical'] = (
+                    p_ev.tobytes() == loop_p_ev.tobytes() and
+                    soc_ev.tobytes() == loop_soc_ev.tobytes()
+            )
+
+        rows.append(row)
+        loop_time = 'skipped' if row['loop_time'] is None else f'{row["loop_time"]:.3f}s'
+        print(f'{num_of_evs} EVs: vectorised {vectorised_time:.3f}s, loop {loop_time}, '
+              f'bit-identical: {row["bit_identical"]}')
+
+    df = pd.DataFrame(rows)
+    df['speedup'] = df['loop_time'] / df['vectorised_time']
+    print(f'\nConfig 1 uncoordinated simulation run time\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
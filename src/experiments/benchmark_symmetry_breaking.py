@@ -0,0 +1,71 @@
+import time
+import pandas as pd
+import pyomo.environ as pyo
+from src.config.ev_params import load_ev_data
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import solve_model
+from src.models.utils.mapping import config_map, strategy_map
+
+
+MIP_GAP = 5  # (%)
+TIME_LIMIT = 60  # (minutes)
+THREAD_COUNT = 16
+
+
+def time_to_mip_gap(config: str, strategy: str, symmetry_breaking: bool, ev_data) -> dict:
+    model = BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        version=f'symmetry_breaking_{symmetry_breaking}',
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data,
+        symmetry_breaking=symmetry_breaking
+    ).get_optimisation_model()
+
+    start_time = time.time()
+
+    _, calc_mip_gap, solver_status, termination_condition = solve_model(
+        model,
+        version=f'symmetry_breaking_{symmetry_breaking}',
+        time_limit=TIME_LIMIT,
+        mip_gap=MIP_GAP,
+        thread_count=THREAD_COUNT
+    )
+
+    return {
+        'solve_time': time.time() - start_time,
+        'mip_gap': calc_mip_gap,
+        'objective': pyo.value(model.obj_function),
+        'termination_condition': str(termination_condition),
+    }
+
+
+def main():
+    """ Compares the time to reach MIP_GAP with and without symmetry breaking for configs with interchangeable CPs. """
+    pd.options.display.max_columns = None
+
+    configurations = ['config_2', 'config_3']
+    strategies = ['opportunistic', 'flexible']
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config in configurations:
+        for strategy in strategies:
+            for symmetry_breaking in [False, True]:
+                row = {'config': config, 'strategy': strategy, 'symmetry_breaking': symmetry_breaking}
+                row.update(time_to_mip_gap(config, strategy, symmetry_breaking, ev_data))
+                rows.append(row)
+
+                print(f'{config} {strategy} (symmetry breaking: {symmetry_breaking}): '
+                      f'{row["solve_time"]:.2f}s, MIP gap {row["mip_gap"]}, {row["termination_condition"]}')
+
+    df = pd.DataFrame(rows)
+    print(f'\nTime to {MIP_GAP}% MIP gap (time limit {TIME_LIMIT} minutes)\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
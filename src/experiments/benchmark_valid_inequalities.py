@@ -0,0 +1,88 @@
+import pandas as pd
+import pyomo.environ as pyo
+from src.config.ev_params import load_ev_data
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import (
+    solve_model,
+    create_persistent_solver,
+    solve_persistent_model
+)
+from src.models.utils.mapping import config_map, strategy_map
+
+
+MIP_GAP = 1  # (%)
+TIME_LIMIT = 30  # (minutes)
+THREAD_COUNT = 16
+
+MODELS = [
+    ('config_1', 'flexible'),
+    ('config_2', 'opportunistic'),
+    ('config_2', 'flexible'),
+    ('config_3', 'opportunistic'),
+    ('config_3', 'flexible'),
+]
+
+
+def get_lp_bound(model: pyo.ConcreteModel, version: str) -> float:
+    pyo.TransformationFactory('core.relax_integer_vars').apply_to(model)
+    solve_model(model, version=f'{version}_lp', thread_count=THREAD_COUNT)
+    lp_bound = pyo.value(model.obj_function)
+    pyo.TransformationFactory('core.relax_integer_vars').apply_to(model, undo=True)
+
+    return lp_bound
+
+
+def solve_with_cuts(config: str, strategy: str, valid_inequalities: bool, ev_data) -> dict:
+    version = f'valid_inequalities_{valid_inequalities}'
+    model_builder = BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        version=version,
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data,
+        valid_inequalities=valid_inequalities
+    )
+    model = model_builder.get_optimisation_model()
+
+    lp_bound = get_lp_bound(model, version)
+
+    solver = create_persistent_solver(model, time_limit=TIME_LIMIT, mip_gap=MIP_GAP, thread_count=THREAD_COUNT)
+    _, calc_mip_gap, _, termination_condition = solve_persistent_model(solver, model, version=version)
+
+    return {
+        **(model_builder.valid_inequalities_summary or {}),
+        'lp_bound': lp_bound,
+        'objective': pyo.value(model.obj_function),
+        'mip_bound': solver.get_model_attr('ObjBound'),
+        'node_count': solver.get_model_attr('NodeCount'),
+        'solve_time': solver.get_model_attr('Runtime'),
+        'mip_gap': calc_mip_gap,
+        'termination_condition': str(termination_condition),
+    }
+
+
+def main():
+    """ Compares the LP relaxation bound and the B&B nodes to MIP_GAP with and without the dwell window cuts. """
+    pd.options.display.max_columns = None
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config, strategy in MODELS:
+        for valid_inequalities in [False, True]:
+            row = {'config': config, 'strategy': strategy, 'valid_inequalities': valid_inequalities}
+            row.update(solve_with_cuts(config, strategy, valid_inequalities, ev_data))
+            rows.append(row)
+
+            print(f'{config} {strategy} (valid inequalities: {valid_inequalities}): LP bound {row["lp_bound"]:.4f}, '
+                  f'{row["node_count"]:.0f} nodes, {row["solve_time"]:.2f}s, {row["termination_condition"]}')
+
+    df = pd.DataFrame(rows)
+    print(f'\nLP relaxation bound and B&B nodes to {MIP_GAP}% MIP gap (time limit {TIME_LIMIT} minutes)\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import pandas as pd
+import pyomo.environ as pyo
+from gurobipy import GRB
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import create_persistent_solver, solve_persistent_model
+from src.models.optimisation_models.warm_start import set_warm_start
+from src.models.results.model_results import ModelResults
+from src.models.simulation_models.simulation_model import simulate_and_process
+from src.models.utils.mapping import config_map, strategy_map
+
+
+TIME_LIMIT = 60  # (minutes)
+
+
+def get_default_config_attributes(config: str) -> dict:
+    # Largest CPs and as many as allowed, so the uncoordinated simulation does not depend on an optimisation result
+    num_cp = params.num_of_evs if config == 'config_1' else params.num_cp_max
+
+    return {
+        'p_cp_rated': max(params.p_cp_rated_options_scaled) * params.charging_power_resolution_factor,
+        'num_cp': num_cp,
+        'ev_to_cp_assignment': {j: [i for i in range(params.num_of_evs) if i % num_cp == j] for j in range(num_cp)}
+    }
+
+
+def solve_with_progress(config: str, strategy: str, ev_data, prior: ModelResults | None) -> tuple[ModelResults, dict]:
+    mip_gap, _, _, thread_count = solver_settings[f'{config}_{strategy}']
+
+    model = BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        version='warm_start',
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data
+    ).get_optimisation_model()
+
+    if prior is not None:
+        set_warm_start(model, prior)
+
+    solver = create_persistent_solver(model, time_limit=TIME_LIMIT, mip_gap=mip_gap, thread_count=thread_count)
+
+    # Runtime of the first incumbent and of the first time the MIP gap is reached
+    progress = {'time_to_first_incumbent': None, 'time_to_mip_gap': None}
+
+    def callback(cb_model, cb_opt, where):
+        if where not in (GRB.Callback.MIP, GRB.Callback.MIPSOL):
+            return
+
+        runtime = cb_opt.cbGet(GRB.Callback.RUNTIME)
+        if where == GRB.Callback.MIPSOL:
+            best, bound = cb_opt.cbGet(GRB.Callback.MIPSOL_OBJBST), cb_opt.cbGet(GRB.Callback.MIPSOL_OBJBND)
+            progress['time_to_first_incumbent'] = progress['time_to_first_incumbent'] or runtime
+        else:
+            best, bound = cb_opt.cbGet(GRB.Callback.MIP_OBJBST), cb_opt.cbGet(GRB.Callback.MIP_OBJBND)
+
+        if progress['time_to_mip_gap'] is None and best < GRB.INFINITY and abs(best - bound) <= abs(best) * mip_gap / 100:
+            progress['time_to_mip_gap'] = runtime
+
+    solver.set_callback(callback)
+
+    _, calc_mip_gap, solver_status, termination_condition = solve_persistent_model(
+        solver, model, version='warm_start', warmstart=prior is not None
+    )
+
+    # The MIP gap can be reached at the end of the solve, after the last callback
+    if progress['time_to_mip_gap'] is None and calc_mip_gap is not None and calc_mip_gap <= mip_gap:
+        progress['time_to_mip_gap'] = solver.get_model_attr('Runtime')
+
+    results = ModelResults(
+        model=model,
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        mip_gap=calc_mip_gap,
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data
+    )
+
+    progress.update({
+        'solve_time': solver.get_model_attr('Runtime'),
+        'mip_gap': calc_mip_gap,
+        'objective': pyo.value(model.obj_function),
+        'termination_condition': str(termination_condition),
+    })
+
+    return results, progress
+
+
+def main():
+    """
+    Compares the time to the first incumbent and to the MIP gap in solver_settings for cold starts, MIP starts from the
+    uncoordinated simulation and MIP starts from the solution of the other coordinated charging strategy.
+    """
+    pd.options.display.max_columns = None
+
+    configurations = ['config_1', 'config_2', 'config_3']
+    strategies = ['opportunistic', 'flexible']
+
+    ev_data = load_ev_data()
+
+    rows = []
+    for config in configurations:
+        simulation = ModelResults(
+            simulate_and_process(config, get_default_config_attributes(config), ev_data),
+            config_map[config],
+            strategy_map['uncoordinated'],
+            obj_weights=None,
+            ev_data=ev_data
+        )
+
+        cold_results = {}
+        for strategy in strategies:
+            cold_results[strategy], progress = solve_with_progress(config, strategy, ev_data, prior=None)
+            rows.append({'config': config, 'strategy': strategy, 'start': 'cold', **progress})
+
+            _, progress = solve_with_progress(config, strategy, ev_data, prior=simulation)
+            rows.append({'config': config, 'strategy': strategy, 'start': 'simulation', **progress})
+
+        for strategy, sibling in [('flexible', 'opportunistic'), ('opportunistic', 'flexible')]:
+            _, progress = solve_with_progress(config, strategy, ev_data, prior=cold_results[sibling])
+            rows.append({'config': config, 'strategy': strategy, 'start': sibling, **progress})
+
+        for row in rows[-6:]:
+            print(f'{row["config"]} {row["strategy"]} ({row["start"]} start): '
+                  f'first incumbent {row["time_to_first_incumbent"]}s, MIP gap reached {row["time_to_mip_gap"]}s')
+
+    df = pd.DataFrame(rows).sort_values(['config', 'strategy', 'start'], ignore_index=True)
+    print(f'\nTime to first incumbent and to the MIP gap in solver_settings (time limit {TIME_LIMIT} minutes)\n{df}')
+
+    return df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import filecmp
+import os
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.utils.configs import BuildBackend
+from src.models.utils.mapping import config_map, strategy_map
+
+
+def write_lp_file(config: str, strategy: str, backend: BuildBackend, ev_data, output_dir: str) -> str:
+    model = BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[strategy],
+        version='compare_build_backends',
+        obj_weights=obj_weights_dict['balanced'],
+        ev_data=ev_data,
+        backend=backend
+    ).get_optimisation_model()
+
+    file_path = os.path.join(output_dir, f'{config}_{strategy}_{backend.value}.lp')
+    model.write(file_path, io_options={'symbolic_solver_labels': True})
+
+    return file_path
+
+
+def main():
+    """ Checks that the rules and array build backends write identical LP files for every model. """
+    output_dir = os.path.join(params.data_output_path, 'build_backends')
+    os.makedirs(output_dir, exist_ok=True)
+
+    ev_data = load_ev_data()
+    mismatches = []
+
+    for config in ['config_1', 'config_2', 'config_3']:
+        for strategy in ['opportunistic', 'flexible']:
+            rules_lp = write_lp_file(config, strategy, BuildBackend.RULES, ev_data, output_dir)
+            array_lp = write_lp_file(config, strategy, BuildBackend.ARRAY, ev_data, output_dir)
+
+            if filecmp.cmp(rules_lp, array_lp, shallow=False):
+                print(f'{params.GREEN}{config} {strategy}: LP files are identical.{params.RESET}')
+            else:
+                print(f'{params.RED}{config} {strategy}: LP files differ.{params.RESET}')
+                mismatches.append(f'{config}_{strategy}')
+
+    if mismatches:
+        raise AssertionError(f'Build backends produce different LP files for: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
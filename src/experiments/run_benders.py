@@ -0,0 +1,67 @@
+import os
+import pandas as pd
+
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.benders.run_benders import run_benders_model
+from src.models.results.model_results import EvaluationMetrics
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    obj_weights_type,
+    version,
+    configurations,
+    charging_strategies
+)
+
+
+MAX_ITERATIONS = 50
+BENDERS_GAP = 1  # (%)
+NUM_WORKERS = None  # one worker per day, up to the number of CPUs
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Benders Decomposition Models:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nNumber of EVs: {params.num_of_evs}",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+
+            results, history = run_benders_model(
+                config=config,
+                charging_strategy=strategy,
+                version=version,
+                obj_weights=obj_weights_dict[obj_weights_type],
+                ev_data=ev_data,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count,
+                num_workers=NUM_WORKERS,
+                max_iterations=MAX_ITERATIONS,
+                benders_gap=BENDERS_GAP
+            )
+
+            if results is not None:
+                EvaluationMetrics(results, ev_data).pprint_metrics()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+import pandas as pd
+
+from src.config import params
+from src.models.simulation_models.design_sweep import load_fleets, run_design_sweep
+from src.experiments.var_setup import debugging_version, configurations
+
+
+FLEET_SIZES = [10, 50, 100]
+NUM_WORKERS = None  # one worker per design, up to the number of CPUs
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    version = f'design_sweep{debugging_version}'
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Uncoordinated Design Sweep:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nFleet sizes: {FLEET_SIZES}",
+        f"\nCP rated power options: {params.p_cp_rated_options}",
+        f"\nConfigurations: {configurations}"
+        "\n-----------------------------------------------------------"
+    )
+
+    fleets = load_fleets(FLEET_SIZES)
+
+    df = run_design_sweep(
+        configurations=configurations,
+        version=version,
+        fleets=fleets,
+        num_workers=NUM_WORKERS
+    )
+
+    print(f'\nDesign sweep metrics\n{df}')
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,10 @@ def main():
     pd.options.display.max_columns = None
 
     save_metrics_df = False
+    warm_start = False  # start each charging strategy from the solution of the previous one
+    solver_interface = 'file'  # 'direct' builds the model in solver memory instead of writing an LP file
+    model_cache = False  # reuse compiled models from previous runs with the same inputs
+    profile_build = False  # record the build time and size added by each asset method and objective term
 
 
     print(
@@ -38,6 +42,10 @@ def main():
         version=version,
         obj_weights=obj_weights,
         solver_settings=solver_settings,
+        warm_start=warm_start,
+        solver_interface=solver_interface,
+        model_cache=model_cache,
+        profile_build=profile_build
     )
 
     print(
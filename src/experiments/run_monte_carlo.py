@@ -0,0 +1,44 @@
+import os
+import pandas as pd
+
+from src.config import params
+from src.models.simulation_models.monte_carlo import run_monte_carlo_simulation
+from src.experiments.var_setup import debugging_version, configurations
+
+
+NUM_SAMPLES = 200
+P_CP_RATED = 7.2  # (kW)
+NUM_CP = 3  # configs 2 and 3, config 1 has one CP per EV
+SEED = 0
+NUM_WORKERS = None  # one worker per sample, up to the number of CPUs
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    version = f'monte_carlo{debugging_version}'
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Uncoordinated Monte Carlo Simulation:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nSamples: {NUM_SAMPLES} fleets of {params.num_of_evs} EVs",
+        f"\nConfigurations: {configurations}"
+        "\n-----------------------------------------------------------"
+    )
+
+    for config in configurations:
+        run_monte_carlo_simulation(
+            config=config,
+            version=version,
+            num_samples=NUM_SAMPLES,
+            p_cp_rated=P_CP_RATED,
+            num_cp=NUM_CP,
+            seed=SEED,
+            num_workers=NUM_WORKERS
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import os
+import pandas as pd
+
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.run_optimisation import run_obj_weights_sweep
+from src.pipelines.analyse_results import analyse_multiple_models
+from src.pipelines.multiple_models_pipeline import run_multiple_models
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    debugging_version,
+    configurations,
+    charging_strategies
+)
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    save_metrics_df = False
+
+    # One results version per objective weights type, as in run_models
+    obj_weights_sweep = {
+        f'{obj_weights_type}{debugging_version}': obj_weights
+        for obj_weights_type, obj_weights in obj_weights_dict.items()
+    }
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Objective Weights Sweep:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersions: {list(obj_weights_sweep.keys())}",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    # Build each optimisation model once and re-solve it for every objective weights type
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+
+            run_obj_weights_sweep(
+                config=config,
+                charging_strategy=strategy,
+                obj_weights_sweep=obj_weights_sweep,
+                ev_data=ev_data,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count
+            )
+
+    for version, obj_weights in obj_weights_sweep.items():
+        # Run simulation models from the saved opportunistic results of each version
+        if 'uncoordinated' in charging_strategies:
+            run_multiple_models(
+                configurations=configurations,
+                charging_strategies=['uncoordinated'],
+                version=version,
+                obj_weights=obj_weights,
+                solver_settings=solver_settings,
+            )
+
+        raw_metrics, formatted_metrics = analyse_multiple_models(
+            configurations,
+            charging_strategies,
+            version,
+            save_metrics_df
+        )
+
+        print(f'\nFormatted Metrics ({version})\n{formatted_metrics}')
+
+
+if __name__ == '__main__':
+    main()
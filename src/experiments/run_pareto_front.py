@@ -0,0 +1,58 @@
+import os
+import pandas as pd
+
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.pareto_front import run_pareto_front
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    debugging_version,
+    configurations,
+    charging_strategies
+)
+
+
+GRID_POINTS = 10
+NUM_WORKERS = None  # one worker per rhs of the social objective, up to the number of CPUs
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    version = f'pareto_front{debugging_version}'
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Pareto Front Generation:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nGrid points: {GRID_POINTS}",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, _ = solver_settings[f'{config}_{strategy}']
+
+            run_pareto_front(
+                config=config,
+                charging_strategy=strategy,
+                version=version,
+                ev_data=ev_data,
+                grid_points=GRID_POINTS,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                num_workers=NUM_WORKERS
+            )
+
+
+if __name__ == '__main__':
+    main()
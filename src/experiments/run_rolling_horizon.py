@@ -0,0 +1,65 @@
+import os
+import pandas as pd
+
+from src.config import params
+from src.config.ev_params import load_ev_data
+from src.models.optimisation_models.rolling_horizon import run_rolling_horizon_model
+from src.models.results.model_results import EvaluationMetrics
+from src.experiments.obj_weights_map import obj_weights_dict
+from src.experiments.solver_settings import solver_settings
+from src.experiments.var_setup import (
+    obj_weights_type,
+    version,
+    configurations,
+    charging_strategies
+)
+
+
+WINDOW_DAYS = 7
+OVERLAP_DAYS = 1
+
+
+def main():
+    pd.options.display.max_columns = None
+
+    print(
+        "-----------------------------------------------------------",
+        f"\nRunning Rolling Horizon Models:",
+        f"\nPID: {os.getpid()}"
+        f"\nVersion: {version}",
+        f"\nHorizon: {params.num_of_days} days, {WINDOW_DAYS} day windows with {OVERLAP_DAYS} day overlap",
+        f"\nConfigurations: {configurations}",
+        f"\nCharging strategies: {charging_strategies}"
+        "\n-----------------------------------------------------------"
+    )
+
+    ev_data = load_ev_data()
+
+    for config in configurations:
+        for strategy in charging_strategies:
+            # Skip uncoordinated model
+            if strategy == 'uncoordinated':
+                continue
+
+            mip_gap, time_limit, verbose, thread_count = solver_settings[f'{config}_{strategy}']
+
+            results, window_timings = run_rolling_horizon_model(
+                config=config,
+                charging_strategy=strategy,
+                version=version,
+                obj_weights=obj_weights_dict[obj_weights_type],
+                ev_data=ev_data,
+                window_days=WINDOW_DAYS,
+                overlap_days=OVERLAP_DAYS,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count
+            )
+
+            if results is not None:
+                EvaluationMetrics(results, ev_data).pprint_metrics()
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,7 @@ from src.config.ev_params import load_ev_data
 from src.experiments.obj_weights_map import obj_weights_dict
 from src.experiments.solver_settings import solver_settings as sol
 from src.models.optimisation_models.run_optimisation import run_optimisation_model
+from src.models.optimisation_models.feasibility_check import check_ev_feasibility, print_feasibility_report
 
 
 PARAMS_COMBINATION = [
@@ -87,6 +88,7 @@ def main():
     charging_strategy = 'opportunistic'
     obj_weights = obj_weights_dict['balanced']
     overwrite_existing = False
+    skip_infeasible = True
 
     model_name = f'{config}_{charging_strategy}'
 
@@ -119,6 +121,13 @@ def main():
             ev_data = load_ev_data()
             print(f'Loaded EV input data: {ev_data.filename}')
 
+            # Flag EVs that cannot meet their SOC requirements before calling the solver
+            violations = check_ev_feasibility(ev_data)
+            print_feasibility_report(violations)
+            if not violations.empty and skip_infeasible:
+                print(f'Skipping infeasible version: {version}')
+                continue
+
             run_optimisation_model(
                 config=config,
                 charging_strategy=charging_strategy,
@@ -0,0 +1,22 @@
+import pyomo.environ as pyo
+from src.config import params
+from src.models.optimisation_models.assets.charging_point import ChargingPoint
+from src.models.optimisation_models.array_backend.coefficients import sparse_var_array, linear, rows_rule
+
+
+class ArrayChargingPoint(ChargingPoint):
+    """ ChargingPoint asset whose TIME-indexed constraint families are generated in bulk. """
+
+    def _total_charging_demand(self):
+        timestamps = list(self.model.TIME)
+        p_ev = sparse_var_array(self.model.p_ev, self.model.coefficient_arrays.at_home)
+        num_cp_per_type = [self.model.num_cp_per_type[m] for m in params.p_cp_rated_options_scaled]
+        rated_power_coefs = [-m for m in params.p_cp_rated_options_scaled]
+
+        rows = {}
+        for k, t in enumerate(timestamps):
+            p_ev_at_home = [p for p in p_ev[:, k] if p is not None]
+            if p_ev_at_home:
+                rows[t] = linear([1] * len(p_ev_at_home) + rated_power_coefs, p_ev_at_home + num_cp_per_type) <= 0
+
+        self.model.total_charging_demand_constraints = pyo.Constraint(self.model.TIME, rule=rows_rule(rows))
@@ -0,0 +1,107 @@
+import numpy as np
+import pyomo.environ as pyo
+from dataclasses import dataclass
+from src.config import params
+from pyomo.core.expr.numeric_expr import LinearExpression, MonomialTermExpression
+from src.config.ev_params import EVData
+
+
+@dataclass
+class CoefficientArrays:
+    ev_ids: list
+    timestamps: list
+    at_home: np.ndarray  # (EV, TIME) at home status
+    is_arrival: np.ndarray  # (EV, TIME) True at arrival slots
+    arrival_energy: np.ndarray  # (EV, TIME) travel energy subtracted at arrival
+    is_departure: np.ndarray  # (EV, TIME) True at departure slots
+    departure_energy: np.ndarray  # (EV, TIME) travel energy required at departure
+    soc_init: np.ndarray  # (EV,)
+    soc_critical: np.ndarray  # (EV,)
+    soc_max: np.ndarray  # (EV,)
+    slot_duration: np.ndarray  # (TIME,) number of time_resolution periods in each time slot
+
+
+def build_coefficient_arrays(model: pyo.ConcreteModel, ev_data: EVData) -> CoefficientArrays:
+    ev_ids = list(model.EV_ID)
+    timestamps = list(model.TIME)
+    time_position = {t: k for k, t in enumerate(timestamps)}
+
+    num_ev = len(ev_ids)
+    num_t = len(timestamps)
+
+    is_arrival = np.zeros((num_ev, num_t), dtype=bool)
+    arrival_energy = np.zeros((num_ev, num_t))
+    is_departure = np.zeros((num_ev, num_t), dtype=bool)
+    departure_energy = np.zeros((num_ev, num_t))
+
+    at_home = ev_data.at_home[np.ix_(
+        [ev_data.ev_position[i] for i in ev_ids], [ev_data.time_position[t] for t in timestamps]
+    )]
+
+    for n, i in enumerate(ev_ids):
+        travel_energy = ev_data.travel_energy_dict[i]
+
+        # Trip number k is the first occurrence of t in the arrival list, otherwise in the departure list
+        for k, t in enumerate(ev_data.t_arr_dict[i]):
+            pos = time_position.get(t)
+            if pos is not None and not is_arrival[n, pos]:
+                is_arrival[n, pos] = True
+                arrival_energy[n, pos] = travel_energy[k]
+
+        for k, t in enumerate(ev_data.t_dep_dict[i]):
+            pos = time_position.get(t)
+            if pos is not None and not is_departure[n, pos]:
+                is_departure[n, pos] = True
+                departure_energy[n, pos] = arrival_energy[n, pos] if is_arrival[n, pos] else travel_energy[k]
+
+    return CoefficientArrays(
+        ev_ids=ev_ids,
+        timestamps=timestamps,
+        at_home=at_home,
+        is_arrival=is_arrival,
+        arrival_energy=arrival_energy,
+        is_departure=is_departure,
+        departure_energy=departure_energy,
+        soc_init=np.array([ev_data.soc_init_dict[i] for i in ev_ids]),
+        soc_critical=np.array([ev_data.soc_critical_dict[i] for i in ev_ids]),
+        soc_max=np.array([ev_data.soc_max_dict[i] for i in ev_ids]),
+        slot_duration=np.array([params.slot_duration[t] for t in timestamps]),
+    )
+
+
+def var_array(var: pyo.Var, *shape: int) -> np.ndarray:
+    """ Returns the variable data objects of an indexed variable as an object array in index order. """
+    var_data = np.empty(len(var), dtype=object)
+    var_data[:] = list(var.values())
+
+    return var_data.reshape(shape)
+
+
+def sparse_var_array(var: pyo.Var, mask: np.ndarray) -> np.ndarray:
+    """ Returns the variable data objects of a sparsely indexed variable as an object array, None where mask is False. """
+    var_data = np.full(mask.shape, None, dtype=object)
+    var_data[mask.astype(bool)] = list(var.values())
+
+    return var_data
+
+
+def linear(coefs, variables, constant=0) -> LinearExpression:
+    """ Builds a linear expression directly from coefficients and variables, without operator overloading. """
+    args = [v if c == 1 else MonomialTermExpression((c, v)) for c, v in zip(coefs, variables)]
+
+    if constant:
+        args.insert(0, constant)
+
+    return LinearExpression(args)
+
+
+def term(coef, variable) -> MonomialTermExpression:
+    return MonomialTermExpression((coef, variable))
+
+
+def rows_rule(rows: dict):
+    """ Returns a constraint rule that looks up prebuilt rows, skipping indices without a row. """
+    def rule(model, *index):
+        return rows.get(index if len(index) > 1 else index[0], pyo.Constraint.Skip)
+
+    return rule
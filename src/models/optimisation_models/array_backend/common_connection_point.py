@@ -0,0 +1,18 @@
+import pyomo.environ as pyo
+from src.models.optimisation_models.assets.common_connection_point import CommonConnectionPoint
+from src.models.optimisation_models.array_backend.coefficients import var_array, sparse_var_array, linear, rows_rule
+
+
+class ArrayCommonConnectionPoint(CommonConnectionPoint):
+    def initialise_constraints(self):
+        timestamps = list(self.model.TIME)
+        p_ev = sparse_var_array(self.model.p_ev, self.model.coefficient_arrays.at_home)
+        p_grid = var_array(self.model.p_grid, len(timestamps))
+        p_household_load = [self.model.p_household_load[t] for t in timestamps]
+
+        rows = {}
+        for k, t in enumerate(timestamps):
+            p_ev_at_home = [p for p in p_ev[:, k] if p is not None]
+            rows[t] = linear([1] + [-1] * len(p_ev_at_home), [p_grid[k]] + p_ev_at_home) == p_household_load[k]
+
+        self.model.ccp_constraint = pyo.Constraint(self.model.TIME, rule=rows_rule(rows))
@@ -0,0 +1,387 @@
+import numpy as np
+import pyomo.environ as pyo
+from src.config import params
+from src.config.ev_params import EVData
+from src.models.optimisation_models.assets.electric_vehicle import ElectricVehicle
+from src.models.optimisation_models.array_backend.coefficients import (
+    build_coefficient_arrays,
+    var_array,
+    sparse_var_array,
+    linear,
+    term,
+    rows_rule
+)
+
+
+class ArrayElectricVehicle(ElectricVehicle):
+    """ ElectricVehicle asset whose constraint families are generated in bulk from NumPy coefficient arrays. """
+
+    def __init__(self, model, config, charging_strategy, ev_data: EVData, aggregated_cps: bool = False):
+        self.coef = build_coefficient_arrays(model, ev_data)
+        self._var_arrays = {}
+        model.coefficient_arrays = self.coef
+        super().__init__(model, config, charging_strategy, ev_data, aggregated_cps)
+
+    def initialise_sets(self):
+        at_home = self.coef.at_home.tolist()
+
+        self.model.EV_AT_HOME = pyo.Set(dimen=2, initialize=[
+            (i, t)
+            for n, i in enumerate(self.coef.ev_ids)
+            for k, t in enumerate(self.coef.timestamps)
+            if at_home[n][k]
+        ])
+
+        if hasattr(self.model, 'CP_ID'):
+            self.model.EV_CP_AT_HOME = pyo.Set(dimen=3, initialize=[
+                (i, j, t)
+                for n, i in enumerate(self.coef.ev_ids)
+                for j in self.model.CP_ID
+                for k, t in enumerate(self.coef.timestamps)
+                if at_home[n][k]
+            ])
+
+    def initialise_parameters(self):
+        self.model.soc_critical = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_critical_dict)
+        self.model.soc_max = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_max_dict)
+        self.model.soc_init = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_init_dict)
+        self.model.ev_at_home_status = pyo.Param(self.model.EV_ID, self.model.TIME,
+                                                 initialize=self._ev_time_dict(self.coef.at_home.tolist()),
+                                                 within=pyo.Binary)
+
+    # --------------------------
+    # HELPERS
+    # --------------------------
+    @property
+    def _shape(self):
+        return self.coef.at_home.shape
+
+    @property
+    def _home_positions(self) -> list:
+        # (EV, TIME) positions of the EV_AT_HOME index, in set order
+        return list(zip(*(p.tolist() for p in np.nonzero(self.coef.at_home))))
+
+    @property
+    def _ev_cp_home_mask(self) -> np.ndarray:
+        num_ev, num_t = self._shape
+        return np.broadcast_to(self.coef.at_home[:, None, :] == 1, (num_ev, len(self.model.CP_ID), num_t))
+
+    def _ev_time_dict(self, values) -> dict:
+        return {
+            (i, t): values[n][k]
+            for n, i in enumerate(self.coef.ev_ids)
+            for k, t in enumerate(self.coef.timestamps)
+        }
+
+    def _ev_time_vars(self, var):
+        if var.name not in self._var_arrays:
+            self._var_arrays[var.name] = var_array(var, *self._shape)
+        return self._var_arrays[var.name]
+
+    def _ev_at_home_vars(self, var):
+        if var.name not in self._var_arrays:
+            self._var_arrays[var.name] = sparse_var_array(var, self.coef.at_home)
+        return self._var_arrays[var.name]
+
+    def _ev_cp_at_home_vars(self, var):
+        if var.name not in self._var_arrays:
+            self._var_arrays[var.name] = sparse_var_array(var, self._ev_cp_home_mask)
+        return self._var_arrays[var.name]
+
+    # --------------------------
+    # CONSTRAINTS
+    # --------------------------
+    def _soc_constraints(self):
+        num_ev, num_t = self._shape
+        soc_ev = self._ev_time_vars(self.model.soc_ev)
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        soc_max = self.coef.soc_max.tolist()
+        soc_critical = self.coef.soc_critical.tolist()
+        soc_init = self.coef.soc_init.tolist()
+        efficiency = self.ev_data.charging_efficiency
+        slot_duration = self.coef.slot_duration.tolist()
+
+        soc_limits = []
+        for n in range(num_ev):
+            for k in range(num_t):
+                soc_limits.append(soc_ev[n, k] <= soc_max[n])
+                soc_limits.append(soc_ev[n, k] >= soc_critical[n])
+
+        self.model.soc_limits_constraint = pyo.ConstraintList(rule=lambda model: soc_limits)
+
+        is_arrival = self.coef.is_arrival.tolist()
+        arrival_energy = self.coef.arrival_energy.tolist()
+        at_home = self.coef.at_home.tolist()
+        soc_evolution = []
+        for n in range(num_ev):
+            # set initial soc
+            soc_evolution.append(soc_ev[n, 0] == soc_init[n])
+
+            for k in range(1, num_t):
+                if is_arrival[n][k]:
+                    # constraint to set ev soc at arrival time
+                    soc_evolution.append(linear([1, -1], [soc_ev[n, k], soc_ev[n, k - 1]]) == -arrival_energy[n][k])
+                elif not at_home[n][k]:
+                    # soc is carried over while the EV is away
+                    soc_evolution.append(soc_ev[n, k] == soc_ev[n, k - 1])
+                else:
+                    # otherwise soc follows regular charging constraint, over the duration of the time slot
+                    soc_evolution.append(linear(
+                        [1, -1, -efficiency * slot_duration[k]], [soc_ev[n, k], soc_ev[n, k - 1], p_ev[n, k]]
+                    ) == 0)
+
+        self.model.soc_evolution = pyo.Constraint(
+            self.model.EV_ID, self.model.TIME,
+            rule=self._rows_by_ev_time(soc_evolution)
+        )
+
+        # SOC required before departure time
+        departure_rows = {}
+        for n, k in zip(*np.nonzero(self.coef.is_departure)):
+            i, t = self.coef.ev_ids[n], self.coef.timestamps[k]
+            departure_rows[i, t] = soc_ev[n, k] >= soc_critical[n] + self.coef.departure_energy[n, k].item()
+
+        self.model.minimum_required_soc_at_departure_constraint = pyo.Constraint(
+            self.model.EV_ID, self.model.TIME, rule=rows_rule(departure_rows)
+        )
+
+        self.model.final_soc_constraint = pyo.Constraint(
+            self.model.EV_ID,
+            rule=rows_rule({i: soc_ev[n, -1] >= soc_init[n] for n, i in enumerate(self.coef.ev_ids)})
+        )
+
+    def _scheduling_constraints(self):
+        num_ev, num_t = self._shape
+        days = list(self.model.DAY)
+        is_charging_day = var_array(self.model.is_charging_day, num_ev, len(days))
+        day_position = {d: n for n, d in enumerate(days)}
+
+        num_charging_days = var_array(self.model.num_charging_days, num_ev, len(self.model.WEEK))
+        self.model.num_charging_days_constraint = pyo.Constraint(
+            self.model.EV_ID, self.model.WEEK,
+            rule=rows_rule({
+                (i, w): linear(
+                    [1] + [-1] * len(params.D_w[w]),
+                    [num_charging_days[n, m]] + [is_charging_day[n, day_position[d]] for d in params.D_w[w]]
+                ) == 0
+                for n, i in enumerate(self.coef.ev_ids)
+                for m, w in enumerate(self.model.WEEK)
+            })
+        )
+
+        max_num_charged_evs = ((params.num_of_evs * params.max_num_charging_days) / params.length_D_w
+                               ) + params.max_charged_evs_daily_margin
+        self.model.max_num_charged_evs_daily_constraint = pyo.Constraint(
+            self.model.DAY,
+            rule=rows_rule({
+                d: linear([1] * num_ev, is_charging_day[:, m]) <= max_num_charged_evs for m, d in enumerate(days)
+            })
+        )
+
+        # Time positions of each day
+        time_position = {t: k for k, t in enumerate(self.coef.timestamps)}
+        day_positions = [[time_position[t] for t in params.T_d[d]] for d in days]
+        at_home = self.coef.at_home.tolist()
+
+        if hasattr(self.model, 'CP_ID'):
+            # Case: is_ev_cp_connected (with charging point index)
+            is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+            rows = {}
+            for n, i in enumerate(self.coef.ev_ids):
+                for c, j in enumerate(self.model.CP_ID):
+                    for m, d in enumerate(days):
+                        connected = [is_ev_cp_connected[n, c, k] for k in day_positions[m] if at_home[n][k]]
+                        rows[i, j, d] = linear(
+                            [1] * len(connected) + [-len(day_positions[m])],
+                            connected + [is_charging_day[n, m]]
+                        ) <= 0
+
+            self.model.charge_only_on_charging_days_constraint = pyo.Constraint(
+                self.model.EV_ID, self.model.CP_ID, self.model.DAY, rule=rows_rule(rows)
+            )
+        else:
+            # Case: is_ev_charging (without charging point index)
+            is_ev_charging = self._ev_at_home_vars(self.model.is_ev_charging)
+            rows = {}
+            for n, i in enumerate(self.coef.ev_ids):
+                for m, d in enumerate(days):
+                    charging = [is_ev_charging[n, k] for k in day_positions[m] if at_home[n][k]]
+                    rows[i, d] = linear(
+                        [1] * len(charging) + [-len(day_positions[m])],
+                        charging + [is_charging_day[n, m]]
+                    ) <= 0
+
+            self.model.charge_only_on_charging_days_constraint = pyo.Constraint(
+                self.model.EV_ID, self.model.DAY, rule=rows_rule(rows)
+            )
+
+    def _charging_power_limit_config1_opp(self):
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        p_cp_rated = self.model.p_cp_rated
+
+        self.model.charging_power_limit_config1_opp_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([p_ev[n, k] <= p_cp_rated for n, k in self._home_positions])
+        )
+
+    def _charging_power_limit_config1_flex(self):
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        is_ev_charging = self._ev_at_home_vars(self.model.is_ev_charging)
+        p_cp_rated = self.model.p_cp_rated
+        home_positions = self._home_positions
+
+        self.model.charging_power_limit_config1_flex_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([p_ev[n, k] <= p_cp_rated for n, k in home_positions])
+        )
+
+        # Constraint linearisation
+        self.model.charging_power_limit_config1_flex_upper_bound_bigm_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([
+                p_ev[n, k] <= term(params.p_cp_rated_max, is_ev_charging[n, k]) for n, k in home_positions
+            ])
+        )
+
+    def _ev_connection_to_installed_cps(self):
+        is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+        is_cp_installed = var_array(self.model.is_cp_installed, len(self.model.CP_ID))
+
+        rows = {}
+        for c, j in enumerate(self.model.CP_ID):
+            for k, t in enumerate(self.coef.timestamps):
+                connected = [x for x in is_ev_cp_connected[:, c, k] if x is not None]
+                if connected:
+                    rows[j, t] = linear([1] * len(connected) + [-1], connected + [is_cp_installed[c]]) <= 0
+
+        self.model.ev_connection_to_installed_cps_constraint = pyo.Constraint(
+            self.model.CP_ID, self.model.TIME, rule=rows_rule(rows)
+        )
+
+    def _num_connected_evs_limit_config2_aggregated(self):
+        is_ev_charging = self._ev_at_home_vars(self.model.is_ev_charging)
+
+        rows = {}
+        for k, t in enumerate(self.coef.timestamps):
+            connected = [x for x in is_ev_charging[:, k] if x is not None]
+            if connected:
+                rows[t] = linear([1] * len(connected) + [-1], connected + [self.model.num_cp]) <= 0
+
+        self.model.num_connected_evs_limit_constraint = pyo.Constraint(self.model.TIME, rule=rows_rule(rows))
+
+    def _charging_power_limit_config2_aggregated(self):
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        is_ev_charging = self._ev_at_home_vars(self.model.is_ev_charging)
+        p_cp_rated = self.model.p_cp_rated
+        home_positions = self._home_positions
+
+        self.model.charging_power_limit_config2_aggregated_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([p_ev[n, k] <= p_cp_rated for n, k in home_positions])
+        )
+
+        # Big M linearisation
+        self.model.charging_power_limit_config2_aggregated_bigm_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([
+                p_ev[n, k] <= term(params.p_cp_rated_max, is_ev_charging[n, k]) for n, k in home_positions
+            ])
+        )
+
+    def _ev_connection_to_allocated_cps_when_at_home(self):
+        num_ev, num_t = self._shape
+        is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+        is_assigned = var_array(self.model.is_ev_permanently_assigned_to_cp, num_ev, len(self.model.CP_ID))
+
+        rows = [
+            is_ev_cp_connected[n, c, k] <= is_assigned[n, c]
+            for n, c, k in zip(*(p.tolist() for p in np.nonzero(self._ev_cp_home_mask)))
+        ]
+
+        self.model.ev_connection_to_allocated_cps_when_at_home_constraint = pyo.Constraint(
+            self.model.EV_CP_AT_HOME, rule=self._rows_by_ev_cp_at_home(rows)
+        )
+
+    def _charging_power_limit_config23(self):
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+        p_cp_rated = self.model.p_cp_rated
+        num_cp = len(self.model.CP_ID)
+        home_positions = self._home_positions
+
+        # Big M linearisation
+        self.model.charging_power_limit_config23_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([p_ev[n, k] <= p_cp_rated for n, k in home_positions])
+        )
+
+        bigm_coefs = [params.p_cp_rated_max] * num_cp
+        self.model.charging_power_limit_config23_bigm_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([
+                p_ev[n, k] <= linear(bigm_coefs, is_ev_cp_connected[n, :, k]) for n, k in home_positions
+            ])
+        )
+
+    def _ev_cp_connection_mutual_exclusivity_constraints(self):
+        is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+        num_cp = len(self.model.CP_ID)
+
+        self.model.ev_to_cp_mutual_exclusivity_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([
+                linear([1] * num_cp, is_ev_cp_connected[n, :, k]) <= 1 for n, k in self._home_positions
+            ])
+        )
+
+        rows = {}
+        for c, j in enumerate(self.model.CP_ID):
+            for k, t in enumerate(self.coef.timestamps):
+                connected = [x for x in is_ev_cp_connected[:, c, k] if x is not None]
+                if connected:
+                    rows[j, t] = linear([1] * len(connected), connected) <= 1
+
+        self.model.cp_to_ev_mutual_exclusivity_constraint = pyo.Constraint(
+            self.model.CP_ID, self.model.TIME, rule=rows_rule(rows)
+        )
+
+    def _ev_cp_power_link(self):
+        num_cp = len(self.model.CP_ID)
+        p_ev = self._ev_at_home_vars(self.model.p_ev)
+        p_ev_cp = self._ev_cp_at_home_vars(self.model.p_ev_cp)
+        is_ev_cp_connected = self._ev_cp_at_home_vars(self.model.is_ev_cp_connected)
+        p_cp_rated = self.model.p_cp_rated
+
+        # Link EV total power to CP-specific power
+        self.model.ev_power_sum = pyo.Constraint(
+            self.model.EV_AT_HOME,
+            rule=self._rows_by_ev_at_home([
+                linear([1] + [-1] * num_cp, [p_ev[n, k]] + list(p_ev_cp[n, :, k])) == 0
+                for n, k in self._home_positions
+            ])
+        )
+
+        # Power is only nonzero if EV and CP are connected
+        # Big M Linearisation
+        mask = self._ev_cp_home_mask
+        self.model.cp_power_limit_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_CP_AT_HOME,
+            rule=self._rows_by_ev_cp_at_home([p <= p_cp_rated for p in p_ev_cp[mask]])
+        )
+
+        self.model.cp_power_limit_bigm_constraint = pyo.Constraint(
+            self.model.EV_CP_AT_HOME,
+            rule=self._rows_by_ev_cp_at_home([
+                p <= term(params.p_cp_rated_max, x) for p, x in zip(p_ev_cp[mask], is_ev_cp_connected[mask])
+            ])
+        )
+
+    def _rows_by_ev_time(self, rows: list):
+        keys = ((i, t) for i in self.coef.ev_ids for t in self.coef.timestamps)
+        return rows_rule(dict(zip(keys, rows)))
+
+    def _rows_by_ev_at_home(self, rows: list):
+        return rows_rule(dict(zip(self.model.EV_AT_HOME, rows)))
+
+    def _rows_by_ev_cp_at_home(self, rows: list):
+        return rows_rule(dict(zip(self.model.EV_CP_AT_HOME, rows)))
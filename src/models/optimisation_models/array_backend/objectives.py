@@ -0,0 +1,122 @@
+import numpy as np
+import pyomo.environ as pyo
+from src.config import params
+from src.models.optimisation_models.objectives import EconomicObjective, TechnicalObjective, SocialObjective
+from src.models.optimisation_models.array_backend.coefficients import var_array, sparse_var_array, linear, rows_rule
+
+
+class ArrayEconomicObjective(EconomicObjective):
+    def energy_purchase_cost(self):
+        operational_cost = params.daily_supply_charge_dict[
+                               params.tariff_type] * params.num_of_evs * params.num_of_days
+
+        timestamps = list(self.model.TIME)
+        tariff = params.tariff_dict[params.tariff_type].loc[timestamps].tolist()
+        cost = [rate * params.slot_duration[t] for rate, t in zip(tariff, timestamps)]
+
+        return operational_cost + linear(cost, var_array(self.model.p_grid, len(timestamps)))
+
+
+class ArrayTechnicalObjective(TechnicalObjective):
+    def _add_peak_constraints(self, peak_var, avg_var, delta_var, time_sets, index_set, name_prefix):
+        """ Generalised function to add peak constraints (daily/weekly) from time position arrays. """
+        time_position = {t: k for k, t in enumerate(self.model.TIME)}
+        p_grid = var_array(self.model.p_grid, len(time_position))
+        positions = {idx: [time_position[t] for t in time_sets[idx]] for idx in index_set}
+
+        # Peak power constraint
+        peak_rows = [peak_var[idx] >= p_grid[k] for idx in index_set for k in positions[idx]]
+        setattr(self.model, f"{name_prefix}_peak_power_constraint", pyo.ConstraintList(rule=lambda model: peak_rows))
+
+        # Average peak constraint, weighted by the duration of the time slots
+        slot_duration = self.model.coefficient_arrays.slot_duration.tolist()
+        average_rows = {}
+        for idx in index_set:
+            duration = [slot_duration[k] for k in positions[idx]]
+            total_duration = sum(duration)
+            average_rows[idx] = linear(
+                [1] + [-(d / total_duration) for d in duration], [avg_var[idx]] + list(p_grid[positions[idx]])
+            ) == 0
+
+        setattr(self.model, f"{name_prefix}_peak_average_constraint", pyo.Constraint(index_set, rule=rows_rule(average_rows)))
+
+        # Delta peak constraint
+        delta_rows = []
+        for idx in index_set:
+            delta_rows.append(delta_var[idx] >= (peak_var[idx] - avg_var[idx]))
+            delta_rows.append(delta_var[idx] >= (avg_var[idx] - peak_var[idx]))
+
+        setattr(self.model, f"{name_prefix}_delta_peak_avg_constraint",
+                pyo.ConstraintList(rule=lambda model: delta_rows))
+
+    def f_peak(self):
+        # Initialise parameters
+        timestamps = list(self.model.TIME)
+        household_load = [self.model.p_household_load[t] for t in timestamps]
+        max_household_load = max(household_load)
+        penalty = [load / max_household_load for load in household_load]
+
+        self.model.high_load_penalty = pyo.Param(self.model.TIME, initialize=dict(zip(timestamps, penalty)))
+
+        # Define objective term
+        at_home = self.model.coefficient_arrays.at_home == 1
+        p_ev = sparse_var_array(self.model.p_ev, at_home)
+        penalty = np.broadcast_to(np.array(penalty) * self.model.coefficient_arrays.slot_duration, at_home.shape)
+
+        return linear(penalty[at_home].tolist(), p_ev[at_home])
+
+    def _charging_discontinuity_constraints(self):
+        num_ev = len(self.model.EV_ID)
+        num_t = len(self.model.TIME)
+        delta_p_ev = var_array(self.model.delta_p_ev, num_ev, num_t)
+        at_home = self.model.coefficient_arrays.at_home
+        p_ev = np.where(at_home == 1, sparse_var_array(self.model.p_ev, at_home), 0)
+        at_home = at_home.tolist()
+
+        rows = []
+        for n in range(num_ev):
+            rows.append(delta_p_ev[n, 0] == 0)
+
+            for k in range(1, num_t):
+                if at_home[n][k] == 1:
+                    rows.append(delta_p_ev[n, k] >= p_ev[n, k] - p_ev[n, k - 1])
+                    rows.append(delta_p_ev[n, k] >= p_ev[n, k - 1] - p_ev[n, k])
+
+        self.model.charging_discontinuity_constraint = pyo.ConstraintList(rule=lambda model: rows)
+
+
+class ArraySocialObjective(SocialObjective):
+    def f_fair(self):
+        # Initialise variables
+        self.model.soc_avg_deviation = pyo.Var(self.model.EV_ID, self.model.TIME, within=pyo.NonNegativeReals, initialize=0)
+        self.model.daily_soc_avg_t_dep = pyo.Var(self.model.DAY, within=pyo.NonNegativeReals)
+
+        num_ev = len(self.model.EV_ID)
+        num_t = len(self.model.TIME)
+        ev_position = {i: n for n, i in enumerate(self.model.EV_ID)}
+        time_position = {t: k for k, t in enumerate(self.model.TIME)}
+        soc_ev = var_array(self.model.soc_ev, num_ev, num_t)
+        soc_avg_deviation = var_array(self.model.soc_avg_deviation, num_ev, num_t)
+
+        def positions(d):
+            return [(ev_position[i], time_position[t]) for (i, t) in self.ev_data.t_dep_on_day[d]]
+
+        average_rows = {}
+        for d in self.model.DAY:
+            n = len(self.ev_data.t_dep_on_day[d])
+            average_rows[d] = linear(
+                [1] + [-(1 / n)] * n, [self.model.daily_soc_avg_t_dep[d]] + [soc_ev[p] for p in positions(d)]
+            ) == 0
+
+        self.model.daily_soc_avg_t_dep_constraint = pyo.Constraint(self.model.DAY, rule=rows_rule(average_rows))
+
+        deviation_rows = []
+        for d in self.ev_data.t_dep_on_day:
+            for p in positions(d):
+                deviation_rows.append(soc_avg_deviation[p] >= soc_ev[p] - self.model.daily_soc_avg_t_dep[d])
+                deviation_rows.append(soc_avg_deviation[p] >= self.model.daily_soc_avg_t_dep[d] - soc_ev[p])
+
+        self.model.soc_avg_deviation_constraints = pyo.ConstraintList(rule=lambda model: deviation_rows)
+
+        # Define objective
+        return linear([1] * (num_ev * num_t), soc_avg_deviation.ravel())
@@ -4,16 +4,18 @@ from src.models.utils.configs import CPConfig
 
 
 class ChargingPoint:
-    def __init__(self, model, config, charging_strategy):
+    def __init__(self, model, config, charging_strategy, aggregated_cps: bool = False):
         self.model = model
         self.config = config
         self.charging_strategy = charging_strategy
+        self.aggregated_cps = aggregated_cps
         self.initialise_sets()
         self.initialise_parameters()
         self.initialise_variables()
 
     def initialise_sets(self):
-        if self.config == CPConfig.CONFIG_2 or self.config == CPConfig.CONFIG_3:
+        # The aggregated config 2 formulation only counts connected EVs, so CPs are not indexed
+        if (self.config == CPConfig.CONFIG_2 and not self.aggregated_cps) or self.config == CPConfig.CONFIG_3:
             self.model.CP_ID = pyo.Set(initialize=range(params.num_cp_max))
 
     def initialise_parameters(self):
@@ -32,20 +34,35 @@ class ChargingPoint:
             self._ev_cp_permanent_assignment_variables()
 
     def initialise_constraints(self):
+        self.initialise_investment_constraints()
+
+        # Constraint linking the installed CPs to EV charging
+        if self.config == CPConfig.CONFIG_2 or self.config == CPConfig.CONFIG_3:
+            self._total_charging_demand()
+
+    def initialise_investment_constraints(self):
         # Constraints for selecting CP rated power (for all configs)
         self._cp_rated_power_selection_constraints()
 
         if self.config == CPConfig.CONFIG_2:
-            self._num_cp_decision_constraints()
-            self._total_charging_demand()
+            if not self.aggregated_cps:
+                self._num_cp_decision_constraints()
 
         elif self.config == CPConfig.CONFIG_3:
             self._num_cp_decision_constraints()
-            self._total_charging_demand()
             self._ev_cp_permanent_assignment_constraints()
             self._evs_share_installed_cp_constraints()
             self._even_distribution_ev_per_cp()
 
+    def initialise_symmetry_breaking_constraints(self):
+        # CPs are interchangeable, so equivalent solutions are removed by ordering them
+        if self.config == CPConfig.CONFIG_2 and not self.aggregated_cps:
+            self._cp_installation_ordering()
+
+        elif self.config == CPConfig.CONFIG_3:
+            self._cp_installation_ordering()
+            self._ev_cp_assignment_ordering()
+
     # --------------------------
     # VARIABLES
     # --------------------------
@@ -57,9 +74,10 @@ class ChargingPoint:
         self.model.num_cp = pyo.Var(
             within=pyo.NonNegativeIntegers, bounds=(params.num_cp_min, params.num_cp_max)
         )
-        self.model.is_cp_installed = pyo.Var(
-            self.model.CP_ID, within=pyo.Binary
-        )
+        if hasattr(self.model, 'CP_ID'):
+            self.model.is_cp_installed = pyo.Var(
+                self.model.CP_ID, within=pyo.Binary
+            )
         # self.model.p_cp_total = pyo.Var(
         #     within=pyo.NonNegativeReals
         # )
@@ -115,7 +133,10 @@ class ChargingPoint:
         # )
 
         def total_charging_demand(model, t):
-            return sum(model.p_ev[i, t] for i in model.EV_ID) <= sum(
+            p_ev_at_home = [model.p_ev[i, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME]
+            if not p_ev_at_home:
+                return pyo.Constraint.Skip
+            return sum(p_ev_at_home) <= sum(
                 model.num_cp_per_type[m] * m for m in params.p_cp_rated_options_scaled
             )
 
@@ -183,6 +204,37 @@ class ChargingPoint:
 
         self.model.total_num_ev_share_constraint = pyo.Constraint(rule=total_num_ev_share)
 
+    # CONFIG 2 AND 3 Symmetry breaking: installed CPs take the lowest CP IDs
+    def _cp_installation_ordering(self):
+        def cp_installation_ordering_rule(model, j):
+            if j == model.CP_ID.first():
+                return pyo.Constraint.Skip
+            return model.is_cp_installed[j] <= model.is_cp_installed[model.CP_ID.prev(j)]
+
+        self.model.cp_installation_ordering_constraint = pyo.Constraint(
+            self.model.CP_ID, rule=cp_installation_ordering_rule
+        )
+
+    # CONFIG 3 Symmetry breaking: CPs are ordered by the lowest EV ID assigned to them
+    def _ev_cp_assignment_ordering(self):
+        ev_ids = list(self.model.EV_ID)
+        cp_ids = list(self.model.CP_ID)
+
+        # EV i can only be assigned to CP j if an EV with a lower ID is assigned to CP j - 1
+        def ev_cp_assignment_ordering_rule(model, i, j):
+            n, m = ev_ids.index(i), cp_ids.index(j)
+            if m == 0:
+                return pyo.Constraint.Skip
+            if n < m:
+                return model.is_ev_permanently_assigned_to_cp[i, j] == 0
+            return model.is_ev_permanently_assigned_to_cp[i, j] <= sum(
+                model.is_ev_permanently_assigned_to_cp[k, cp_ids[m - 1]] for k in ev_ids[:n]
+            )
+
+        self.model.ev_cp_assignment_ordering_constraint = pyo.Constraint(
+            self.model.EV_ID, self.model.CP_ID, rule=ev_cp_assignment_ordering_rule
+        )
+
     def _even_distribution_ev_per_cp(self):
         bigM = params.num_of_evs
 
@@ -7,6 +7,8 @@ class CommonConnectionPoint:
 
     def initialise_constraints(self):
         def energy_balance_rule(model, t):
-            return model.p_grid[t] == model.p_household_load[t] + sum(model.p_ev[i, t] for i in model.EV_ID)
+            return model.p_grid[t] == model.p_household_load[t] + sum(
+                model.p_ev[i, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME
+            )
 
         self.model.ccp_constraint = pyo.Constraint(self.model.TIME, rule=energy_balance_rule)
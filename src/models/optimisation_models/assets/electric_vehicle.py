@@ -8,25 +8,46 @@ from src.models.utils.configs import (
 
 
 class ElectricVehicle:
-    def __init__(self, model, config, charging_strategy, ev_data: EVData):
+    def __init__(self, model, config, charging_strategy, ev_data: EVData, aggregated_cps: bool = False):
         self.model = model
         self.config = config
         self.charging_strategy = charging_strategy
         self.ev_data = ev_data
+        self.aggregated_cps = aggregated_cps
+        self.initialise_sets()
         self.initialise_parameters()
         self.initialise_variables()
 
+    def initialise_sets(self):
+        at_home = self.ev_data.at_home.tolist()
+        ev_position = self.ev_data.ev_position
+        time_position = self.ev_data.time_position
+
+        # Sparse index of time slots when each EV is at home, charging variables only exist on these slots
+        self.model.EV_AT_HOME = pyo.Set(
+            dimen=2,
+            initialize=[(i, t) for i in self.model.EV_ID for t in self.model.TIME
+                        if at_home[ev_position[i]][time_position[t]] == 1]
+        )
+
+        if hasattr(self.model, 'CP_ID'):
+            self.model.EV_CP_AT_HOME = pyo.Set(
+                dimen=3,
+                initialize=[(i, j, t) for i in self.model.EV_ID for j in self.model.CP_ID
+                            for t in self.model.TIME if (i, t) in self.model.EV_AT_HOME]
+            )
+
     def initialise_parameters(self):
         self.model.soc_critical = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_critical_dict)
         self.model.soc_max = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_max_dict)
         self.model.soc_init = pyo.Param(self.model.EV_ID, initialize=self.ev_data.soc_init_dict)
         self.model.ev_at_home_status = pyo.Param(self.model.EV_ID, self.model.TIME,
-                                                 initialize=lambda model, i, t:
-                                                 self.ev_data.at_home_status_dict[i].loc[t, f'EV_ID{i}'],
+                                                 initialize=lambda model, i, t: self.ev_data.at_home[
+                                                     self.ev_data.ev_position[i], self.ev_data.time_position[t]],
                                                  within=pyo.Binary)
 
     def initialise_variables(self):
-        self.model.p_ev = pyo.Var(self.model.EV_ID, self.model.TIME, within=pyo.NonNegativeReals, bounds=(0, None))
+        self.model.p_ev = pyo.Var(self.model.EV_AT_HOME, within=pyo.NonNegativeReals, bounds=(0, None))
         self.model.soc_ev = pyo.Var(self.model.EV_ID, self.model.TIME, within=pyo.NonNegativeReals,
                                     bounds=lambda model, i, t: (0, model.soc_max[i]))
 
@@ -34,7 +55,10 @@ class ElectricVehicle:
             self._scheduling_variables()
 
         if self.config == CPConfig.CONFIG_2:
-            self._ev_connection_variables()
+            if self.aggregated_cps:
+                self._aggregated_ev_connection_variables()
+            else:
+                self._ev_connection_variables()
 
         elif self.config == CPConfig.CONFIG_3:
             self._ev_connection_variables()
@@ -56,10 +80,13 @@ class ElectricVehicle:
                 self._charging_power_limit_config1_flex()
 
         elif self.config == CPConfig.CONFIG_2:
-            self._ev_connection_to_installed_cps()
-            self._ev_connection_when_at_home()
-            self._charging_power_limit_config23()
-            self._ev_cp_connection_mutual_exclusivity_constraints()
+            if self.aggregated_cps:
+                self._num_connected_evs_limit_config2_aggregated()
+                self._charging_power_limit_config2_aggregated()
+            else:
+                self._ev_connection_to_installed_cps()
+                self._charging_power_limit_config23()
+                self._ev_cp_connection_mutual_exclusivity_constraints()
 
         elif self.config == CPConfig.CONFIG_3:
             self._ev_connection_to_installed_cps()
@@ -69,17 +96,28 @@ class ElectricVehicle:
 
             self._ev_cp_power_link()
 
+    def initialise_symmetry_breaking_constraints(self):
+        # In config 2 any EV can use any installed CP, so connections are ordered at every time slot
+        if self.config == CPConfig.CONFIG_2 and not self.aggregated_cps:
+            self._ev_cp_connection_ordering()
+
     # --------------------------
     # VARIABLES
     # --------------------------
     def _ev_connection_variables(self):
         self.model.is_ev_cp_connected = pyo.Var(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME, within=pyo.Binary
+            self.model.EV_CP_AT_HOME, within=pyo.Binary
+        )
+
+    def _aggregated_ev_connection_variables(self):
+        # Aggregated config 2: whether the EV is connected to any installed CP
+        self.model.is_ev_charging = pyo.Var(
+            self.model.EV_AT_HOME, within=pyo.Binary
         )
 
     def _ev_cp_permanent_allocation_variables(self):
         self.model.p_ev_cp = pyo.Var(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME, within=pyo.NonNegativeReals
+            self.model.EV_CP_AT_HOME, within=pyo.NonNegativeReals
         )
 
     def _scheduling_variables(self):
@@ -94,7 +132,7 @@ class ElectricVehicle:
 
         if self.config == CPConfig.CONFIG_1:
             self.model.is_ev_charging = pyo.Var(
-                self.model.EV_ID, self.model.TIME, within=pyo.Binary
+                self.model.EV_AT_HOME, within=pyo.Binary
             )
 
     # --------------------------
@@ -128,10 +166,14 @@ class ElectricVehicle:
                 return model.soc_ev[i, t] == model.soc_ev[i, model.TIME.prev(t)] - self.ev_data.travel_energy_dict[i][
                     k]
 
-            # otherwise soc follows regular charging constraint
+            # soc is carried over while the EV is away
+            elif (i, t) not in model.EV_AT_HOME:
+                return model.soc_ev[i, t] == model.soc_ev[i, model.TIME.prev(t)]
+
+            # otherwise soc follows regular charging constraint, over the duration of the time slot
             else:
                 return model.soc_ev[i, t] == model.soc_ev[i, model.TIME.prev(t)] + (
-                        self.ev_data.charging_efficiency * model.p_ev[i, t])
+                        self.ev_data.charging_efficiency * params.slot_duration[t] * model.p_ev[i, t])
 
         self.model.soc_evolution = pyo.Constraint(self.model.EV_ID, self.model.TIME, rule=soc_evolution)
 
@@ -173,11 +215,13 @@ class ElectricVehicle:
         def charge_only_on_charging_days(model, i, d, j=None):
             if j is not None:
                 # Case: is_ev_cp_connected (with charging point index)
-                return (sum(model.is_ev_cp_connected[i, j, t] for t in params.T_d[d])
+                return (sum(model.is_ev_cp_connected[i, j, t] for t in params.T_d[d]
+                            if (i, j, t) in model.EV_CP_AT_HOME)
                         <= len(params.T_d[d]) * model.is_charging_day[i, d])
             else:
                 # Case: is_ev_charging (without charging point index)
-                return (sum(model.is_ev_charging[i, t] for t in params.T_d[d])
+                return (sum(model.is_ev_charging[i, t] for t in params.T_d[d]
+                            if (i, t) in model.EV_AT_HOME)
                         <= len(params.T_d[d]) * model.is_charging_day[i, d])
 
         # Apply the correct constraint based on whether CP_ID exists
@@ -195,10 +239,10 @@ class ElectricVehicle:
     # CONFIG 1 Constraint: charging power limit for opportunistic and flexible charging strategies
     def _charging_power_limit_config1_opp(self):
         def charging_power_limit_config1_opp_upper_bound(model, i, t):
-            return model.p_ev[i, t] <= model.ev_at_home_status[i, t] * model.p_cp_rated
+            return model.p_ev[i, t] <= model.p_cp_rated
 
         self.model.charging_power_limit_config1_opp_upper_bound_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=charging_power_limit_config1_opp_upper_bound
+            self.model.EV_AT_HOME, rule=charging_power_limit_config1_opp_upper_bound
         )
 
     def _charging_power_limit_config1_flex(self):
@@ -206,7 +250,7 @@ class ElectricVehicle:
             return model.p_ev[i, t] <= model.p_cp_rated
 
         self.model.charging_power_limit_config1_flex_upper_bound_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=charging_power_limit_config1_flex_upper_bound
+            self.model.EV_AT_HOME, rule=charging_power_limit_config1_flex_upper_bound
         )
 
         # Constraint linearisation
@@ -214,44 +258,57 @@ class ElectricVehicle:
             return model.p_ev[i, t] <= model.is_ev_charging[i, t] * params.p_cp_rated_max
 
         self.model.charging_power_limit_config1_flex_upper_bound_bigm_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=charging_power_limit_config1_flex_upper_bound_bigm
-        )
-
-        # EV can only be connected to CP when it is at home
-        def ev_charges_only_at_home(model, i, t):
-            return model.is_ev_charging[i, t] <= model.ev_at_home_status[i, t]
-
-        self.model.ev_charges_only_at_home_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=ev_charges_only_at_home
+            self.model.EV_AT_HOME, rule=charging_power_limit_config1_flex_upper_bound_bigm
         )
 
     # CONFIG 2 AND 3 Constraint: EVs can only be connected to installed CPs
     def _ev_connection_to_installed_cps(self):
         def ev_connection_to_installed_cps_rule(model, j, t):
-            return sum(model.is_ev_cp_connected[i, j, t] for i in model.EV_ID) <= model.is_cp_installed[j]
+            connected = [model.is_ev_cp_connected[i, j, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME]
+            if not connected:
+                return pyo.Constraint.Skip
+            return sum(connected) <= model.is_cp_installed[j]
 
         self.model.ev_connection_to_installed_cps_constraint = pyo.Constraint(
             self.model.CP_ID, self.model.TIME, rule=ev_connection_to_installed_cps_rule
         )
 
-    # CONFIG 2 Constraint: EV can only be connected to CPs when it is at home
-    def _ev_connection_when_at_home(self):
-        def ev_connection_when_at_home_rule(model, i, j, t):
-            return model.is_ev_cp_connected[i, j, t] <= model.ev_at_home_status[i, t]
+    # CONFIG 2 Constraint (aggregated): the number of connected EVs is limited by the number of installed CPs
+    def _num_connected_evs_limit_config2_aggregated(self):
+        def num_connected_evs_limit_rule(model, t):
+            connected = [model.is_ev_charging[i, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME]
+            if not connected:
+                return pyo.Constraint.Skip
+            return sum(connected) <= model.num_cp
+
+        self.model.num_connected_evs_limit_constraint = pyo.Constraint(
+            self.model.TIME, rule=num_connected_evs_limit_rule
+        )
+
+    # CONFIG 2 Constraint (aggregated): upper bound of EV charging power, depending on whether EV is connected
+    def _charging_power_limit_config2_aggregated(self):
+        def charging_power_limit_config2_aggregated_upper_bound(model, i, t):
+            return model.p_ev[i, t] <= model.p_cp_rated
 
-        self.model.ev_connection_when_at_home_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME, rule=ev_connection_when_at_home_rule
+        self.model.charging_power_limit_config2_aggregated_upper_bound_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME, rule=charging_power_limit_config2_aggregated_upper_bound
         )
 
-    # CONFIG 3 Constraint: EV can only be connected to its allocated CP and when it is at home
+        # Big M linearisation
+        def charging_power_limit_config2_aggregated_bigm(model, i, t):
+            return model.p_ev[i, t] <= model.is_ev_charging[i, t] * params.p_cp_rated_max
+
+        self.model.charging_power_limit_config2_aggregated_bigm_constraint = pyo.Constraint(
+            self.model.EV_AT_HOME, rule=charging_power_limit_config2_aggregated_bigm
+        )
+
+    # CONFIG 3 Constraint: EV can only be connected to its allocated CP (connections only exist when at home)
     def _ev_connection_to_allocated_cps_when_at_home(self):
         def ev_connection_to_allocated_cps_when_at_home_rule(model, i, j, t):
-            return (model.is_ev_cp_connected[i, j, t] <=
-                    model.is_ev_permanently_assigned_to_cp[i, j] * model.ev_at_home_status[i, t])
+            return model.is_ev_cp_connected[i, j, t] <= model.is_ev_permanently_assigned_to_cp[i, j]
 
         self.model.ev_connection_to_allocated_cps_when_at_home_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME,
-            rule=ev_connection_to_allocated_cps_when_at_home_rule
+            self.model.EV_CP_AT_HOME, rule=ev_connection_to_allocated_cps_when_at_home_rule
         )
 
     # CONFIG 2 AND 3 Constraint: upper bound of EV charging power, depending on whether EV is connected to CP
@@ -261,14 +318,14 @@ class ElectricVehicle:
             return model.p_ev[i, t] <= model.p_cp_rated
 
         self.model.charging_power_limit_config23_upper_bound_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=charging_power_limit_config23_upper_bound
+            self.model.EV_AT_HOME, rule=charging_power_limit_config23_upper_bound
         )
 
         def charging_power_limit_config23_bigm(model, i, t):
             return model.p_ev[i, t] <= sum(model.is_ev_cp_connected[i, j, t] for j in model.CP_ID) * params.p_cp_rated_max
 
         self.model.charging_power_limit_config23_bigm_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=charging_power_limit_config23_bigm
+            self.model.EV_AT_HOME, rule=charging_power_limit_config23_bigm
         )
 
     # CONFIG 2 AND 3 Constraint
@@ -277,11 +334,14 @@ class ElectricVehicle:
             return sum(model.is_ev_cp_connected[i, j, t] for j in model.CP_ID) <= 1
 
         self.model.ev_to_cp_mutual_exclusivity_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=ev_to_cp_mutual_exclusivity
+            self.model.EV_AT_HOME, rule=ev_to_cp_mutual_exclusivity
         )
 
         def cp_to_ev_mutual_exclusivity(model, j, t):
-            return sum(model.is_ev_cp_connected[i, j, t] for i in model.EV_ID) <= 1
+            connected = [model.is_ev_cp_connected[i, j, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME]
+            if not connected:
+                return pyo.Constraint.Skip
+            return sum(connected) <= 1
 
         self.model.cp_to_ev_mutual_exclusivity_constraint = pyo.Constraint(
             self.model.CP_ID, self.model.TIME, rule=cp_to_ev_mutual_exclusivity
@@ -294,7 +354,7 @@ class ElectricVehicle:
             return model.p_ev[i, t] == sum(model.p_ev_cp[i, j, t] for j in model.CP_ID)
 
         self.model.ev_power_sum = pyo.Constraint(
-            self.model.EV_ID, self.model.TIME, rule=ev_power_sum_rule
+            self.model.EV_AT_HOME, rule=ev_power_sum_rule
         )
 
         # Power is only nonzero if EV and CP are connected
@@ -303,15 +363,43 @@ class ElectricVehicle:
             return model.p_ev_cp[i, j, t] <= model.p_cp_rated
 
         self.model.cp_power_limit_upper_bound_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME, rule=cp_power_limit_upper_bound
+            self.model.EV_CP_AT_HOME, rule=cp_power_limit_upper_bound
         )
 
         def cp_power_limit_bigm(model, i, j, t):
             return model.p_ev_cp[i, j, t] <= model.is_ev_cp_connected[i, j, t] * params.p_cp_rated_max
 
         self.model.cp_power_limit_bigm_constraint = pyo.Constraint(
-            self.model.EV_ID, self.model.CP_ID, self.model.TIME, rule=cp_power_limit_bigm
+            self.model.EV_CP_AT_HOME, rule=cp_power_limit_bigm
         )
 
+    # CONFIG 2 Symmetry breaking
+    def _ev_cp_connection_ordering(self):
+        cp_ids = list(self.model.CP_ID)
+
+        # Connected EVs take the lowest CP IDs at each time slot
+        def cp_connection_ordering_rule(model, j, t):
+            if j == model.CP_ID.first():
+                return pyo.Constraint.Skip
+            connected = [i for i in model.EV_ID if (i, t) in model.EV_AT_HOME]
+            if not connected:
+                return pyo.Constraint.Skip
+            return (sum(model.is_ev_cp_connected[i, j, t] for i in connected) <=
+                    sum(model.is_ev_cp_connected[i, model.CP_ID.prev(j), t] for i in connected))
+
+        self.model.cp_connection_ordering_constraint = pyo.Constraint(
+            self.model.CP_ID, self.model.TIME, rule=cp_connection_ordering_rule
+        )
 
-
+        # An EV cannot use a CP ID higher than the number of EVs at home before it, in EV ID order
+        at_home_rank = {}
+        for t in self.model.TIME:
+            rank = 0
+            for i in self.model.EV_ID:
+                if (i, t) in self.model.EV_AT_HOME:
+                    at_home_rank[i, t] = rank
+                    rank += 1
+
+        for (i, j, t) in self.model.EV_CP_AT_HOME:
+            if cp_ids.index(j) > at_home_rank[i, t]:
+                self.model.is_ev_cp_connected[i, j, t].fix(0)
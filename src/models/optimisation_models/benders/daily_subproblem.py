@@ -0,0 +1,201 @@
+import pyomo.environ as pyo
+from src.config import params
+from src.config.ev_params import EVData
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.rolling_horizon import (
+    INVESTMENT_VARIABLES,
+    temporary_time_horizon,
+    get_window_ev_data
+)
+from src.models.utils.configs import CPConfig, ChargingStrategy, BuildBackend
+
+
+class DailySubproblem:
+    """
+    LP relaxation of the operation on one day. The decisions owned by the master problem (investment, charging days,
+    SOC at the day boundaries and weekly peak) enter through link constraints, whose duals give the Benders cuts.
+    """
+
+    def __init__(self,
+                 config: CPConfig,
+                 charging_strategy: ChargingStrategy,
+                 obj_weights: dict[str, int|float],
+                 ev_data: EVData,
+                 day,
+                 backend: BuildBackend = BuildBackend.RULES,
+                 aggregated_cps: bool = False):
+        self.day = day
+        self.obj_weights = obj_weights
+        self.is_first_day = day == next(iter(params.T_d.keys()))
+
+        # Full horizon values used by the objective terms that span days
+        week = next(w for w, days in params.D_w.items() if day in days)
+        self.num_of_timestamps_in_week = len(params.T_w[week])
+        self.max_household_load = params.household_load.iloc[:, 0].max()
+
+        # Build operational model of the day
+        timestamps = params.T_d[day]
+        with temporary_time_horizon(timestamps):
+            self.ev_data = get_window_ev_data(ev_data, timestamps, ev_data.soc_init_dict)
+            self.model = BuildModel(
+                config=config,
+                charging_strategy=charging_strategy,
+                version=f'benders_{day}',
+                obj_weights=obj_weights,
+                ev_data=self.ev_data,
+                backend=backend,
+                aggregated_cps=aggregated_cps
+            ).get_optimisation_model()
+
+        self.link_keys = []
+        self.link_rows = []
+
+        self.initialise_links()
+        self.initialise_objectives()
+
+        pyo.TransformationFactory('core.relax_integer_vars').apply_to(self.model)
+        self.model.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+    def initialise_links(self):
+        model = self.model
+        links = {}  # {link key: [(expression, sense), ...]}
+
+        # Investment decisions
+        for name in INVESTMENT_VARIABLES:
+            var = model.component(name)
+            if var is not None and var.ctype is pyo.Var:
+                for index in var:
+                    links[name, index] = [(var[index], '==')]
+
+        # Charging days, the weekly limits on them are in the master problem
+        if hasattr(model, 'is_charging_day'):
+            model.num_charging_days_constraint.deactivate()
+            model.max_num_charged_evs_daily_constraint.deactivate()
+
+            for i in model.EV_ID:
+                links['is_charging_day', i] = [(model.is_charging_day[i, self.day], '==')]
+
+        # SOC at the start and end of the day
+        t_first, t_last = model.TIME.first(), model.TIME.last()
+        for i in model.EV_ID:
+            if not self.is_first_day:
+                model.soc_evolution[i, t_first].deactivate()
+                links['soc_start', i] = [(model.soc_ev[i, t_first] - self._soc_change(i, t_first), '==')]
+
+            model.final_soc_constraint[i].deactivate()
+            links['soc_end', i] = [(model.soc_ev[i, t_last], '>=')]
+
+        # Weekly peak power
+        links['p_weekly_peak', None] = [(model.p_grid[t], '<=') for t in model.TIME]
+
+        # Link constraints have slack variables, only freed when measuring infeasibility
+        self.link_keys = list(links)
+        rows = [(n, expression, sense) for n, key in enumerate(self.link_keys) for expression, sense in links[key]]
+        self.link_rows = [n for n, _, _ in rows]
+
+        model.LINK = pyo.Set(initialize=range(len(self.link_keys)))
+        model.LINK_ROW = pyo.Set(initialize=range(len(rows)))
+        model.link_value = pyo.Param(model.LINK, mutable=True, initialize=0)
+        model.link_slack_pos = pyo.Var(model.LINK_ROW, within=pyo.NonNegativeReals)
+        model.link_slack_neg = pyo.Var(model.LINK_ROW, within=pyo.NonNegativeReals)
+
+        def link_rule(model, r):
+            n, expression, sense = rows[r]
+            body = expression + model.link_slack_pos[r] - model.link_slack_neg[r]
+
+            if sense == '==':
+                return body == model.link_value[n]
+            elif sense == '>=':
+                return body >= model.link_value[n]
+            return body <= model.link_value[n]
+
+        model.link_constraint = pyo.Constraint(model.LINK_ROW, rule=link_rule)
+
+    def _soc_change(self, i, t):
+        # SOC change at time t, as in the SOC evolution constraint
+        if t in self.ev_data.t_arr_dict[i]:
+            return -self.ev_data.travel_energy_dict[i][self.ev_data.t_arr_dict[i].index(t)]
+        elif (i, t) not in self.model.EV_AT_HOME:
+            return 0
+        return self.ev_data.charging_efficiency * params.slot_duration[t] * self.model.p_ev[i, t]
+
+    def initialise_objectives(self):
+        model = self.model
+        model.obj_function.deactivate()
+
+        # Operational part of the objective, the rest of the objective is in the master problem
+        tariff = params.tariff_dict[params.tariff_type]
+        energy_purchase_cost = sum(tariff.loc[t] * model.p_grid[t] for t in model.TIME)
+
+        high_load_penalty = sum(
+            (model.p_household_load[t] / self.max_household_load) * model.p_ev[i, t] for (i, t) in model.EV_AT_HOME
+        )
+
+        # The weekly peak is in the master problem, so only the weekly average is subtracted here
+        weekly_avg_share = (1 / self.num_of_timestamps_in_week) * sum(model.p_grid[t] for t in model.TIME)
+
+        technical_cost = (
+                sum(model.delta_p_ev[i, t] for i in model.EV_ID for t in model.TIME) +
+                high_load_penalty +
+                sum(model.delta_daily_peak_avg[d] for d in model.DAY) -
+                weekly_avg_share
+        )
+
+        model.subproblem_objective = pyo.Objective(
+            expr=(
+                    self.obj_weights['economic'] * energy_purchase_cost / 10 +
+                    self.obj_weights['technical'] * technical_cost +
+                    self.obj_weights['social'] * model.social_objective
+            ),
+            sense=pyo.minimize
+        )
+
+        # Total violation of the link constraints, minimised when the subproblem is infeasible
+        model.feasibility_objective = pyo.Objective(
+            expr=sum(model.link_slack_pos[r] + model.link_slack_neg[r] for r in model.LINK_ROW),
+            sense=pyo.minimize
+        )
+
+    def _set_feasibility_phase(self, is_feasibility_phase: bool):
+        if is_feasibility_phase:
+            self.model.subproblem_objective.deactivate()
+            self.model.feasibility_objective.activate()
+            self.model.link_slack_pos.unfix()
+            self.model.link_slack_neg.unfix()
+        else:
+            self.model.feasibility_objective.deactivate()
+            self.model.subproblem_objective.activate()
+            self.model.link_slack_pos.fix(0)
+            self.model.link_slack_neg.fix(0)
+
+    def solve(self, link_values: dict, solver_name='gurobi') -> dict:
+        """ Returns the Benders cut for the master problem values in link_values. """
+        for n, key in enumerate(self.link_keys):
+            self.model.link_value[n] = link_values[key]
+
+        solver = pyo.SolverFactory(solver_name)
+
+        # Optimality cut if the day can be operated with the master problem values, otherwise feasibility cut
+        cut_type = 'optimality'
+        self._set_feasibility_phase(False)
+        results = solver.solve(self.model, load_solutions=False)
+
+        if results.solver.termination_condition != pyo.TerminationCondition.optimal:
+            cut_type = 'feasibility'
+            self._set_feasibility_phase(True)
+            results = solver.solve(self.model, load_solutions=False)
+
+        self.model.solutions.load_from(results)
+        objective = self.model.subproblem_objective if cut_type == 'optimality' else self.model.feasibility_objective
+
+        # Cut coefficients are the duals of the link constraints, summed over the rows of each link
+        coefficients = {key: 0 for key in self.link_keys}
+        for r, n in enumerate(self.link_rows):
+            coefficients[self.link_keys[n]] += self.model.dual[self.model.link_constraint[r]]
+
+        return {
+            'type': cut_type,
+            'value': pyo.value(objective),
+            'link_values': {key: link_values[key] for key in self.link_keys},
+            'coefficients': coefficients,
+        }
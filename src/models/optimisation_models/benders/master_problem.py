@@ -0,0 +1,222 @@
+import pyomo.environ as pyo
+from src.config import params
+from src.config.ev_params import EVData
+from src.models.optimisation_models.assets.charging_point import ChargingPoint
+from src.models.optimisation_models.objectives import EconomicObjective
+from src.models.optimisation_models.rolling_horizon import INVESTMENT_VARIABLES
+from src.models.utils.configs import CPConfig, ChargingStrategy
+
+
+class MasterProblem:
+    """
+    Investment decisions, with the charging days, SOC at the day boundaries and weekly peaks that couple the days.
+    The operation of each day is approximated by Benders cuts on theta.
+    """
+
+    def __init__(self,
+                 config: CPConfig,
+                 charging_strategy: ChargingStrategy,
+                 obj_weights: dict[str, int|float],
+                 ev_data: EVData,
+                 symmetry_breaking: bool = False,
+                 aggregated_cps: bool = False):
+        self.config = config
+        self.charging_strategy = charging_strategy
+        self.obj_weights = obj_weights
+        self.ev_data = ev_data
+
+        self.model = pyo.ConcreteModel(
+            name=f'{config.value}_{charging_strategy.value}_{params.num_of_evs}EVs_benders_master'
+        )
+
+        self.initialise_sets()
+        self.days = list(self.model.DAY)
+        self.week_of_day = {d: w for w, days in params.D_w.items() for d in days}
+
+        # Investment variables and constraints
+        self.cp = ChargingPoint(self.model, config, charging_strategy, aggregated_cps)
+        self.cp.initialise_investment_constraints()
+
+        if symmetry_breaking:
+            self.cp.initialise_symmetry_breaking_constraints()
+
+        self.initialise_variables()
+        self.initialise_constraints()
+        self.initialise_objective()
+
+    def initialise_sets(self):
+        self.model.EV_ID = pyo.Set(initialize=[_ for _ in range(params.num_of_evs)])
+        self.model.DAY = pyo.Set(initialize=[_ for _ in params.T_d.keys()])
+        self.model.WEEK = pyo.Set(initialize=[_ for _ in params.D_w.keys()])
+
+    def initialise_variables(self):
+        # SOC at the end of each day, initialised for days without cuts yet
+        self.model.soc_end = pyo.Var(
+            self.model.EV_ID, self.model.DAY, within=pyo.NonNegativeReals,
+            bounds=lambda model, i, d: (self.ev_data.soc_critical_dict[i], self.ev_data.soc_max_dict[i]),
+            initialize=lambda model, i, d: self.ev_data.soc_init_dict[i]
+        )
+
+        # Weekly peak power, at least the household load peak of the week
+        household_load = params.household_load.iloc[:, 0]
+        self.model.p_weekly_peak = pyo.Var(
+            self.model.WEEK, within=pyo.NonNegativeReals,
+            bounds=lambda model, w: (household_load.loc[params.T_w[w]].max(), params.P_grid_max)
+        )
+
+        if self.charging_strategy == ChargingStrategy.FLEXIBLE:
+            self.model.num_charging_days = pyo.Var(
+                self.model.EV_ID, self.model.WEEK,
+                within=pyo.NonNegativeIntegers,
+                bounds=(params.min_num_charging_days, params.max_num_charging_days)
+            )
+            self.model.is_charging_day = pyo.Var(
+                self.model.EV_ID, self.model.DAY, within=pyo.Binary
+            )
+
+        # Operational cost of each day, bounded below by the weekly average share of the grid import
+        def theta_bounds(model, d):
+            num_of_timestamps_in_week = len(params.T_w[self.week_of_day[d]])
+            return -self.obj_weights['technical'] * params.P_grid_max * len(params.T_d[d]) / num_of_timestamps_in_week, None
+
+        self.model.theta = pyo.Var(self.model.DAY, bounds=theta_bounds)
+
+    def initialise_constraints(self):
+        # SOC at the end of the horizon is at least the initial SOC
+        def final_soc_rule(model, i):
+            return model.soc_end[i, self.days[-1]] >= self.ev_data.soc_init_dict[i]
+
+        self.model.final_soc_constraint = pyo.Constraint(self.model.EV_ID, rule=final_soc_rule)
+
+        # Relaxation of the SOC evolution over each day, so the master does not propose SOC targets that cannot be
+        # reached with the travel energy and the charging power while at home
+        def daily_soc_balance(model, i, d):
+            return model.soc_end[i, d] <= self._soc_start(i, d) - self._travel_energy(i, d) + (
+                    self.ev_data.charging_efficiency * self._num_of_timestamps_at_home(i, d) * model.p_cp_rated
+            )
+
+        self.model.daily_soc_balance_constraint = pyo.Constraint(
+            self.model.EV_ID, self.model.DAY, rule=daily_soc_balance
+        )
+
+        # Scheduling constraints for flexible charging strategy
+        if self.charging_strategy == ChargingStrategy.FLEXIBLE:
+            def num_charging_days(model, i, w):
+                return model.num_charging_days[i, w] == sum(model.is_charging_day[i, d] for d in params.D_w[w])
+
+            self.model.num_charging_days_constraint = pyo.Constraint(
+                self.model.EV_ID, self.model.WEEK, rule=num_charging_days
+            )
+
+            def max_num_charged_evs_daily(model, d):
+                return (
+                        sum(model.is_charging_day[i, d] for i in model.EV_ID) <=
+                        ((params.num_of_evs * params.max_num_charging_days) / params.length_D_w) +
+                        params.max_charged_evs_daily_margin
+                )
+
+            self.model.max_num_charged_evs_daily_constraint = pyo.Constraint(
+                self.model.DAY, rule=max_num_charged_evs_daily
+            )
+
+            # EVs only charge on charging days
+            def daily_soc_balance_charging_day(model, i, d):
+                return model.soc_end[i, d] <= self._soc_start(i, d) - self._travel_energy(i, d) + (
+                        self.ev_data.charging_efficiency * self._num_of_timestamps_at_home(i, d) *
+                        params.p_cp_rated_max * model.is_charging_day[i, d]
+                )
+
+            self.model.daily_soc_balance_charging_day_constraint = pyo.Constraint(
+                self.model.EV_ID, self.model.DAY, rule=daily_soc_balance_charging_day
+            )
+
+        self.model.benders_cuts = pyo.ConstraintList()
+
+    def _soc_start(self, i, d):
+        n = self.days.index(d)
+        return self.ev_data.soc_init_dict[i] if n == 0 else self.model.soc_end[i, self.days[n - 1]]
+
+    def _travel_energy(self, i, d):
+        return sum(
+            energy for t_arr, energy in zip(self.ev_data.t_arr_dict[i], self.ev_data.travel_energy_dict[i])
+            if t_arr in params.T_d[d]
+        )
+
+    def _num_of_timestamps_at_home(self, i, d):
+        row = self.ev_data.ev_position[i]
+        return sum(self.ev_data.at_home[row, self.ev_data.time_position[t]] for t in params.T_d[d])
+
+    def initialise_objective(self):
+        economic_obj = EconomicObjective(self.model)
+
+        investment_cost = (
+            economic_obj.investment_cost()
+            if self.config == CPConfig.CONFIG_1
+            else economic_obj.investment_cost_linearised()
+        )
+
+        supply_charge = params.daily_supply_charge_dict[params.tariff_type] * params.num_of_evs * params.num_of_days
+
+        # Objective terms that do not depend on the operation within a day
+        self.model.first_stage_cost = pyo.Expression(
+            expr=(
+                    self.obj_weights['economic'] * (investment_cost + economic_obj.maintenance_cost() + supply_charge) / 10 +
+                    self.obj_weights['technical'] * sum(self.model.p_weekly_peak[w] for w in self.model.WEEK)
+            )
+        )
+
+        self.model.obj_function = pyo.Objective(
+            expr=self.model.first_stage_cost + sum(self.model.theta[d] for d in self.model.DAY),
+            sense=pyo.minimize
+        )
+
+    def link_vars(self, day) -> dict:
+        """ Returns the master problem variables linked to the subproblem of a day, by link key. """
+        links = {}
+
+        for name in INVESTMENT_VARIABLES:
+            var = self.model.component(name)
+            if var is not None and var.ctype is pyo.Var:
+                for index in var:
+                    links[name, index] = var[index]
+
+        previous_day = self.days[self.days.index(day) - 1] if day != self.days[0] else None
+        for i in self.model.EV_ID:
+            if hasattr(self.model, 'is_charging_day'):
+                links['is_charging_day', i] = self.model.is_charging_day[i, day]
+            if previous_day is not None:
+                links['soc_start', i] = self.model.soc_end[i, previous_day]
+            links['soc_end', i] = self.model.soc_end[i, day]
+
+        links['p_weekly_peak', None] = self.model.p_weekly_peak[self.week_of_day[day]]
+
+        return links
+
+    def link_values(self, day) -> dict:
+        return {key: pyo.value(var) for key, var in self.link_vars(day).items()}
+
+    def investment_values(self) -> dict:
+        """ Returns the investment decisions in the format of ModelResults variables. """
+        investment_values = {}
+
+        for name in INVESTMENT_VARIABLES:
+            var = self.model.component(name)
+            if var is not None and var.ctype is pyo.Var:
+                investment_values[name] = (
+                    {index: pyo.value(var[index]) for index in var} if var.is_indexed() else pyo.value(var)
+                )
+
+        return investment_values
+
+    def add_cut(self, day, cut: dict):
+        link_vars = self.link_vars(day)
+
+        cut_expression = cut['value'] + sum(
+            coefficient * (link_vars[key] - cut['link_values'][key])
+            for key, coefficient in cut['coefficients'].items() if abs(coefficient) > 1e-9
+        )
+
+        if cut['type'] == 'optimality':
+            self.model.benders_cuts.add(self.model.theta[day] >= cut_expression)
+        else:
+            self.model.benders_cuts.add(cut_expression <= 0)
@@ -0,0 +1,201 @@
+import os
+import math
+import time
+import pandas as pd
+import pyomo.environ as pyo
+from concurrent.futures import ProcessPoolExecutor
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.benders.daily_subproblem import DailySubproblem
+from src.models.optimisation_models.benders.master_problem import MasterProblem
+from src.models.optimisation_models.optimisation_model import solve_model
+from src.models.optimisation_models.rolling_horizon import run_rolling_horizon_model
+from src.models.utils.log_model_info import log_with_runtime
+from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults
+
+
+# Daily subproblems are built once in each worker process and re-solved with new master problem values
+_subproblems = {}
+_subproblem_settings = {}
+
+
+def _initialise_worker(settings: dict):
+    _subproblem_settings.update(settings)
+
+
+def _solve_subproblem(day, link_values: dict) -> dict:
+    settings = dict(_subproblem_settings)
+    solver = settings.pop('solver')
+
+    if day not in _subproblems:
+        _subproblems[day] = DailySubproblem(day=day, **settings)
+
+    return _subproblems[day].solve(link_values, solver_name=solver)
+
+
+def run_benders_model(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData | None = None,
+        solver='gurobi',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        num_workers: int | None = None,
+        max_iterations: int = 50,
+        benders_gap: float = 1,
+        recovery_window_days: int = 7,
+        recovery_overlap_days: int = 1,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> tuple[ModelResults | None, pd.DataFrame]:
+    """
+    Benders decomposition with a master problem over the investment decisions and one operational subproblem per day.
+    Subproblems are LP relaxations solved in parallel worker processes, returning optimality or feasibility cuts, so
+    the upper bound of each iteration is that of the relaxed operation. Once the relaxation gap is within
+    benders_gap (%), the operation is solved with the best investment fixed, as a rolling horizon of recovery windows.
+    Returns the results and the bounds and timings of each iteration. The objective value of the recovered solution
+    and its gap to the best lower bound are in history.attrs['upper_bound'] and history.attrs['gap'].
+    """
+    # Validate config and charging strategy
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+
+    master = MasterProblem(
+        config=config_map[config],
+        charging_strategy=strategy_map[charging_strategy],
+        obj_weights=obj_weights,
+        ev_data=ev_data,
+        symmetry_breaking=symmetry_breaking,
+        aggregated_cps=aggregated_cps
+    )
+
+    subproblem_settings = {
+        'config': config_map[config],
+        'charging_strategy': strategy_map[charging_strategy],
+        'obj_weights': obj_weights,
+        'ev_data': ev_data,
+        'backend': backend_map[build_backend],
+        'aggregated_cps': aggregated_cps,
+        'solver': solver,
+    }
+
+    history = []
+    lower_bound = None
+    best_upper_bound = None
+    best_investment_values = None
+
+    with ProcessPoolExecutor(
+            max_workers=num_workers or min(len(master.days), os.cpu_count()),
+            initializer=_initialise_worker,
+            initargs=(subproblem_settings,)) as executor:
+
+        for iteration in range(1, max_iterations + 1):
+            # Solve master problem
+            (_, master_mip_gap, solver_status, termination_condition), master_time = log_with_runtime(
+                f'Solving Benders master problem (iteration {iteration})',
+                solve_model,
+                master.model,
+                version,
+                solver_name=solver,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count
+            )
+
+            if not master.model.number_of_solutions:
+                print(f'{params.RED}The Benders master problem found no solution in iteration {iteration} '
+                      f'({termination_condition}), stopping the iterations.{params.RESET}')
+                break
+
+            # The master is solved to a MIP gap or time limit, so its bound rather than its incumbent is a lower bound
+            master_bound = master.model.lower_bound
+            if master_bound is not None and math.isfinite(master_bound):
+                lower_bound = master_bound if lower_bound is None else max(lower_bound, master_bound)
+
+            # Solve daily subproblems in parallel
+            start_time = time.time()
+            link_values = [master.link_values(d) for d in master.days]
+            cuts = list(executor.map(_solve_subproblem, master.days, link_values))
+            subproblem_time = time.time() - start_time
+
+            for d, cut in zip(master.days, cuts):
+                master.add_cut(d, cut)
+
+            # Upper bound from the relaxed operational cost of a feasible master solution
+            if all(cut['type'] == 'optimality' for cut in cuts):
+                upper_bound = pyo.value(master.model.first_stage_cost) + sum(cut['value'] for cut in cuts)
+
+                if best_upper_bound is None or upper_bound < best_upper_bound:
+                    best_upper_bound = upper_bound
+                    best_investment_values = master.investment_values()
+
+            gap = None
+            if best_upper_bound is not None and lower_bound is not None:
+                gap = (abs(best_upper_bound - lower_bound) / abs(best_upper_bound)) * 100
+
+            history.append({
+                'iteration': iteration,
+                'lower_bound': lower_bound,
+                'relaxed_upper_bound': best_upper_bound,
+                'relaxation_gap': gap,
+                'feasibility_cuts': sum(cut['type'] == 'feasibility' for cut in cuts),
+                'master_time': master_time,
+                'subproblem_time': subproblem_time,
+            })
+
+            print(f'{params.YELLOW}Iteration {iteration}: '
+                  f'lower bound {lower_bound if lower_bound is None else f"{lower_bound:,.4f}"}, '
+                  f'relaxed upper bound {best_upper_bound if best_upper_bound is None else f"{best_upper_bound:,.4f}"}, '
+                  f'relaxation gap {gap if gap is None else f"{gap:.4f}%"}, '
+                  f'master {master_time:.2f}s, subproblems {subproblem_time:.2f}s{params.RESET}')
+
+            if gap is not None and gap <= benders_gap:
+                break
+
+    history = pd.DataFrame(history)
+    print(f'\nBenders iterations\n{history}')
+
+    if best_investment_values is None:
+        print(f'{params.RED}No feasible investment was found in {len(history)} Benders iterations.{params.RESET}')
+        return None, history
+
+    # Recover the operation with the best investment fixed
+    results, _ = run_rolling_horizon_model(
+        config=config,
+        charging_strategy=charging_strategy,
+        version=version,
+        obj_weights=obj_weights,
+        ev_data=ev_data,
+        window_days=recovery_window_days,
+        overlap_days=recovery_overlap_days,
+        solver=solver,
+        verbose=verbose,
+        time_limit=time_limit,
+        mip_gap=mip_gap,
+        thread_count=thread_count,
+        save_model=save_model,
+        build_backend=build_backend,
+        aggregated_cps=aggregated_cps,
+        investment_values=best_investment_values
+    )
+
+    # Upper bound from the recovered integer operation
+    if results is not None and lower_bound is not None:
+        upper_bound = sum(
+            obj_weights[objective] * results.objective_components[f'{objective}_objective']
+            for objective in ['economic', 'technical', 'social']
+        )
+        history.attrs['upper_bound'] = upper_bound
+        history.attrs['gap'] = (abs(upper_bound - lower_bound) / abs(upper_bound)) * 100
+
+        print(f'{params.YELLOW}Recovered solution: upper bound {upper_bound:,.4f}, '
+              f'gap {history.attrs["gap"]:.4f}% to the lower bound {lower_bound:,.4f}{params.RESET}')
+
+    return results, history
@@ -3,7 +3,8 @@ from src.config import params
 from src.config.ev_params import EVData
 from src.models.utils.configs import (
     CPConfig,
-    ChargingStrategy
+    ChargingStrategy,
+    BuildBackend
 )
 from src.models.optimisation_models.assets.grid import Grid
 from src.models.optimisation_models.assets.household_load import HouseholdLoad
@@ -11,6 +12,41 @@ from src.models.optimisation_models.assets.common_connection_point import Common
 from src.models.optimisation_models.assets.charging_point import ChargingPoint
 from src.models.optimisation_models.assets.electric_vehicle import ElectricVehicle
 from src.models.optimisation_models.objectives import EconomicObjective, TechnicalObjective, SocialObjective
+from src.models.optimisation_models.array_backend.common_connection_point import ArrayCommonConnectionPoint
+from src.models.optimisation_models.array_backend.charging_point import ArrayChargingPoint
+from src.models.optimisation_models.array_backend.electric_vehicle import ArrayElectricVehicle
+from src.models.optimisation_models.array_backend.objectives import (
+    ArrayEconomicObjective,
+    ArrayTechnicalObjective,
+    ArraySocialObjective
+)
+from src.models.optimisation_models.build_profiler import BuildProfiler
+from src.models.optimisation_models.valid_inequalities import add_valid_inequalities
+
+
+# Asset and objective classes used by each build backend
+BACKEND_COMPONENTS = {
+    BuildBackend.RULES: {
+        'grid': Grid,
+        'household': HouseholdLoad,
+        'ccp': CommonConnectionPoint,
+        'cp': ChargingPoint,
+        'ev': ElectricVehicle,
+        'economic': EconomicObjective,
+        'technical': TechnicalObjective,
+        'social': SocialObjective,
+    },
+    BuildBackend.ARRAY: {
+        'grid': Grid,
+        'household': HouseholdLoad,
+        'ccp': ArrayCommonConnectionPoint,
+        'cp': ArrayChargingPoint,
+        'ev': ArrayElectricVehicle,
+        'economic': ArrayEconomicObjective,
+        'technical': ArrayTechnicalObjective,
+        'social': ArraySocialObjective,
+    },
+}
 
 
 class BuildModel:
@@ -19,12 +55,22 @@ class BuildModel:
                  charging_strategy: ChargingStrategy,
                  version: str,
                  obj_weights: dict[str, int|float],
-                 ev_data: EVData):
+                 ev_data: EVData,
+                 backend: BuildBackend = BuildBackend.RULES,
+                 symmetry_breaking: bool = False,
+                 aggregated_cps: bool = False,
+                 profile: bool = False,
+                 valid_inequalities: bool = False):
         self.config = config
         self.charging_strategy = charging_strategy
         self.version = version
         self.obj_weights = obj_weights
         self.ev_data = ev_data
+        self.backend = backend
+        self.symmetry_breaking = symmetry_breaking
+        self.aggregated_cps = aggregated_cps
+        self.valid_inequalities = valid_inequalities
+        self.valid_inequalities_summary = None
 
         self.model = pyo.ConcreteModel(
             name=f'{config.value}_{charging_strategy.value}_{params.num_of_evs}EVs_{self.version}'
@@ -35,10 +81,31 @@ class BuildModel:
         # Validate configuration and charging mode
         CPConfig.validate(self.config)
         ChargingStrategy.validate(self.charging_strategy)
-
-        # Run methods
-        self.initialise_sets()
-        self.assemble_components()
+        BuildBackend.validate(self.backend)
+        if self.aggregated_cps and self.config != CPConfig.CONFIG_2:
+            raise ValueError(f"Aggregated CP formulation is only available for {CPConfig.CONFIG_2}, got {self.config}")
+        self.components = BACKEND_COMPONENTS[self.backend]
+
+        # Profile the methods of the assets, the objectives and the build steps
+        self.profiler = BuildProfiler(self.model) if profile else None
+        if self.profiler is not None:
+            self.components = {name: self.profiler.profile_class(cls) for name, cls in self.components.items()}
+            for name in ['initialise_sets', 'assemble_components', 'define_objective_components']:
+                setattr(self, name, self.profiler.profile_method(getattr(self, name), f'BuildModel.{name}'))
+            self.profiler.start()
+
+        # Run methods, tracemalloc is stopped even if a build step fails
+        try:
+            self.initialise_sets()
+            self.assemble_components()
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+
+        # Save the build profile next to the solver log
+        if self.profiler is not None:
+            self.profiler.save()
+            self.profiler.print_profile()
 
     def initialise_sets(self):
         self.model.EV_ID = pyo.Set(initialize=[_ for _ in range(params.num_of_evs)])
@@ -48,7 +115,7 @@ class BuildModel:
 
     def define_objective_components(self):
         # Economic objective
-        economic_obj = EconomicObjective(self.model)
+        economic_obj = self.components['economic'](self.model)
 
         investment_cost = (
             economic_obj.investment_cost()
@@ -66,7 +133,7 @@ class BuildModel:
         self.model.economic_objective = pyo.Expression(expr=economic_cost / 10)
 
         # Technical objective
-        technical_obj = TechnicalObjective(self.model)
+        technical_obj = self.components['technical'](self.model)
 
         technical_cost = (
                 technical_obj.f_disc() +
@@ -77,7 +144,7 @@ class BuildModel:
         self.model.technical_objective = pyo.Expression(expr=technical_cost)
 
         # Social objective
-        social_obj = SocialObjective(self.model, self.ev_data)
+        social_obj = self.components['social'](self.model, self.ev_data)
 
         social_cost = (
                 social_obj.f_soc() +
@@ -87,12 +154,17 @@ class BuildModel:
         self.model.social_objective = pyo.Expression(expr=social_cost)
 
 
+        # Objective weights are mutable so the objective can be re-weighted without rebuilding the model
+        self.model.obj_weight = pyo.Param(
+            ['economic', 'technical', 'social'], initialize=self.obj_weights, mutable=True
+        )
+
         # Objective formulation
         self.model.obj_function = pyo.Objective(
             expr=(
-                    self.obj_weights['economic'] * self.model.economic_objective +
-                    self.obj_weights['technical'] * self.model.technical_objective +
-                    self.obj_weights['social'] * self.model.social_objective
+                    self.model.obj_weight['economic'] * self.model.economic_objective +
+                    self.model.obj_weight['technical'] * self.model.technical_objective +
+                    self.model.obj_weight['social'] * self.model.social_objective
             ),
             sense=pyo.minimize
         )
@@ -104,15 +176,21 @@ class BuildModel:
 
     def assemble_components(self):
         # Initialise assets parameters and variables
-        self.assets['grid'] = Grid(self.model)
-        self.assets['household'] = HouseholdLoad(self.model)
-        self.assets['ccp'] = CommonConnectionPoint(self.model)
-        self.assets['cp'] = ChargingPoint(self.model, self.config, self.charging_strategy)
-        self.assets['ev'] = ElectricVehicle(
+        self.assets['grid'] = self.components['grid'](self.model)
+        self.assets['household'] = self.components['household'](self.model)
+        self.assets['ccp'] = self.components['ccp'](self.model)
+        self.assets['cp'] = self.components['cp'](
             self.model,
             self.config,
             self.charging_strategy,
-            self.ev_data
+            self.aggregated_cps
+        )
+        self.assets['ev'] = self.components['ev'](
+            self.model,
+            self.config,
+            self.charging_strategy,
+            self.ev_data,
+            self.aggregated_cps
         )
 
         # Initialise constraints
@@ -120,8 +198,23 @@ class BuildModel:
         self.assets['cp'].initialise_constraints()
         self.assets['ev'].initialise_constraints()
 
+        # Optional constraints removing equivalent solutions of interchangeable CPs
+        if self.symmetry_breaking:
+            self.assets['cp'].initialise_symmetry_breaking_constraints()
+            self.assets['ev'].initialise_symmetry_breaking_constraints()
+
+        # Optional cuts from the energy each EV needs in its dwell windows
+        if self.valid_inequalities:
+            self.valid_inequalities_summary = add_valid_inequalities(self.model, self.ev_data)
+
         # Define objective components
         self.define_objective_components()
 
+    def set_obj_weights(self, obj_weights: dict[str, int|float]):
+        self.obj_weights = obj_weights
+
+        for objective, weight in obj_weights.items():
+            self.model.obj_weight[objective] = weight
+
     def get_optimisation_model(self):
         return self.model
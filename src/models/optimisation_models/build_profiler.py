@@ -0,0 +1,193 @@
+import functools
+import inspect
+import itertools
+import json
+import os
+import time
+import tracemalloc
+import pandas as pd
+import pyomo.environ as pyo
+from contextlib import contextmanager
+from pyomo.core.expr.numvalue import is_potentially_variable
+from pyomo.core.expr.visitor import identify_variables
+from src.models.optimisation_models.optimisation_model import get_solver_log_path
+
+
+# Lookup helpers of the array backend, called inside the profiled methods
+UNPROFILED_METHODS = {
+    '_ev_time_dict',
+    '_ev_time_vars',
+    '_ev_at_home_vars',
+    '_ev_cp_at_home_vars',
+    '_rows_by_ev_time',
+    '_rows_by_ev_at_home',
+    '_rows_by_ev_cp_at_home',
+}
+
+SIZE_COLUMNS = ['variables', 'binaries', 'constraints', 'nonzeros', 'objective_nonzeros']
+
+
+def get_build_profile_path(name: str) -> str:
+    file_name = f'build_profile_{name}.json'
+    return os.path.join(os.path.dirname(get_solver_log_path(name)), file_name)
+
+
+def count_variables(expr) -> int:
+    return sum(1 for _ in identify_variables(expr, include_fixed=True))
+
+
+class BuildProfiler:
+    """
+    Records the wall time, peak memory and the number of variables, binaries, constraints and nonzeros added by each
+    method of the assets and objectives while a model is built.
+    """
+    def __init__(self, model: pyo.ConcreteModel):
+        self.model = model
+        self.records = {}
+        self._frames = []
+        self._counted = {}  # {component name: number of its component data already counted}
+        self._started_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def profile(self, label: str):
+        """ Profiles the block as label. Time, memory and size of nested profiled blocks are excluded from its own. """
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        if self._frames:
+            self._frames[-1]['peak_memory'] = max(self._frames[-1]['peak_memory'], peak_memory)
+        tracemalloc.reset_peak()
+
+        frame = {'start_memory': current_memory, 'peak_memory': 0, 'overhead': 0.0, 'children_time': 0.0}
+        self._frames.append(frame)
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            total_time = time.perf_counter() - start_time - frame['overhead']
+            self._frames.pop()
+            frame['peak_memory'] = max(frame['peak_memory'], tracemalloc.get_traced_memory()[1])
+
+            # Counting the added components is excluded from the time of the enclosing blocks
+            counting_start_time = time.perf_counter()
+            record = self._get_record(label)
+            record['calls'] += 1
+            record['time_s'] += total_time - frame['children_time']
+            record['total_time_s'] += total_time
+            record['peak_memory_mb'] = max(
+                record['peak_memory_mb'], (frame['peak_memory'] - frame['start_memory']) / 1024 ** 2
+            )
+            for name, count in self._count_new_components().items():
+                record[name] += count
+
+            if self._frames:
+                parent = self._frames[-1]
+                parent['overhead'] += time.perf_counter() - counting_start_time + frame['overhead']
+                parent['children_time'] += total_time
+                parent['peak_memory'] = max(parent['peak_memory'], frame['peak_memory'])
+            tracemalloc.reset_peak()
+
+    def profile_method(self, method, label: str):
+        @functools.wraps(method)
+        def profiled_method(*args, **kwargs):
+            with self.profile(label):
+                result = method(*args, **kwargs)
+
+            # Objective terms are returned as expressions instead of being added to the model
+            if result is not None and is_potentially_variable(result):
+                self._get_record(label)['objective_nonzeros'] += count_variables(result)
+
+            return result
+
+        return profiled_method
+
+    def profile_class(self, cls):
+        """ Returns a subclass of cls with every method building model components profiled. """
+        methods = {}
+        for klass in reversed(cls.__mro__[:-1]):
+            for name, attr in vars(klass).items():
+                is_profiled = (
+                        inspect.isfunction(attr) and
+                        name not in UNPROFILED_METHODS and
+                        (name == '__init__' or not name.startswith('__'))
+                )
+                if is_profiled:
+                    methods[name] = self.profile_method(attr, f'{cls.__name__}.{name}')
+
+        return type(cls.__name__, (cls,), methods)
+
+    def _get_record(self, label: str) -> dict:
+        if label not in self.records:
+            self.records[label] = {
+                'method': label,
+                'calls': 0,
+                'time_s': 0.0,
+                'total_time_s': 0.0,
+                'peak_memory_mb': 0.0,
+                **{name: 0 for name in SIZE_COLUMNS},
+            }
+
+        return self.records[label]
+
+    def _count_new_components(self) -> dict:
+        counts = {'variables': 0, 'binaries': 0, 'constraints': 0, 'nonzeros': 0}
+
+        for var in self.model.component_objects(pyo.Var, descend_into=True):
+            num_counted = self._counted.get(var.name, 0)
+            if len(var) == num_counted:
+                continue
+
+            for var_data in itertools.islice(var.values(), num_counted, None):
+                counts['variables'] += 1
+                counts['binaries'] += var_data.is_binary()
+            self._counted[var.name] = len(var)
+
+        for con in self.model.component_objects(pyo.Constraint, descend_into=True):
+            num_counted = self._counted.get(con.name, 0)
+            if len(con) == num_counted:
+                continue
+
+            for con_data in itertools.islice(con.values(), num_counted, None):
+                counts['constraints'] += 1
+                counts['nonzeros'] += count_variables(con_data.body)
+            self._counted[con.name] = len(con)
+
+        return counts
+
+    def get_profile_df(self, sort_by: str = 'time_s') -> pd.DataFrame:
+        df = pd.DataFrame(list(self.records.values()))
+        return df.sort_values(sort_by, ascending=False, ignore_index=True)
+
+    def save(self, path: str | None = None) -> str:
+        path = path or get_build_profile_path(self.model.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w') as f:
+            json.dump({'model': self.model.name, 'methods': list(self.records.values())}, f, indent=2)
+
+        return path
+
+    def print_profile(self, sort_by: str = 'time_s'):
+        print_build_profile_df(self.model.name, self.get_profile_df(sort_by))
+
+
+def print_build_profile_df(name: str, df: pd.DataFrame):
+    print(f'\nBuild profile of {name} (time_s excludes nested methods)\n{df.to_string(index=False, float_format="{:.4f}".format)}')
+
+
+def print_build_profile(path: str, sort_by: str = 'time_s'):
+    """ Prints a build profile saved as JSON, sorted by sort_by. """
+    with open(path) as f:
+        build_profile = json.load(f)
+
+    df = pd.DataFrame(build_profile['methods']).sort_values(sort_by, ascending=False, ignore_index=True)
+    print_build_profile_df(build_profile['model'], df)
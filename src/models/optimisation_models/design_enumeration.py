@@ -0,0 +1,271 @@
+import os
+import time
+import itertools
+import pandas as pd
+import pyomo.environ as pyo
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import solve_model
+from src.models.utils.configs import CPConfig
+from src.models.utils.log_model_info import log_with_runtime, print_runtime
+from src.models.utils.mapping import config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults
+
+
+# Settings shared by the fixed design subproblems, set once in each worker process
+_design_settings = {}
+
+
+def _initialise_worker(settings: dict):
+    _design_settings.update(settings)
+
+
+def get_designs(config: CPConfig) -> list[tuple]:
+    """ Returns the (CP rated power, number of CPs) designs, the number of CPs is None when it is not a decision. """
+    num_cp_options = [None] if config == CPConfig.CONFIG_1 else range(params.num_cp_min, params.num_cp_max + 1)
+    return list(itertools.product(params.p_cp_rated_options_scaled, num_cp_options))
+
+
+def get_design_label(design: tuple) -> str:
+    p_cp_rated, num_cp = design
+    label = f'{p_cp_rated * params.charging_power_resolution_factor:.2f}kW'
+    return label if num_cp is None else f'{label}_{num_cp}CPs'
+
+
+def fix_design(model: pyo.ConcreteModel, design: tuple):
+    p_cp_rated, num_cp = design
+
+    for m in params.p_cp_rated_options_scaled:
+        model.select_cp_rated_power[m].fix(int(m == p_cp_rated))
+
+    if num_cp is not None:
+        model.num_cp.fix(num_cp)
+
+
+def _build_design_model(design: tuple) -> tuple[pyo.ConcreteModel, float]:
+    settings = _design_settings
+
+    model_builder, build_time = log_with_runtime(
+        f'Building {get_design_label(design)} design',
+        BuildModel,
+        config=settings['config'],
+        charging_strategy=settings['charging_strategy'],
+        version=settings['version'],
+        obj_weights=settings['obj_weights'],
+        ev_data=settings['ev_data'],
+        backend=settings['backend'],
+        symmetry_breaking=settings['symmetry_breaking'],
+        aggregated_cps=settings['aggregated_cps']
+    )
+    model = model_builder.get_optimisation_model()
+
+    # Each design has its own solver log
+    model.name = f'{model.name}_{get_design_label(design)}'
+    fix_design(model, design)
+
+    return model, build_time
+
+
+def _solve_design_relaxation(design: tuple) -> dict:
+    """ Returns the LP relaxation bound of a design, infinite if the design is infeasible. """
+    settings = _design_settings
+    model, build_time = _build_design_model(design)
+
+    pyo.TransformationFactory('core.relax_integer_vars').apply_to(model)
+
+    try:
+        (_, _, _, termination_condition), bound_time = log_with_runtime(
+            f'Solving {model.name} LP relaxation',
+            solve_model,
+            model,
+            settings['version'],
+            solver_name=settings['solver'],
+            thread_count=settings['thread_count']
+        )
+        lower_bound = (
+            pyo.value(model.obj_function)
+            if termination_condition == pyo.TerminationCondition.optimal
+            else float('inf')
+        )
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during the {get_design_label(design)} LP relaxation: {e}.{params.RESET}')
+        lower_bound, bound_time = float('inf'), None
+
+    return {
+        'design': design,
+        'lower_bound': lower_bound,
+        'build_time': build_time,
+        'bound_time': bound_time,
+    }
+
+
+def _solve_design(design: tuple) -> dict:
+    settings = _design_settings
+    model, build_time = _build_design_model(design)
+
+    try:
+        (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+            f'Solving {model.name} model',
+            solve_model,
+            model,
+            settings['version'],
+            solver_name=settings['solver'],
+            verbose=settings['verbose'],
+            time_limit=settings['time_limit'],
+            mip_gap=settings['mip_gap'],
+            thread_count=settings['thread_count']
+        )
+
+        results = ModelResults(
+            model=solved_model,
+            config=settings['config'],
+            charging_strategy=settings['charging_strategy'],
+            mip_gap=calc_mip_gap,
+            obj_weights=settings['obj_weights'],
+            ev_data=settings['ev_data']
+        )
+
+        results.solver_status = solver_status
+        results.termination_condition = termination_condition
+
+        # EV data is attached again in the main process
+        results.ev_data = None
+        objective_value = pyo.value(solved_model.obj_function)
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during the {get_design_label(design)} optimisation: {e}.{params.RESET}')
+        results, objective_value, solving_time, termination_condition = None, None, None, None
+
+    return {
+        'design': design,
+        'objective_value': objective_value,
+        'results': results,
+        'build_time': build_time,
+        'solving_time': solving_time,
+        'termination_condition': termination_condition,
+    }
+
+
+def run_design_enumeration_model(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData | None = None,
+        solver='gurobi',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        num_workers: int | None = None,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> ModelResults | None:
+    """
+    Solves one model per CP rated power option (and number of CPs for configs 2 and 3) with the design fixed,
+    in a process pool. Designs are solved in order of their LP relaxation bound, and designs whose bound is
+    not below the best solution found are pruned.
+    Returns the results of the best design, with the timings of each design in design_timings.
+    """
+    ev_data = ev_data or load_ev_data()
+    designs = get_designs(config_map[config])
+    num_workers = num_workers or min(len(designs), os.cpu_count())
+
+    design_settings = {
+        'config': config_map[config],
+        'charging_strategy': strategy_map[charging_strategy],
+        'version': version,
+        'obj_weights': obj_weights,
+        'ev_data': ev_data,
+        'backend': backend_map[build_backend],
+        'symmetry_breaking': symmetry_breaking,
+        'aggregated_cps': aggregated_cps,
+        'solver': solver,
+        'verbose': verbose,
+        'time_limit': time_limit,
+        'mip_gap': mip_gap,
+        # Share the CPU threads between the workers
+        'thread_count': thread_count or max(1, os.cpu_count() // num_workers),
+    }
+
+    design_timings = {}
+    best = None
+    start_time = time.time()
+
+    with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_initialise_worker,
+            initargs=(design_settings,)) as executor:
+
+        # Lower bound of each design from its LP relaxation
+        for bound in executor.map(_solve_design_relaxation, designs):
+            design_timings[bound['design']] = {
+                'design': get_design_label(bound['design']),
+                'lower_bound': bound['lower_bound'],
+                'objective_value': None,
+                'status': None,
+                'build_time': bound['build_time'],
+                'bound_time': bound['bound_time'],
+                'solving_time': None,
+                'termination_condition': None,
+            }
+
+        queue = sorted(designs, key=lambda d: design_timings[d]['lower_bound'])
+        running = {}
+
+        def submit_next_design():
+            while queue:
+                design = queue.pop(0)
+                timings = design_timings[design]
+
+                if timings['lower_bound'] == float('inf'):
+                    timings['status'] = 'infeasible'
+                elif best is not None and timings['lower_bound'] >= best['objective_value']:
+                    timings['status'] = 'pruned'
+                else:
+                    running[executor.submit(_solve_design, design)] = design
+                    return
+
+        for _ in range(num_workers):
+            submit_next_design()
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                outcome = future.result()
+                timings = design_timings[running.pop(future)]
+
+                timings['objective_value'] = outcome['objective_value']
+                timings['status'] = 'solved' if outcome['results'] is not None else 'failed'
+                timings['solving_time'] = outcome['solving_time']
+                timings['termination_condition'] = outcome['termination_condition']
+
+                if outcome['results'] is not None and (
+                        best is None or outcome['objective_value'] < best['objective_value']):
+                    best = outcome
+
+                submit_next_design()
+
+    design_timings = pd.DataFrame(list(design_timings.values()))
+    print(f'\nDesign enumeration timings\n{design_timings}')
+
+    if best is None:
+        print(f'{params.RED}No design could be solved.{params.RESET}')
+        return None
+
+    print_runtime(f'Best design {get_design_label(best["design"])} found', time.time() - start_time)
+
+    results = best['results']
+    results.ev_data = ev_data
+    results.design_timings = design_timings
+
+    # Save results to pickle
+    if save_model:
+        results.save_model_to_pickle(version=version)
+
+    return results
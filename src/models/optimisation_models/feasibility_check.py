@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from src.config import params
+from src.config.ev_params import EVData
+
+
+TOLERANCE = 1e-6
+
+FEASIBILITY_COLUMNS = ['ev_id', 'trip', 'constraint', 'time', 'required_soc', 'max_soc', 'shortfall']
+
+
+def get_max_charging_energy(ev_data: EVData, respect_no_charging_time: bool = False) -> np.ndarray:
+    """
+    Returns the (EV, TIME) energy each EV gets charging at the highest rated power. Charging only changes the SOC at
+    home slots that are not the first slot or an arrival.
+    """
+    energy_per_slot = np.array([
+        ev_data.charging_efficiency * params.slot_duration[t] * params.p_cp_rated_max for t in params.timestamps
+    ])
+    energy = ev_data.at_home * energy_per_slot
+    energy[:, 0] = 0
+
+    for i, n in ev_data.ev_position.items():
+        arrivals = [ev_data.time_position[t] for t in ev_data.t_arr_dict[i] if t in ev_data.time_position]
+        energy[n, arrivals] = 0
+
+    # The simulation models do not charge at night, the optimisation models do
+    if respect_no_charging_time:
+        no_charging = np.isin(np.array([t.time() for t in params.timestamps]), params.no_charging_time)
+        energy[:, no_charging] = 0
+
+    return energy
+
+
+def get_trip_matrix(ev_data: EVData, times_dict: dict) -> np.ndarray:
+    """ Returns the (EV, TIME) travel energy of each trip at its departure or arrival slot in times_dict. """
+    trips = np.zeros(ev_data.at_home.shape)
+    for i, n in ev_data.ev_position.items():
+        for t, travel_energy in zip(times_dict[i], ev_data.travel_energy_dict[i]):
+            if t in ev_data.time_position:
+                trips[n, ev_data.time_position[t]] = travel_energy
+
+    return trips
+
+
+def simulate_max_soc(ev_data: EVData, respect_no_charging_time: bool = False) -> np.ndarray:
+    """ Returns the (EV, TIME) highest SOC each EV can reach, charging at the highest rated power whenever it can. """
+    charging_energy = get_max_charging_energy(ev_data, respect_no_charging_time)
+    arrival_travel_energy = get_trip_matrix(ev_data, ev_data.t_arr_dict)
+    evs = sorted(ev_data.ev_position, key=ev_data.ev_position.get)
+    soc_max = np.array([ev_data.soc_max_dict[i] for i in evs])
+
+    soc = np.empty(ev_data.at_home.shape)
+    soc[:, 0] = [ev_data.soc_init_dict[i] for i in evs]
+    for k in range(1, soc.shape[1]):
+        soc[:, k] = np.minimum(soc[:, k - 1] + charging_energy[:, k], soc_max) - arrival_travel_energy[:, k]
+
+    return soc
+
+
+def check_ev_feasibility(ev_data: EVData, respect_no_charging_time: bool = False) -> pd.DataFrame:
+    """
+    Checks without a solver that every EV can meet minimum_required_soc_at_departure and final_soc_rule, by charging
+    at the highest rated power in every slot it is at home. The highest SOC reachable is an upper bound on the SOC of
+    any solution, so each returned row is a trip or a horizon end that no model can satisfy.
+    """
+    soc = simulate_max_soc(ev_data, respect_no_charging_time)
+
+    rows = []
+    for i, n in ev_data.ev_position.items():
+        soc_critical = ev_data.soc_critical_dict[i]
+
+        for k, (t_dep, travel_energy) in enumerate(zip(ev_data.t_dep_dict[i], ev_data.travel_energy_dict[i])):
+            if t_dep not in ev_data.time_position:
+                continue
+
+            required_soc = soc_critical + travel_energy
+            max_soc = soc[n, ev_data.time_position[t_dep]]
+            if max_soc < required_soc - TOLERANCE:
+                rows.append((i, k, 'minimum_required_soc_at_departure', t_dep, required_soc, max_soc))
+
+        required_soc = ev_data.soc_init_dict[i]
+        max_soc = soc[n, -1]
+        if max_soc < required_soc - TOLERANCE:
+            rows.append((i, None, 'final_soc', params.timestamps[-1], required_soc, max_soc))
+
+    df = pd.DataFrame(rows, columns=FEASIBILITY_COLUMNS[:-1])
+    df['shortfall'] = df['required_soc'] - df['max_soc']
+
+    return df
+
+
+def get_infeasible_evs(violations: pd.DataFrame) -> list:
+    return sorted(violations['ev_id'].unique().tolist())
+
+
+def print_feasibility_report(violations: pd.DataFrame):
+    if violations.empty:
+        print('Feasibility check passed: every EV can meet its departure and final SOC.')
+        return
+
+    print(
+        f'{params.RED}Feasibility check failed: {len(violations)} SOC requirements of EVs '
+        f'{get_infeasible_evs(violations)} cannot be met.{params.RESET}'
+    )
+    print(violations.to_string(index=False, float_format='{:.4f}'.format))
@@ -0,0 +1,259 @@
+import os
+import glob
+import gzip
+import pickle
+import shutil
+import hashlib
+import dataclasses
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from types import ModuleType
+from pyomo.repn import generate_standard_repn
+from src.config import params
+from src.config.ev_params import EVData
+from src.models.utils.configs import CPConfig, ChargingStrategy, BuildBackend
+from src.models.optimisation_models.optimisation_model import get_solver_options, get_solver_log_path
+
+
+def _update_hash(hasher, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        hasher.update(repr(value.columns if isinstance(value, pd.DataFrame) else value.name).encode())
+        hasher.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        hasher.update(repr((value.dtype, value.shape)).encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.ndarray):
+        _update_hash(hasher, value.tolist())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            hasher.update(repr(key).encode())
+            _update_hash(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update_hash(hasher, item)
+    else:
+        hasher.update(repr(value).encode())
+
+
+def get_model_cache_key(config: CPConfig,
+                        charging_strategy: ChargingStrategy,
+                        obj_weights: dict[str, int|float],
+                        ev_data: EVData,
+                        backend: BuildBackend = BuildBackend.RULES,
+                        symmetry_breaking: bool = False,
+                        aggregated_cps: bool = False,
+                        presolve: bool = False,
+                        valid_inequalities: bool = False) -> str:
+    """ Returns a hash of everything the compiled model depends on, including the model building code. """
+    hasher = hashlib.sha256()
+
+    # Model parameters
+    for name, value in sorted(vars(params).items()):
+        if not name.startswith('_') and not isinstance(value, (ModuleType, type)) and not callable(value):
+            hasher.update(name.encode())
+            _update_hash(hasher, value)
+
+    # EV data, the EV instances themselves are summarised by the other fields
+    for field in dataclasses.fields(ev_data):
+        if field.name not in ('filename', 'ev_instance_list'):
+            hasher.update(field.name.encode())
+            _update_hash(hasher, getattr(ev_data, field.name))
+
+    _update_hash(hasher, [
+        config.value, charging_strategy.value, backend.value, symmetry_breaking, aggregated_cps, presolve,
+        valid_inequalities
+    ])
+    _update_hash(hasher, obj_weights)
+
+    # Model building code
+    models_folder = os.path.dirname(__file__)
+    for path in sorted(glob.glob(os.path.join(models_folder, '**', '*.py'), recursive=True)):
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+
+    return hasher.hexdigest()
+
+
+def get_model_cache_paths(cache_key: str) -> tuple[str, str]:
+    """ Returns: (compressed MPS file path, variable mapping file path) """
+    return (
+        os.path.join(params.model_cache_folder_path, f'{cache_key}.mps.gz'),
+        os.path.join(params.model_cache_folder_path, f'{cache_key}.pkl.gz')
+    )
+
+
+def is_model_cached(cache_key: str) -> bool:
+    return all(os.path.exists(path) for path in get_model_cache_paths(cache_key))
+
+
+def save_model_to_cache(model: pyo.ConcreteModel, cache_key: str):
+    """
+    Writes the model as a compressed MPS file, with the mapping from MPS columns to model variables, the sets, and the
+    objective component expressions in terms of the MPS columns, so the results can be recovered without the model.
+    """
+    os.makedirs(params.model_cache_folder_path, exist_ok=True)
+    mps_path, mapping_path = get_model_cache_paths(cache_key)
+    tmp_path = os.path.join(params.model_cache_folder_path, f'{cache_key}_{os.getpid()}.mps')
+
+    # Write MPS file with short column names
+    _, smap_id = model.write(tmp_path, format='mps', io_options={'symbolic_solver_labels': False})
+    symbol_map = model.solutions.symbol_map[smap_id]
+
+    def get_column(var):
+        return symbol_map.byObject.get(id(var))
+
+    # Variables not written to the MPS file keep their current value
+    columns, fixed_values = {}, {}
+    for var in model.component_objects(pyo.Var, active=True):
+        columns[var.name], fixed_values[var.name] = {}, {}
+        for index in var:
+            column = get_column(var[index])
+            if column is None:
+                fixed_values[var.name][index] = var[index].value
+            else:
+                columns[var.name][index] = column
+
+    # Objective components as a constant plus linear terms of MPS columns
+    expressions = {}
+    for expression in model.component_objects(pyo.Expression, active=True):
+        repn = generate_standard_repn(expression.expr, quadratic=False)
+        if not repn.is_linear():
+            raise ValueError(f'Expression {expression.name} is not linear and cannot be cached.')
+
+        constant = pyo.value(repn.constant)
+        terms = []
+        for var, coef in zip(repn.linear_vars, repn.linear_coefs):
+            column = get_column(var)
+            if column is None:
+                constant += pyo.value(coef) * (var.value or 0)
+            else:
+                terms.append((column, pyo.value(coef)))
+
+        expressions[expression.name] = (constant, terms)
+
+    model.solutions.delete_symbol_map(smap_id)
+
+    mapping = {
+        'model_name': model.name,
+        'columns': columns,
+        'fixed_values': fixed_values,
+        'sets': {model_set.name: model_set.data() for model_set in model.component_objects(pyo.Set, active=True)},
+        'expressions': expressions,
+    }
+
+    # Write compressed files, then move them in place so parallel runs never read partial files
+    with open(tmp_path, 'rb') as f_in, gzip.open(f'{tmp_path}.gz', 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(tmp_path)
+    os.replace(f'{tmp_path}.gz', mps_path)
+
+    with gzip.open(f'{mapping_path}.{os.getpid()}', 'wb') as f:
+        pickle.dump(mapping, f)
+    os.replace(f'{mapping_path}.{os.getpid()}', mapping_path)
+
+    evict_model_cache(keep=cache_key)
+
+
+def evict_model_cache(keep: str | None = None, max_size_gb: float | None = None):
+    """ Removes the least recently used models until the cache is within its size limit. """
+    max_size = (max_size_gb or params.model_cache_max_size_gb) * 1024 ** 3
+
+    entries = {}
+    for path in glob.glob(os.path.join(params.model_cache_folder_path, '*.gz')):
+        cache_key = os.path.basename(path).split('.')[0]
+        size, last_used = entries.get(cache_key, (0, 0))
+        entries[cache_key] = (size + os.path.getsize(path), max(last_used, os.path.getmtime(path)))
+
+    total_size = sum(size for size, _ in entries.values())
+    for cache_key, (size, _) in sorted(entries.items(), key=lambda entry: entry[1][1]):
+        if total_size <= max_size:
+            break
+        if cache_key == keep:
+            continue
+
+        for path in get_model_cache_paths(cache_key):
+            if os.path.exists(path):
+                os.remove(path)
+        total_size -= size
+        print(f'Evicted cached model {cache_key[:12]} ({size / 1024 ** 2:.1f} MB)')
+
+
+def load_cached_mapping(cache_key: str) -> dict:
+    # Cache hits count as use for the eviction order
+    for path in get_model_cache_paths(cache_key):
+        os.utime(path)
+
+    with gzip.open(get_model_cache_paths(cache_key)[1], 'rb') as f:
+        return pickle.load(f)
+
+
+def get_cached_solution(mapping: dict, column_values: dict[str, float]) -> dict:
+    """ Maps MPS column values back to model variables, sets and objective components for ModelResults. """
+    variables = {}
+    for name, columns in mapping['columns'].items():
+        values = {index: column_values.get(column) for index, column in columns.items()}
+        values.update(mapping['fixed_values'][name])
+
+        # Scalar variables have a single None index
+        variables[name] = values[None] if list(values) == [None] else values
+
+    objective_components = {
+        name: constant + sum(coef * column_values[column] for column, coef in terms)
+        for name, (constant, terms) in mapping['expressions'].items()
+    }
+
+    return {
+        'variables': variables,
+        'sets': mapping['sets'],
+        'objective_components': objective_components,
+    }
+
+
+def solve_cached_model(cache_key: str, verbose=False, time_limit=None, mip_gap=None, thread_count=None):
+    """
+    Reads the cached MPS file straight into Gurobi, without building the Pyomo model.
+    Returns: (solution, mip_gap, solver_status, termination_condition)
+    """
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    mapping = load_cached_mapping(cache_key)
+    mps_path, _ = get_model_cache_paths(cache_key)
+
+    gurobi_model = gp.read(mps_path)
+    gurobi_model.setParam('LogFile', get_solver_log_path(mapping['model_name']))
+    gurobi_model.setParam('LogToConsole', int(verbose))
+    for name, value in get_solver_options(time_limit, mip_gap, thread_count).items():
+        gurobi_model.setParam(name, value)
+
+    gurobi_model.optimize()
+
+    # Same statuses as the Pyomo Gurobi interfaces
+    status_map = {
+        GRB.OPTIMAL: (pyo.SolverStatus.ok, pyo.TerminationCondition.optimal),
+        GRB.SUBOPTIMAL: (pyo.SolverStatus.warning, pyo.TerminationCondition.other),
+        GRB.INFEASIBLE: (pyo.SolverStatus.warning, pyo.TerminationCondition.infeasible),
+        GRB.INF_OR_UNBD: (pyo.SolverStatus.warning, pyo.TerminationCondition.infeasibleOrUnbounded),
+        GRB.UNBOUNDED: (pyo.SolverStatus.warning, pyo.TerminationCondition.unbounded),
+        GRB.TIME_LIMIT: (pyo.SolverStatus.aborted, pyo.TerminationCondition.maxTimeLimit),
+        GRB.INTERRUPTED: (pyo.SolverStatus.aborted, pyo.TerminationCondition.userInterrupt),
+    }
+    solver_status, termination_condition = status_map.get(
+        gurobi_model.Status, (pyo.SolverStatus.unknown, pyo.TerminationCondition.unknown)
+    )
+
+    if gurobi_model.SolCount == 0:
+        raise RuntimeError(f'No solution found for cached model {mapping["model_name"]} ({termination_condition})')
+
+    # All column values in one call
+    gurobi_vars = gurobi_model.getVars()
+    column_values = dict(zip(gurobi_model.getAttr('VarName', gurobi_vars), gurobi_model.getAttr('X', gurobi_vars)))
+
+    calc_mip_gap = None
+    upper_bound = gurobi_model.ObjVal
+    lower_bound = gurobi_model.ObjBound if gurobi_model.IsMIP else gurobi_model.ObjVal
+    if upper_bound != 0:
+        calc_mip_gap = (abs(upper_bound - lower_bound) / abs(upper_bound)) * 100
+
+    return get_cached_solution(mapping, column_values), calc_mip_gap, solver_status, termination_condition
@@ -47,7 +47,8 @@ class EconomicObjective:
                                params.tariff_type] * params.num_of_evs * params.num_of_days
 
         energy_purchase_cost = sum(
-            params.tariff_dict[params.tariff_type][t] * self.model.p_grid[t] for t in self.model.TIME
+            params.tariff_dict[params.tariff_type][t] * params.slot_duration[t] * self.model.p_grid[t]
+            for t in self.model.TIME
         )
 
         return operational_cost + energy_purchase_cost
@@ -107,9 +108,11 @@ class TechnicalObjective:
             for t in time_sets[idx]:
                 constraint_list.add(peak_var[idx] >= self.model.p_grid[t])
 
-        # Average peak constraint
+        # Average peak constraint, weighted by the duration of the time slots
         def peak_average_rule(model, idx):
-            return avg_var[idx] == (1 / len(time_sets[idx])) * sum(model.p_grid[t] for t in time_sets[idx])
+            return avg_var[idx] == (1 / sum(params.slot_duration[t] for t in time_sets[idx])) * sum(
+                params.slot_duration[t] * model.p_grid[t] for t in time_sets[idx]
+            )
 
         setattr(self.model, f"{name_prefix}_peak_average_constraint",
                 pyo.Constraint(index_set, rule=peak_average_rule))
@@ -130,7 +133,8 @@ class TechnicalObjective:
 
         # Define constraints
         high_load_penalty = sum(
-            self.model.high_load_penalty[t] * self.model.p_ev[i, t] for i in self.model.EV_ID for t in self.model.TIME)
+            self.model.high_load_penalty[t] * params.slot_duration[t] * self.model.p_ev[i, t]
+            for (i, t) in self.model.EV_AT_HOME)
 
         return high_load_penalty
 
@@ -149,6 +153,10 @@ class TechnicalObjective:
         return charging_discontinuity
 
     def _charging_discontinuity_constraints(self):
+        def p_ev(i, t):
+            # Charging power is zero when the EV is away from home
+            return self.model.p_ev[i, t] if (i, t) in self.model.EV_AT_HOME else 0
+
         self.model.charging_discontinuity_constraint = pyo.ConstraintList()
 
         for i in self.model.EV_ID:
@@ -158,14 +166,14 @@ class TechnicalObjective:
                         self.model.delta_p_ev[i, t] == 0
                     )
                 else:
-                    if self.model.ev_at_home_status[i, t] == 1:
+                    if (i, t) in self.model.EV_AT_HOME:
                         self.model.charging_discontinuity_constraint.add(
                             self.model.delta_p_ev[i, t] >=
-                            self.model.p_ev[i, t] - self.model.p_ev[i, self.model.TIME.prev(t)]
+                            p_ev(i, t) - p_ev(i, self.model.TIME.prev(t))
                         )
                         self.model.charging_discontinuity_constraint.add(
                             self.model.delta_p_ev[i, t] >=
-                            self.model.p_ev[i, self.model.TIME.prev(t)] - self.model.p_ev[i, t]
+                            p_ev(i, self.model.TIME.prev(t)) - p_ev(i, t)
                         )
 
 
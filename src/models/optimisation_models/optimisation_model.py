@@ -1,40 +1,56 @@
 import pyomo.environ as pyo
 import os
+import time
 from src.config import params
+from src.models.utils.configs import SolverInterface
 
 
-def solve_model(model, version, solver_name='gurobi', verbose=False, time_limit=None, mip_gap=None, thread_count=None):
-    """Returns: (results, mip_gap, solver_status, termination_condition)"""
-    solver = pyo.SolverFactory(solver_name)
+# Persistent solver interface of each solver name, the solver options are Gurobi parameters
+PERSISTENT_SOLVERS = {
+    'gurobi': 'gurobi_persistent',
+    'gurobi_direct': 'gurobi_persistent',
+    'gurobi_persistent': 'gurobi_persistent',
+}
+
+
+def get_solver_options(time_limit=None, mip_gap=None, thread_count=None) -> dict:
+    options = {}
 
     # Set options
     if time_limit is not None:
-        solver.options['TimeLimit'] = time_limit * 60
+        options['TimeLimit'] = time_limit * 60
     if mip_gap is not None:
-        solver.options['MIPGap'] = mip_gap / 100
-
-    # Log path
-    file_name = f'solver_log_{model.name}.log'
-    file_path = os.path.join(params.model_results_folder_path, 'solver_logs', file_name)
+        options['MIPGap'] = mip_gap / 100
 
     # Set thread count
     if thread_count is not None:
-        solver.options['Threads'] = thread_count
+        options['Threads'] = thread_count
 
     # Set solver parameters
-    solver.options['MIPFocus'] = 1  # Focus on finding good feasible solutions
-    solver.options['Heuristics'] = 0.5  # More aggressive heuristics
-    solver.options['Presolve'] = 2  # Aggressive presolve
-    solver.options['Cuts'] = 2  # Aggressive cut generation
-    solver.options['NodeMethod'] = 2  # Try barrier method at nodes for LP relaxation
-    solver.options['ImproveStartTime'] = 60  # Wait time before aggressive improvement heuristics
-    solver.options['Aggregate'] = 1  # Aggregate constraints to strengthen LP relaxation
-    solver.options['RINS'] = 10
-    solver.options['PumpPasses'] = 20
-
-    # Solve model
-    results = solver.solve(model, tee=verbose, logfile=file_path)
+    options['MIPFocus'] = 1  # Focus on finding good feasible solutions
+    options['Heuristics'] = 0.5  # More aggressive heuristics
+    options['Presolve'] = 2  # Aggressive presolve
+    options['Cuts'] = 2  # Aggressive cut generation
+    options['NodeMethod'] = 2  # Try barrier method at nodes for LP relaxation
+    options['ImproveStartTime'] = 60  # Wait time before aggressive improvement heuristics
+    options['Aggregate'] = 1  # Aggregate constraints to strengthen LP relaxation
+    options['RINS'] = 10
+    options['PumpPasses'] = 20
+
+    return options
+
+
+def set_solver_options(solver, time_limit=None, mip_gap=None, thread_count=None):
+    solver.options.update(get_solver_options(time_limit, mip_gap, thread_count))
+
+
+def get_solver_log_path(name: str) -> str:
+    file_name = f'solver_log_{name}.log'
+    return os.path.join(params.model_results_folder_path, 'solver_logs', file_name)
 
+
+def get_solver_results(results):
+    """Returns: (mip_gap, solver_status, termination_condition)"""
     # Extract info
     solver_status = results.solver.status
     termination_condition = results.solver.termination_condition
@@ -47,7 +63,117 @@ def solve_model(model, version, solver_name='gurobi', verbose=False, time_limit=
     if upper_bound and lower_bound and upper_bound != 0:
         calc_mip_gap = (abs(upper_bound - lower_bound) / abs(upper_bound)) * 100
 
-    return model, calc_mip_gap, solver_status, termination_condition
+    return calc_mip_gap, solver_status, termination_condition
+
+
+def solve_model(model, version, solver_name='gurobi', verbose=False, time_limit=None, mip_gap=None, thread_count=None,
+                warmstart=False, solver_interface=SolverInterface.FILE):
+    """
+    Returns: (results, mip_gap, solver_status, termination_condition)
+    The solve and load times are printed and stored in model.solve_timings, with the time to write the LP file and
+    read the solver output ('write_and_read') in file mode or to build the model in the solver ('write') in direct mode.
+    """
+    SolverInterface.validate(solver_interface)
+
+    if solver_interface == SolverInterface.DIRECT:
+        # Build the model in solver memory through its API instead of writing an LP file
+        start_time = time.time()
+        solver = create_persistent_solver(model, solver_name, time_limit, mip_gap, thread_count)
+        write_time = time.time() - start_time
+
+        # Logged to the same file as in file mode, the model name already ends with the version
+        results = solve_persistent_model(solver, model, version, verbose, warmstart, log_name=model.name)
+        model.solve_timings['write'] = write_time
+        log_solve_timings(model.solve_timings)
+
+        return results
+
+    solver = pyo.SolverFactory(solver_name)
+    set_solver_options(solver, time_limit, mip_gap, thread_count)
+
+    # Solve model, passing the current variable values as a MIP start if warmstart is set
+    solve_options = {'warmstart': True} if warmstart else {}
+
+    start_time = time.time()
+    results = solver.solve(
+        model, tee=verbose, logfile=get_solver_log_path(model.name), load_solutions=False, **solve_options
+    )
+    total_time = time.time() - start_time
+
+    # The LP file is written and the solver output files are read within solve, so they are only timed together, and
+    # only when the solver reports its own solve time
+    solve_time = getattr(solver, '_last_solve_time', None)
+    write_and_read_time = total_time - solve_time if solve_time is not None else None
+
+    start_time = time.time()
+    if len(results.solution) > 0:
+        model.solutions.load_from(results)
+    load_time = time.time() - start_time
+
+    model.number_of_solutions = len(results.solution)
+    model.lower_bound = results.problem.lower_bound
+
+    model.solve_timings = {
+        'write_and_read': write_and_read_time,
+        'solve': solve_time if solve_time is not None else total_time,
+        'load': load_time
+    }
+    log_solve_timings(model.solve_timings)
+
+    return model, *get_solver_results(results)
+
+
+def create_persistent_solver(model, solver_name='gurobi_persistent', time_limit=None, mip_gap=None, thread_count=None):
+    """ Ships the model to a persistent solver interface once, so it can be re-solved after objective changes. """
+    if solver_name not in PERSISTENT_SOLVERS:
+        raise ValueError(f'{solver_name} has no persistent solver interface. Allowed solvers: {list(PERSISTENT_SOLVERS)}')
+
+    solver = pyo.SolverFactory(PERSISTENT_SOLVERS[solver_name])
+    set_solver_options(solver, time_limit, mip_gap, thread_count)
+    solver.set_instance(model)
+
+    return solver
+
+
+def solve_persistent_model(solver, model, version, verbose=False, warmstart=False, objective=None, log_name=None):
+    """
+    Returns: (results, mip_gap, solver_status, termination_condition)
+    The number of solutions found is stored in model.number_of_solutions and the solver's bound on the objective in
+    model.lower_bound. Variable values are only loaded when a solution was found, otherwise they are left from the
+    previous solve. The solver log is named after log_name, or the model name and version if it is not given.
+    """
+    # Objective weights are mutable parameters, so the objective is re-sent to pick up their current values
+    solver.set_objective(model.obj_function if objective is None else objective)
+
+    # Solve model, starting from the variable values of the previous solve if warmstart is set
+    start_time = time.time()
+    results = solver.solve(
+        tee=verbose,
+        logfile=get_solver_log_path(log_name or f'{model.name}_{version}'),
+        warmstart=warmstart,
+        load_solutions=False,
+        save_results=False
+    )
+    solve_time = time.time() - start_time
+
+    # Load all variable values from the solver in one call
+    model.number_of_solutions = results.problem.number_of_solutions or 0
+    model.lower_bound = results.problem.lower_bound
+
+    start_time = time.time()
+    if model.number_of_solutions:
+        solver.load_vars()
+    load_time = time.time() - start_time
+
+    model.solve_timings = {'write': None, 'solve': solve_time, 'load': load_time}
+
+    return model, *get_solver_results(results)
+
+
+def log_solve_timings(solve_timings: dict):
+    print('Solve timings: ' + ', '.join(
+        f'{step} {runtime:.3f}s' for step, runtime in solve_timings.items() if runtime is not None
+    ))
 
 
 def log_solver_results(solver_status, termination_condition, solving_time, calc_mip_gap, time_limit=None, mip_gap=None):
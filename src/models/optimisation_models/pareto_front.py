@@ -0,0 +1,396 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import create_persistent_solver, solve_persistent_model
+from src.models.utils.log_model_info import log_with_runtime, print_runtime
+from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults, EvaluationMetrics
+
+
+# The first objective is minimised, the others are bounded by the epsilon constraints
+OBJECTIVES = ['economic', 'technical', 'social']
+
+# Weight of the slack of the epsilon constraints in the augmented objective
+SLACK_PENALTY = 1e-3
+
+TOLERANCE = 1e-6
+
+# Settings shared by the grid points, set once in each worker process
+_front_settings = {}
+
+# Model and persistent solver built by the first grid point of each worker process
+_worker_state = {}
+
+
+def _initialise_worker(settings: dict):
+    _front_settings.update(settings)
+
+
+def get_objective(model: pyo.ConcreteModel, objective: str):
+    return getattr(model, f'{objective}_objective')
+
+
+def add_epsilon_constraints(model: pyo.ConcreteModel, objectives: list[str]):
+    """
+    Adds objective + slack == rhs for each objective, and the objective minimising the first objective minus the
+    weighted slacks of the others. The rhs are variables without bounds, so the constraints are inactive until set_rhs
+    fixes their bounds, which a persistent solver updates without re-adding the rows.
+    """
+    model.EPSILON_OBJECTIVES = pyo.Set(initialize=objectives, ordered=True)
+
+    model.epsilon_rhs = pyo.Var(model.EPSILON_OBJECTIVES)
+    model.epsilon_slack = pyo.Var(model.EPSILON_OBJECTIVES, within=pyo.NonNegativeReals)
+    model.epsilon_slack_weight = pyo.Param(model.EPSILON_OBJECTIVES, initialize=0, mutable=True)
+
+    def epsilon_constraint(model, k):
+        return get_objective(model, k) + model.epsilon_slack[k] == model.epsilon_rhs[k]
+
+    model.epsilon_constraint = pyo.Constraint(model.EPSILON_OBJECTIVES, rule=epsilon_constraint)
+
+    model.augmecon_objective = pyo.Objective(
+        expr=get_objective(model, objectives[0]) - SLACK_PENALTY * sum(
+            model.epsilon_slack_weight[k] * model.epsilon_slack[k] for k in objectives[1:]
+        ),
+        sense=pyo.minimize
+    )
+    model.augmecon_objective.deactivate()
+
+
+def set_rhs(solver, model: pyo.ConcreteModel, objective: str, rhs: float | None):
+    """ Bounds the objective by rhs, or lifts the bound if rhs is None. """
+    var = model.epsilon_rhs[objective]
+    var.setlb(rhs)
+    var.setub(rhs)
+    solver.update_var(var)
+
+
+def has_solution(model: pyo.ConcreteModel, termination_condition) -> bool:
+    # Variable values of a persistent model are left from the previous solve when no solution is loaded
+    return (
+            termination_condition in [pyo.TerminationCondition.optimal, pyo.TerminationCondition.maxTimeLimit] and
+            getattr(model, 'number_of_solutions', 0) > 0
+    )
+
+
+def is_infeasible(termination_condition) -> bool:
+    return termination_condition in [
+        pyo.TerminationCondition.infeasible,
+        pyo.TerminationCondition.infeasibleOrUnbounded
+    ]
+
+
+def build_epsilon_model(settings: dict) -> tuple[BuildModel, object]:
+    model_builder = BuildModel(
+        config=settings['config'],
+        charging_strategy=settings['charging_strategy'],
+        version=settings['version'],
+        obj_weights={objective: int(objective == settings['objectives'][0]) for objective in OBJECTIVES},
+        ev_data=settings['ev_data'],
+        backend=settings['backend'],
+        symmetry_breaking=settings['symmetry_breaking'],
+        aggregated_cps=settings['aggregated_cps']
+    )
+    model = model_builder.get_optimisation_model()
+    add_epsilon_constraints(model, settings['objectives'])
+
+    solver = create_persistent_solver(
+        model,
+        solver_name=settings['solver'],
+        time_limit=settings['time_limit'],
+        mip_gap=settings['mip_gap'],
+        thread_count=settings['thread_count']
+    )
+
+    return model_builder, solver
+
+
+def get_payoff_table(model_builder: BuildModel, solver, settings: dict) -> pd.DataFrame:
+    """
+    Minimises each objective, then the others in order with the objectives already minimised bounded by their
+    minimum. Each row holds the objective values of one lexicographic optimum.
+    """
+    model = model_builder.get_optimisation_model()
+    objectives = settings['objectives']
+    payoff = pd.DataFrame(index=objectives, columns=objectives, dtype=float)
+    warmstart = False
+
+    for first in objectives:
+        order = [first] + [objective for objective in objectives if objective != first]
+
+        for num_solved, objective in enumerate(order):
+            model_builder.set_obj_weights({k: int(k == objective) for k in OBJECTIVES})
+
+            _, _, _, termination_condition = solve_persistent_model(
+                solver, model, f'{settings["version"]}_payoff_{first}', verbose=settings['verbose'],
+                warmstart=warmstart
+            )
+            if not has_solution(model, termination_condition):
+                raise ValueError(f'Minimising the {objective} objective ended with {termination_condition}')
+            warmstart = True
+
+            # Objectives already minimised are kept at their minimum
+            value = pyo.value(get_objective(model, objective))
+            if num_solved < len(order) - 1:
+                set_rhs(solver, model, objective, value + TOLERANCE * max(1, abs(value)))
+
+        payoff.loc[first] = [pyo.value(get_objective(model, objective)) for objective in objectives]
+
+        for objective in model.EPSILON_OBJECTIVES:
+            set_rhs(solver, model, objective, None)
+
+    return payoff
+
+
+def get_grid(payoff: pd.DataFrame, objectives: list[str], grid_points: int) -> dict[str, np.ndarray]:
+    """ Returns the rhs of each bounded objective, from the worst value in the payoff table to the best. """
+    grid = {}
+    for objective in objectives[1:]:
+        best, worst = payoff[objective].min(), payoff[objective].max()
+        num_points = grid_points if worst - best > TOLERANCE * max(1, abs(worst)) else 1
+        grid[objective] = np.linspace(worst, best, num_points)
+
+    return grid
+
+
+def _solve_grid_row(outer: int, num_inner: int) -> dict:
+    """
+    Solves the grid points of one rhs of the outer objective, from the loosest rhs of the inner objective to the
+    tightest. Points the slack of the last solution shows give the same solution are skipped, and the row ends at the
+    first infeasible point as all tighter points are infeasible too. Each solve starts from the previous solution.
+    """
+    settings = _front_settings
+    if not _worker_state:
+        (model_builder, solver), build_time = log_with_runtime(
+            f'Building Pareto front model in worker {os.getpid()}', build_epsilon_model, settings
+        )
+        model = model_builder.get_optimisation_model()
+
+        for k, weight in settings['slack_weights'].items():
+            model.epsilon_slack_weight[k] = weight
+
+        _worker_state.update({'model': model, 'solver': solver, 'build_time': build_time, 'warmstart': False})
+
+    model, solver = _worker_state['model'], _worker_state['solver']
+    inner_objective, outer_objective = settings['objectives'][1], settings['objectives'][-1]
+    inner_grid, outer_grid = settings['grid'][inner_objective], settings['grid'][outer_objective]
+
+    set_rhs(solver, model, outer_objective, outer_grid[outer])
+
+    points, infeasible_from, num_solved = [], num_inner, 0
+    inner = 0
+    while inner < num_inner:
+        set_rhs(solver, model, inner_objective, inner_grid[inner])
+        label = f'{settings["version"]}_pareto_{outer}_{inner}'
+
+        try:
+            (solved_model, calc_mip_gap, _, termination_condition), solving_time = log_with_runtime(
+                f'Solving {model.name} grid point ({outer}, {inner})',
+                solve_persistent_model,
+                solver,
+                model,
+                label,
+                verbose=settings['verbose'],
+                warmstart=_worker_state['warmstart'],
+                objective=model.augmecon_objective
+            )
+            num_solved += 1
+
+        except Exception as e:
+            print(f'{params.RED}An error occurred at grid point ({outer}, {inner}): {e}.{params.RESET}')
+            inner += 1
+            continue
+
+        # Early exit
+        if is_infeasible(termination_condition):
+            infeasible_from = inner
+            break
+
+        if not has_solution(solved_model, termination_condition):
+            inner += 1
+            continue
+        _worker_state['warmstart'] = True
+
+        results = ModelResults(
+            model=solved_model,
+            config=settings['config'],
+            charging_strategy=settings['charging_strategy'],
+            mip_gap=calc_mip_gap,
+            obj_weights=settings['obj_weights'],
+            ev_data=settings['ev_data']
+        )
+        metrics = EvaluationMetrics(results, settings['ev_data']).metrics
+        points.append({
+            'grid_point': (outer, inner),
+            f'{outer_objective}_rhs': outer_grid[outer],
+            f'{inner_objective}_rhs': inner_grid[inner],
+            **metrics,
+            'solving_time': solving_time,
+        })
+
+        # Bypass the tighter points the solution still satisfies
+        step = abs(inner_grid[0] - inner_grid[-1]) / (len(inner_grid) - 1) if len(inner_grid) > 1 else np.inf
+        slack = pyo.value(model.epsilon_slack[inner_objective])
+        inner += 1 + int((slack + TOLERANCE) // step)
+
+    return {'outer': outer, 'points': points, 'infeasible_from': infeasible_from, 'num_solved': num_solved}
+
+
+def get_nondominated(df: pd.DataFrame, objective_columns: list[str]) -> pd.DataFrame:
+    """ Drops repeated solutions and solutions that are no better in any objective than another solution. """
+    df = df.loc[df[objective_columns].round(6).drop_duplicates().index]
+    values = df[objective_columns].to_numpy()
+
+    is_dominated = np.array([
+        np.any(np.all(values <= row + TOLERANCE, axis=1) & np.any(values < row - TOLERANCE, axis=1))
+        for row in values
+    ], dtype=bool)
+
+    return df[~is_dominated].sort_values(objective_columns, ignore_index=True)
+
+
+def get_pareto_front_path(config: str, charging_strategy: str, version: str) -> str:
+    filename = f'pareto_front_{config}_{charging_strategy}_{params.num_of_evs}EVs_{params.num_of_days}days_{version}.csv'
+    return os.path.join(params.compiled_metrics_folder_path, filename)
+
+
+def run_pareto_front(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        ev_data: EVData | None = None,
+        objectives: list[str] | None = None,
+        grid_points: int = 10,
+        solver='gurobi_persistent',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        num_workers: int | None = None,
+        save_front: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> pd.DataFrame | None:
+    """
+    Generates the Pareto front of the economic, technical and social objectives with AUGMECON2. The payoff table is
+    built once, then each rhs of the last objective is solved as a row of grid points in a process pool whose workers
+    each hold one model in a persistent solver.
+    Returns the EvaluationMetrics of the nondominated solutions, with the payoff table in df.attrs['payoff'].
+    """
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+    objectives = objectives or OBJECTIVES
+    if sorted(objectives) != sorted(OBJECTIVES):
+        raise ValueError(f'objectives must order {OBJECTIVES}, got {objectives}')
+
+    front_settings = {
+        'config': config_map[config],
+        'charging_strategy': strategy_map[charging_strategy],
+        'version': version,
+        'objectives': objectives,
+        'obj_weights': {objective: int(objective == objectives[0]) for objective in OBJECTIVES},
+        'ev_data': ev_data,
+        'backend': backend_map[build_backend],
+        'symmetry_breaking': symmetry_breaking,
+        'aggregated_cps': aggregated_cps,
+        'solver': solver,
+        'verbose': verbose,
+        'time_limit': time_limit,
+        'mip_gap': mip_gap,
+        'thread_count': thread_count,
+    }
+    start_time = time.time()
+
+    # Payoff table, from one model in the main process
+    try:
+        (model_builder, payoff_solver), _ = log_with_runtime(
+            'Building Pareto front model', build_epsilon_model, front_settings
+        )
+        payoff, payoff_time = log_with_runtime(
+            'Building payoff table', get_payoff_table, model_builder, payoff_solver, front_settings
+        )
+        print(f'\nPayoff table\n{payoff}')
+        print_runtime('Payoff table built', payoff_time)
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during the payoff table: {e}.{params.RESET}')
+        return None
+
+    grid = get_grid(payoff, objectives, grid_points)
+    outer_objective, inner_objective = objectives[-1], objectives[1]
+    front_settings['grid'] = grid
+
+    # Slacks are scaled by the range of their objective, the first bounded objective has the largest weight
+    front_settings['slack_weights'] = {
+        objective: 10 ** -n / max(payoff[objective].max() - payoff[objective].min(), TOLERANCE)
+        for n, objective in enumerate(objectives[1:])
+    }
+
+    num_outer = len(grid[outer_objective])
+    num_workers = num_workers or min(num_outer, os.cpu_count())
+    front_settings['thread_count'] = thread_count or max(1, os.cpu_count() // num_workers)
+
+    points, num_solved = [], 0
+    with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_initialise_worker,
+            initargs=(front_settings,)) as executor:
+
+        # A point infeasible for one rhs of the outer objective is infeasible for all tighter rhs
+        infeasible_from = {}
+        queue = list(range(num_outer))
+        running = {}
+
+        def get_num_inner(outer: int) -> int:
+            return min(
+                [n for row, n in infeasible_from.items() if row < outer], default=len(grid[inner_objective])
+            )
+
+        def submit_next_row():
+            while queue:
+                outer = queue.pop(0)
+                num_inner = get_num_inner(outer)
+                if num_inner > 0:
+                    running[executor.submit(_solve_grid_row, outer, num_inner)] = outer
+                    return
+
+        for _ in range(num_workers):
+            submit_next_row()
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                running.pop(future)
+                row = future.result()
+                infeasible_from[row['outer']] = row['infeasible_from']
+                points.extend(row['points'])
+                num_solved += row['num_solved']
+
+                submit_next_row()
+
+    num_points = len(grid[inner_objective]) * num_outer
+    print_runtime(
+        f'Solved {num_solved} of {num_points} grid points for {len(points)} solutions', time.time() - start_time
+    )
+
+    if not points:
+        print(f'{params.RED}No grid point could be solved.{params.RESET}')
+        return None
+
+    objective_columns = [f'{objective}_objective' for objective in objectives]
+    df = get_nondominated(pd.DataFrame(points), objective_columns)
+    df.attrs['payoff'] = payoff
+    print(f'\nPareto front: {len(df)} nondominated solutions\n{df[objective_columns]}')
+
+    if save_front:
+        file_path = get_pareto_front_path(config, charging_strategy, version)
+        df.to_csv(file_path, index=False)
+        print(f'\nPareto front saved to:\n{file_path}')
+
+    return df
@@ -0,0 +1,216 @@
+import math
+import pandas as pd
+import pyomo.environ as pyo
+from collections import Counter
+from pyomo.repn import generate_standard_repn
+
+
+TOLERANCE = 1e-9
+
+# {delta peak average constraint list: (peak variable, average variable)}
+PEAK_AVERAGE_FAMILIES = {
+    'daily_delta_peak_avg_constraint': ('p_daily_peak', 'p_daily_avg'),
+    'weekly_delta_peak_avg_constraint': ('p_weekly_peak', 'p_weekly_avg'),
+}
+
+
+def get_family(component_data) -> str:
+    return component_data.parent_component().name
+
+
+def get_linear_row(con_data) -> dict | None:
+    """ Returns the row as {'lower', 'upper', 'constant', 'terms': [(coefficient, variable)]}, or None if not linear. """
+    repn = generate_standard_repn(con_data.body, compute_values=True, quadratic=False)
+    if not repn.is_linear():
+        return None
+
+    return {
+        'lower': None if con_data.lower is None else pyo.value(con_data.lower),
+        'upper': None if con_data.upper is None else pyo.value(con_data.upper),
+        'constant': repn.constant,
+        'terms': list(zip(repn.linear_coefs, repn.linear_vars)),
+    }
+
+
+def get_activity_bounds(terms: list) -> tuple[float, float]:
+    min_activity, max_activity = 0.0, 0.0
+    for coef, var in terms:
+        lb = -math.inf if var.lb is None else var.lb
+        ub = math.inf if var.ub is None else var.ub
+        min_activity += coef * (lb if coef > 0 else ub)
+        max_activity += coef * (ub if coef > 0 else lb)
+
+    return min_activity, max_activity
+
+
+def tighten_bounds(var, lower: float | None, upper: float | None) -> bool:
+    """ Tightens the bounds of var, and fixes it if they meet. Returns whether the bounds changed. """
+    if var.is_integer():
+        lower = None if lower is None else math.ceil(lower - TOLERANCE)
+        upper = None if upper is None else math.floor(upper + TOLERANCE)
+
+    changed = False
+    if lower is not None and (var.lb is None or lower > var.lb + TOLERANCE):
+        var.setlb(lower)
+        changed = True
+    if upper is not None and (var.ub is None or upper < var.ub - TOLERANCE):
+        var.setub(upper)
+        changed = True
+
+    if var.lb is not None and var.ub is not None:
+        if var.lb > var.ub + TOLERANCE:
+            raise ValueError(f'Presolve found the model infeasible: bounds of {var.name} are [{var.lb}, {var.ub}]')
+        if var.ub - var.lb <= TOLERANCE:
+            var.fix(var.lb)
+
+    return changed
+
+
+def remove_dominated_peak_average_rows(model: pyo.ConcreteModel, removed_rows: Counter):
+    """
+    Removes the delta >= average - peak rows. The peak is at least the power of every time slot and the average is a
+    weighted mean of the same time slots, so peak >= average and delta >= peak - average >= 0 already hold.
+    """
+    for family, (peak_name, avg_name) in PEAK_AVERAGE_FAMILIES.items():
+        if not hasattr(model, family):
+            continue
+
+        peak_vars = {id(var) for var in getattr(model, peak_name).values()}
+        avg_vars = {id(var) for var in getattr(model, avg_name).values()}
+
+        for con_data in getattr(model, family).values():
+            row = get_linear_row(con_data)
+            if row is None or not con_data.active:
+                continue
+
+            if (row['lower'] is None) == (row['upper'] is None):
+                continue
+
+            # Coefficients of the row written as ... >= lower
+            sign = 1 if row['upper'] is None else -1
+            coefs = {id(var): sign * coef for coef, var in row['terms']}
+            peak_coef = next((coef for var_id, coef in coefs.items() if var_id in peak_vars), 0)
+            avg_coef = next((coef for var_id, coef in coefs.items() if var_id in avg_vars), 0)
+
+            # delta - average + peak >= 0
+            if peak_coef > 0 and avg_coef < 0:
+                con_data.deactivate()
+                removed_rows[family, 'dominated'] += 1
+
+
+def count_columns(rows: dict, objective_vars: list) -> int:
+    row_vars = (var for row in rows.values() for _, var in row['terms'])
+    return len({id(var) for var in (*row_vars, *objective_vars) if not var.fixed})
+
+
+def presolve_model(model: pyo.ConcreteModel) -> dict:
+    """
+    Removes redundant rows from the model before it reaches the solver. Rows with a single variable become bounds,
+    rows implied by the variable bounds are removed, and variables whose bounds meet are fixed. This is repeated until
+    nothing changes. Variables only in the objective are fixed at the bound that minimises the objective.
+    """
+    removed_rows = Counter()
+    fixed_columns = Counter()
+
+    rows = {}
+    for con_data in model.component_data_objects(pyo.Constraint, active=True, descend_into=True):
+        row = get_linear_row(con_data)
+        if row is not None:
+            rows[con_data] = row
+
+    objective = next(model.component_data_objects(pyo.Objective, active=True, descend_into=True))
+    objective_repn = generate_standard_repn(objective.expr, compute_values=True, quadratic=False)
+
+    rows_before = len(rows)
+    columns_before = count_columns(rows, objective_repn.linear_vars)
+    fixed_before = {id(var) for var in model.component_data_objects(pyo.Var, descend_into=True) if var.fixed}
+
+    remove_dominated_peak_average_rows(model, removed_rows)
+    rows = {con_data: row for con_data, row in rows.items() if con_data.active}
+
+    bounds_tightened = 0
+    changed = True
+    while changed:
+        changed = False
+
+        for con_data, row in list(rows.items()):
+            # Fixed variables are moved to the constant
+            free_terms = [(coef, var) for coef, var in row['terms'] if not var.fixed]
+            constant = row['constant'] + sum(coef * var.value for coef, var in row['terms'] if var.fixed)
+            lower = None if row['lower'] is None else row['lower'] - constant
+            upper = None if row['upper'] is None else row['upper'] - constant
+
+            if not free_terms:
+                if (lower is not None and lower > TOLERANCE) or (upper is not None and upper < -TOLERANCE):
+                    raise ValueError(f'Presolve found the model infeasible: {con_data.name} has no free variables')
+                reason = 'empty'
+
+            elif len(free_terms) == 1:
+                coef, var = free_terms[0]
+                var_lower, var_upper = (lower, upper) if coef > 0 else (upper, lower)
+                is_tightened = tighten_bounds(
+                    var,
+                    None if var_lower is None else var_lower / coef,
+                    None if var_upper is None else var_upper / coef
+                )
+                bounds_tightened += is_tightened
+                changed = changed or is_tightened or var.fixed
+                reason = 'singleton_to_bound'
+
+            else:
+                min_activity, max_activity = get_activity_bounds(free_terms)
+                is_redundant = (
+                        (lower is None or min_activity >= lower - TOLERANCE) and
+                        (upper is None or max_activity <= upper + TOLERANCE)
+                )
+                if not is_redundant:
+                    continue
+                reason = 'redundant'
+
+            con_data.deactivate()
+            del rows[con_data]
+            removed_rows[get_family(con_data), reason] += 1
+
+    # Variables in no row are fixed at their best bound in the objective
+    sign = 1 if objective.sense == pyo.minimize else -1
+    row_vars = {id(var) for row in rows.values() for _, var in row['terms']}
+
+    if objective_repn.is_linear():
+        for coef, var in zip(objective_repn.linear_coefs, objective_repn.linear_vars):
+            if var.fixed or id(var) in row_vars:
+                continue
+
+            best_bound = var.lb if sign * coef >= 0 else var.ub
+            if best_bound is not None:
+                var.fix(best_bound)
+
+    for var in model.component_data_objects(pyo.Var, descend_into=True):
+        if var.fixed and id(var) not in fixed_before:
+            fixed_columns[get_family(var)] += 1
+
+    return {
+        'rows_before': rows_before,
+        'rows_after': len(rows),
+        'columns_before': columns_before,
+        'columns_after': count_columns(rows, objective_repn.linear_vars),
+        'bounds_tightened': bounds_tightened,
+        'removed_rows': dict(removed_rows),
+        'fixed_columns': dict(fixed_columns),
+    }
+
+
+def get_presolve_report_df(report: dict) -> pd.DataFrame:
+    removed_rows = pd.Series(report['removed_rows'], dtype=int)
+    df = removed_rows.unstack(fill_value=0) if not removed_rows.empty else pd.DataFrame()
+    df = df.join(pd.Series(report['fixed_columns'], name='fixed_columns', dtype=int), how='outer')
+
+    return df.fillna(0).astype(int).rename_axis('family')
+
+
+def print_presolve_report(report: dict):
+    print(
+        f"\nPresolve removed {report['rows_before'] - report['rows_after']} of {report['rows_before']} rows and "
+        f"{report['columns_before'] - report['columns_after']} of {report['columns_before']} columns, "
+        f"{report['bounds_tightened']} bounds tightened"
+    )
+    print(get_presolve_report_df(report).to_string())
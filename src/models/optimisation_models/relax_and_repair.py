@@ -0,0 +1,195 @@
+import math
+import pyomo.environ as pyo
+from src.config import params
+from src.models.optimisation_models.optimisation_model import solve_model
+from src.models.utils.configs import SolverInterface
+from src.models.optimisation_models.rolling_horizon import fix_investment_decisions
+from src.models.optimisation_models.warm_start import get_charging_days
+from src.models.results.model_results import assign_connected_evs_to_cps
+
+
+def get_variable_values(model: pyo.ConcreteModel) -> dict[str, dict | float]:
+    return {
+        var.name: {index: pyo.value(var[index]) for index in var} if var.is_indexed() else pyo.value(var)
+        for var in model.component_objects(pyo.Var, active=True)
+    }
+
+
+def repair_cp_design(model: pyo.ConcreteModel, relaxed: dict) -> dict:
+    # Smallest rated power option that covers the relaxed rated power
+    options = sorted(params.p_cp_rated_options_scaled)
+    p_cp_rated = next((m for m in options if m >= relaxed['p_cp_rated'] - 1e-6), options[-1])
+
+    repaired = {'select_cp_rated_power': {m: int(m == p_cp_rated) for m in options}}
+
+    if model.num_cp.ctype is pyo.Var:
+        # Enough CPs for the relaxed number of CPs and the peak charging power
+        peak_charging_power = max(
+            sum(relaxed['p_ev'][i, t] for i in model.EV_ID if (i, t) in model.EV_AT_HOME) for t in model.TIME
+        )
+        num_cp = math.ceil(max(relaxed['num_cp'], peak_charging_power / p_cp_rated) - 1e-6)
+        num_cp = min(max(num_cp, params.num_cp_min), params.num_cp_max)
+
+        repaired['num_cp'] = num_cp
+        repaired['num_cp_per_type'] = {m: num_cp * repaired['select_cp_rated_power'][m] for m in options}
+
+        if hasattr(model, 'is_cp_installed'):
+            repaired['is_cp_installed'] = {j: int(j < num_cp) for j in model.CP_ID}
+
+    return repaired
+
+
+def repair_ev_cp_assignment(model: pyo.ConcreteModel, relaxed: dict, num_cp: int) -> dict:
+    # EVs are spread evenly over the installed CPs, CPs with the most relaxed assignment take the extra EVs
+    assignment_values = relaxed['is_ev_permanently_assigned_to_cp']
+    installed_cps = sorted(
+        range(num_cp), key=lambda j: sum(assignment_values[i, j] for i in model.EV_ID), reverse=True
+    )
+    num_evs_per_cp, num_extra_evs = divmod(params.num_of_evs, num_cp)
+    capacity = {j: num_evs_per_cp + int(n < num_extra_evs) for n, j in enumerate(installed_cps)}
+
+    # EVs with the strongest relaxed assignment choose first
+    assigned_cp = {}
+    for i in sorted(model.EV_ID, key=lambda ev: max(assignment_values[ev, j] for j in installed_cps), reverse=True):
+        j = max((j for j in installed_cps if capacity[j] > 0), key=lambda cp: assignment_values[i, cp])
+        assigned_cp[i] = j
+        capacity[j] -= 1
+
+    num_ev_per_cp = {j: sum(assigned_cp[i] == j for i in model.EV_ID) for j in model.CP_ID}
+
+    return {
+        'is_ev_permanently_assigned_to_cp': {(i, j): int(assigned_cp[i] == j) for i in model.EV_ID for j in model.CP_ID},
+        'num_ev_per_cp': num_ev_per_cp,
+        'max_ev_per_cp': max(num_ev_per_cp[j] for j in installed_cps),
+        'min_ev_per_cp': min(num_ev_per_cp[j] for j in installed_cps),
+    }
+
+
+def repair_charging_days(model: pyo.ConcreteModel, relaxed: dict) -> dict:
+    p_ev = {(i, t): relaxed['p_ev'].get((i, t), 0) for i in model.EV_ID for t in model.TIME}
+    is_charging_day = get_charging_days(model, p_ev)
+
+    return {
+        'is_charging_day': is_charging_day,
+        'num_charging_days': {
+            (i, w): sum(is_charging_day[i, d] for d in params.D_w[w]) for i in model.EV_ID for w in model.WEEK
+        },
+    }
+
+
+def repair_connections(model: pyo.ConcreteModel, relaxed: dict, repaired: dict) -> dict:
+    """
+    Connects the EVs at home (on their charging days) with the most relaxed charging power at each time slot, up to
+    the number of CPs they can use, so the charging power is left to the final LP.
+    """
+    day_of_time = {t: d for d, timestamps in params.T_d.items() for t in timestamps}
+    is_charging_day = repaired.get('is_charging_day')
+
+    def is_eligible(i, t):
+        return (i, t) in model.EV_AT_HOME and (is_charging_day is None or is_charging_day[i, day_of_time[t]] == 1)
+
+    def priority(i, t):
+        return relaxed['p_ev'][i, t], -i
+
+    # Config 1, each EV has its own CP
+    if not hasattr(model, 'num_cp') or model.num_cp.ctype is not pyo.Var:
+        return {'is_ev_charging': {(i, t): int(is_eligible(i, t)) for (i, t) in model.is_ev_charging}}
+
+    # Config 3, each installed CP connects one of its assigned EVs
+    if hasattr(model, 'is_ev_permanently_assigned_to_cp'):
+        assignment = repaired['is_ev_permanently_assigned_to_cp']
+        is_ev_cp_connected = {key: 0 for key in model.is_ev_cp_connected}
+
+        for j in range(repaired['num_cp']):
+            assigned_evs = [i for i in model.EV_ID if assignment[i, j] == 1]
+            for t in model.TIME:
+                eligible = [i for i in assigned_evs if is_eligible(i, t)]
+                if eligible:
+                    is_ev_cp_connected[max(eligible, key=lambda i: priority(i, t)), j, t] = 1
+
+        return {'is_ev_cp_connected': is_ev_cp_connected}
+
+    # Config 2, the installed CPs connect any EVs
+    is_ev_charging = {(i, t): 0 for i in model.EV_ID for t in model.TIME}
+    for t in model.TIME:
+        eligible = sorted((i for i in model.EV_ID if is_eligible(i, t)), key=lambda i: priority(i, t), reverse=True)
+        for i in eligible[:repaired['num_cp']]:
+            is_ev_charging[i, t] = 1
+
+    if hasattr(model, 'is_ev_charging'):
+        return {'is_ev_charging': {key: is_ev_charging[key] for key in model.is_ev_charging}}
+
+    return {
+        'is_ev_cp_connected': assign_connected_evs_to_cps(
+            is_ev_charging, list(model.EV_ID), list(model.TIME), repaired['num_cp']
+        )
+    }
+
+
+def solve_relax_and_repair(model: pyo.ConcreteModel, version: str, solver_name='gurobi', verbose=False,
+                           time_limit=None, thread_count=None,
+                           solver_interface=SolverInterface.FILE) -> tuple[float, tuple]:
+    """
+    Solves the LP relaxation of the model, rounds and repairs its discrete variables, and solves the LP left with the
+    discrete variables fixed. If the repaired connections or charging days make it infeasible, they are freed in turn
+    and the model is solved again as a MIP.
+    Returns: (relaxation bound, (results, mip_gap, solver_status, termination_condition)) where the MIP gap is the gap
+    between the repaired solution and the relaxation bound.
+    """
+    # LP relaxation
+    pyo.TransformationFactory('core.relax_integer_vars').apply_to(model)
+    _, _, _, termination_condition = solve_model(
+        model, version, solver_name=solver_name, verbose=verbose, time_limit=time_limit, thread_count=thread_count,
+        solver_interface=solver_interface
+    )
+
+    if termination_condition != pyo.TerminationCondition.optimal:
+        raise RuntimeError(f'LP relaxation terminated with {termination_condition}')
+
+    relaxation_bound = pyo.value(model.obj_function)
+    relaxed = get_variable_values(model)
+    pyo.TransformationFactory('core.relax_integer_vars').apply_to(model, undo=True)
+
+    # Round and repair the discrete variables, investment decisions first
+    repair_steps = {'CP design': repair_cp_design(model, relaxed)}
+    num_cp = repair_steps['CP design'].get('num_cp')
+
+    if hasattr(model, 'is_ev_permanently_assigned_to_cp'):
+        repair_steps['EV to CP assignment'] = repair_ev_cp_assignment(model, relaxed, num_cp)
+
+    if hasattr(model, 'is_charging_day'):
+        repair_steps['charging days'] = repair_charging_days(model, relaxed)
+
+    if hasattr(model, 'is_ev_charging') or hasattr(model, 'is_ev_cp_connected'):
+        repaired = {name: values for step in repair_steps.values() for name, values in step.items()}
+        repair_steps['connections'] = repair_connections(model, relaxed, repaired)
+
+    # Only the variables fixed by a repair step are freed again, not those fixed by symmetry breaking or presolve
+    fixed_by_step = {step: fix_investment_decisions(model, values) for step, values in repair_steps.items()}
+
+    # Solve with the repaired discrete variables fixed. If that fails, the operational repair steps are freed in
+    # reverse order, down to the operational MIP with only the repaired investment fixed
+    operational_steps = [step for step in repair_steps if step in ('charging days', 'connections')]
+    while True:
+        solved_model, _, solver_status, termination_condition = solve_model(
+            model, version, solver_name=solver_name, verbose=verbose, time_limit=time_limit, thread_count=thread_count,
+            solver_interface=solver_interface
+        )
+
+        if termination_condition == pyo.TerminationCondition.optimal or (
+                termination_condition == pyo.TerminationCondition.maxTimeLimit and solved_model.number_of_solutions):
+            break
+
+        if not operational_steps:
+            raise RuntimeError(f'Operational MIP with the repaired investment terminated with {termination_condition}')
+
+        failed_step = operational_steps.pop()
+        print(f'{params.YELLOW}Solve with the repaired {failed_step} fixed terminated with {termination_condition}, '
+              f're-solving with the {failed_step} free.{params.RESET}')
+        for var in fixed_by_step[failed_step]:
+            var.unfix()
+
+    objective_value = pyo.value(solved_model.obj_function)
+    calc_mip_gap = (abs(objective_value - relaxation_bound) / abs(objective_value)) * 100
+
+    return relaxation_bound, (solved_model, calc_mip_gap, solver_status, termination_condition)
@@ -0,0 +1,544 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from contextlib import contextmanager
+from dataclasses import replace
+from collections import defaultdict
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import solve_model, log_solver_results
+from src.models.optimisation_models.rolling_horizon import (
+    temporary_time_horizon,
+    get_window_ev_data,
+    recompute_daily_variables,
+    recompute_horizon_variables,
+    horizon_objective_components
+)
+from src.models.utils.configs import CPConfig
+from src.models.utils.log_model_info import log_with_runtime, print_runtime
+from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults
+
+
+# Variables added to link the representative days, not expanded to the full horizon
+LINKING_VARIABLES = ['soc_day_start', 'soc_intra_max', 'soc_intra_min']
+
+
+# --------------------------
+# CLUSTERING
+# --------------------------
+def get_day_features(ev_data: EVData) -> tuple[list, np.ndarray]:
+    """
+    Returns the days and one feature vector per day: the household load profile, the at home status profile of each EV
+    and the travel energy of each EV, each scaled to [0, 1] over the horizon.
+    """
+    days = list(params.T_d.keys())
+    household_load = params.household_load.iloc[:, 0]
+    max_household_load = household_load.max()
+
+    travel_energy = np.zeros((len(ev_data.ev_position), len(days)))
+    day_position = {d: n for n, d in enumerate(days)}
+    for i, t_dep in ev_data.t_dep_dict.items():
+        for t, energy in zip(t_dep, ev_data.travel_energy_dict[i]):
+            travel_energy[ev_data.ev_position[i], day_position[t.date()]] += energy
+    max_travel_energy = travel_energy.max() or 1
+
+    features = []
+    for n, d in enumerate(days):
+        columns = [ev_data.time_position[t] for t in params.T_d[d]]
+        features.append(np.concatenate([
+            household_load.loc[params.T_d[d]].to_numpy() / max_household_load,
+            # Each EV weighs as much as the household load
+            ev_data.at_home[:, columns].ravel() / np.sqrt(len(ev_data.ev_position)),
+            travel_energy[:, n] / max_travel_energy,
+        ]))
+
+    return days, np.vstack(features)
+
+
+def k_medoids(distances: np.ndarray, num_clusters: int, max_iterations: int = 100) -> tuple[list[int], np.ndarray]:
+    """
+    Partitions around medoids with a greedy initialisation, so the clustering is deterministic.
+    Returns: (medoid positions, cluster of each point as a position in the medoid list)
+    """
+    num_points = len(distances)
+    if not 1 <= num_clusters <= num_points:
+        raise ValueError(f"Number of clusters must be between 1 and {num_points}, got {num_clusters}")
+
+    # Initialise medoids, each one reduces the total distance the most
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < num_clusters:
+        nearest = distances[:, medoids].min(axis=1)
+        gain = np.maximum(nearest[:, None] - distances, 0).sum(axis=0)
+        gain[medoids] = -1
+        medoids.append(int(np.argmax(gain)))
+
+    # Alternate assigning points and moving each medoid to the centre of its cluster
+    for _ in range(max_iterations):
+        labels = np.argmin(distances[:, medoids], axis=1)
+
+        new_medoids = []
+        for n in range(num_clusters):
+            members = np.flatnonzero(labels == n)
+            new_medoids.append(int(members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]))
+
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+
+    return medoids, np.argmin(distances[:, medoids], axis=1)
+
+
+def cluster_days(ev_data: EVData, num_representative_days: int) -> dict:
+    """
+    Returns {representative day: [days it represents]}, in the order of the days. The first day represents only
+    itself, so the SOC can move away from its initial value without repeating that change on other days.
+    """
+    days, features = get_day_features(ev_data)
+    clusters = {days[0]: [days[0]]}
+
+    if num_representative_days > 1:
+        distances = np.linalg.norm(features[1:, None, :] - features[None, 1:, :], axis=2)
+        medoids, labels = k_medoids(distances, num_representative_days - 1)
+        clusters.update({
+            days[1 + m]: [d for d, label in zip(days[1:], labels) if label == n] for n, m in enumerate(medoids)
+        })
+
+    return dict(sorted(clusters.items()))
+
+
+def get_representative_of(clusters: dict) -> dict:
+    """ Returns {day: its representative day} for every day in the horizon. """
+    return dict(sorted((d, r) for r, members in clusters.items() for d in members))
+
+
+def get_clusters_summary(clusters: dict) -> pd.DataFrame:
+    return pd.DataFrame([
+        {'representative_day': r, 'weight': len(members), 'days': members} for r, members in clusters.items()
+    ])
+
+
+# --------------------------
+# REDUCED MODEL
+# --------------------------
+@contextmanager
+def temporary_representative_days(representative_days: list):
+    """ Restricts the time settings in params to the representative days, which form a single week. """
+    timestamps = params.timestamps[np.isin(params.timestamps.date, representative_days)]
+
+    with temporary_time_horizon(timestamps):
+        week = next(iter(params.D_w))
+        params.D_w = {week: list(params.T_d.keys())}
+        params.T_w = {week: list(timestamps)}
+        yield
+
+
+def _soc_change(model: pyo.ConcreteModel, ev_data: EVData, i, t):
+    # SOC change at time t, as in the SOC evolution constraint
+    if t in ev_data.t_arr_dict[i]:
+        return -ev_data.travel_energy_dict[i][ev_data.t_arr_dict[i].index(t)]
+    elif (i, t) not in model.EV_AT_HOME:
+        return 0
+    return ev_data.charging_efficiency * params.slot_duration[t] * model.p_ev[i, t]
+
+
+def link_representative_days(model: pyo.ConcreteModel, ev_data: EVData, clusters: dict, soc_init_dict: dict):
+    """
+    Replaces the SOC evolution between representative days with the SOC at the start of every day in the horizon, which
+    changes by the net SOC change of its representative day. The SOC limits hold on every day through the highest and
+    lowest SOC of each representative day relative to its start (Kotzur et al., 2018).
+    """
+    representative_of = get_representative_of(clusters)
+    days = list(representative_of)
+    t_first = {r: params.T_d[r][0] for r in model.DAY}
+    t_last = {r: params.T_d[r][-1] for r in model.DAY}
+    day_of_time = {t: r for r in model.DAY for t in params.T_d[r]}
+
+    # Initialise sets and variables
+    model.HORIZON_DAY = pyo.Set(initialize=days)
+    model.soc_day_start = pyo.Var(model.EV_ID, model.HORIZON_DAY, within=pyo.NonNegativeReals,
+                                  bounds=lambda model, i, n: (0, model.soc_max[i]))
+    model.soc_intra_max = pyo.Var(model.EV_ID, model.DAY, within=pyo.Reals)
+    model.soc_intra_min = pyo.Var(model.EV_ID, model.DAY, within=pyo.Reals)
+
+    # Representative days start from the SOC at the start of their own day
+    for i in model.EV_ID:
+        for r in model.DAY:
+            model.soc_evolution[i, t_first[r]].deactivate()
+        model.final_soc_constraint[i].deactivate()
+
+    def representative_day_start(model, i, r):
+        return model.soc_ev[i, t_first[r]] - _soc_change(model, ev_data, i, t_first[r]) == model.soc_day_start[i, r]
+
+    model.representative_day_start_constraint = pyo.Constraint(model.EV_ID, model.DAY, rule=representative_day_start)
+
+    # SOC at the start of each day in the horizon
+    def soc_day_start_evolution(model, i, n):
+        if n == days[0]:
+            return model.soc_day_start[i, n] == soc_init_dict[i]
+
+        prev_n = days[days.index(n) - 1]
+        r = representative_of[prev_n]
+        return model.soc_day_start[i, n] == (
+                model.soc_day_start[i, prev_n] + model.soc_ev[i, t_last[r]] - model.soc_day_start[i, r]
+        )
+
+    model.soc_day_start_evolution_constraint = pyo.Constraint(
+        model.EV_ID, model.HORIZON_DAY, rule=soc_day_start_evolution
+    )
+
+    # Highest and lowest SOC relative to the start of the day, the lowest SOC covers the travel energy at departures
+    model.soc_intra_limits_constraint = pyo.ConstraintList()
+    for i in model.EV_ID:
+        t_dep = dict(zip(ev_data.t_dep_dict[i], ev_data.travel_energy_dict[i]))
+
+        for t in model.TIME:
+            r = day_of_time[t]
+            soc_intra = model.soc_ev[i, t] - model.soc_day_start[i, r]
+            model.soc_intra_limits_constraint.add(model.soc_intra_max[i, r] >= soc_intra)
+            model.soc_intra_limits_constraint.add(model.soc_intra_min[i, r] <= soc_intra - t_dep.get(t, 0))
+
+    def soc_day_limits(model, i, n):
+        return model.soc_day_start[i, n] + model.soc_intra_max[i, representative_of[n]] <= model.soc_max[i]
+
+    model.soc_day_upper_limit_constraint = pyo.Constraint(model.EV_ID, model.HORIZON_DAY, rule=soc_day_limits)
+
+    def soc_day_lower_limits(model, i, n):
+        return model.soc_day_start[i, n] + model.soc_intra_min[i, representative_of[n]] >= model.soc_critical[i]
+
+    model.soc_day_lower_limit_constraint = pyo.Constraint(model.EV_ID, model.HORIZON_DAY, rule=soc_day_lower_limits)
+
+    # SOC at the end of the horizon
+    def final_soc(model, i):
+        r = representative_of[days[-1]]
+        return model.soc_day_start[i, days[-1]] + model.soc_ev[i, t_last[r]] - model.soc_day_start[i, r] >= soc_init_dict[i]
+
+    model.representative_final_soc_constraint = pyo.Constraint(model.EV_ID, rule=final_soc)
+
+
+def weight_charging_days(model: pyo.ConcreteModel, clusters: dict, num_of_weeks: float):
+    """ The limits on charging days per week hold for the average week of the horizon. """
+    model.num_charging_days_constraint.deactivate()
+
+    for var in model.num_charging_days.values():
+        var.domain = pyo.NonNegativeReals
+
+    def num_charging_days(model, i, w):
+        return model.num_charging_days[i, w] == (1 / num_of_weeks) * sum(
+            len(clusters[r]) * model.is_charging_day[i, r] for r in model.DAY
+        )
+
+    model.representative_num_charging_days_constraint = pyo.Constraint(
+        model.EV_ID, model.WEEK, rule=num_charging_days
+    )
+
+
+def weight_objectives(model: pyo.ConcreteModel, config: CPConfig, ev_data: EVData, clusters: dict,
+                      horizon_values: dict):
+    """
+    Replaces the objective components with their values over the full horizon, where the terms of each representative
+    day count once for every day it represents.
+    """
+    weight = {r: len(members) for r, members in clusters.items()}
+    day_of_time = {t: r for r in model.DAY for t in params.T_d[r]}
+    num_of_days = horizon_values['num_of_days']
+
+    # Economic objective
+    num_cp = params.num_of_evs if config == CPConfig.CONFIG_1 else model.num_cp
+    if config == CPConfig.CONFIG_1:
+        investment_cost = num_cp * sum(
+            params.investment_cost[m] * model.select_cp_rated_power[m] for m in params.p_cp_rated_options_scaled
+        )
+    else:
+        investment_cost = sum(
+            model.num_cp_per_type[m] * params.investment_cost[m] for m in params.p_cp_rated_options_scaled
+        )
+
+    maintenance_cost = (params.annual_maintenance_cost / 365) * num_of_days * num_cp
+    energy_purchase_cost = params.daily_supply_charge_dict[params.tariff_type] * params.num_of_evs * num_of_days + sum(
+        weight[day_of_time[t]] * params.tariff_dict[params.tariff_type][t] * model.p_grid[t] for t in model.TIME
+    )
+
+    model.economic_objective.set_value((investment_cost + maintenance_cost + energy_purchase_cost) / 10)
+
+    # Technical objective, the high load penalty is relative to the highest load of the horizon
+    model.technical_objective.set_value(
+        sum(weight[day_of_time[t]] * model.delta_p_ev[i, t] for i in model.EV_ID for t in model.TIME) +
+        sum(
+            weight[day_of_time[t]] * (model.p_household_load[t] / horizon_values['max_household_load']) *
+            model.p_ev[i, t] for (i, t) in model.EV_AT_HOME
+        ) +
+        sum(weight[d] * model.delta_daily_peak_avg[d] for d in model.DAY) +
+        horizon_values['num_of_weeks'] * sum(model.delta_weekly_peak_avg[w] for w in model.WEEK)
+    )
+
+    # Social objective, the SOC at departure is taken from the start of every day in the horizon
+    representative_of = get_representative_of(clusters)
+    soc_max_deviation = sum(
+        model.soc_max[i] - (model.soc_day_start[i, n] + model.soc_ev[i, t] - model.soc_day_start[i, r])
+        for n, r in representative_of.items() for i in model.EV_ID
+        for t in ev_data.t_dep_dict[i] if day_of_time[t] == r
+    )
+
+    model.social_objective.set_value(
+        soc_max_deviation +
+        sum(weight[day_of_time[t]] * model.soc_avg_deviation[i, t] for i in model.EV_ID for t in model.TIME)
+    )
+
+
+# --------------------------
+# EXPANSION
+# --------------------------
+def shift_key(key, offset: datetime.timedelta):
+    """ Moves the TIME and DAY elements of a key by offset. """
+    if isinstance(key, tuple):
+        return tuple(shift_key(k, offset) for k in key)
+    if isinstance(key, (pd.Timestamp, datetime.date)):
+        return key + offset
+    return key
+
+
+def get_key_day(key) -> datetime.date | None:
+    """ Returns the day of the TIME or DAY element of a key, None for other keys. """
+    for k in (key if isinstance(key, tuple) else (key,)):
+        if isinstance(k, pd.Timestamp):
+            return k.date()
+        if isinstance(k, datetime.date):
+            return k
+    return None
+
+
+def get_expanded_ev_data(ev_data: EVData, clusters: dict) -> EVData:
+    """ Returns EV data where every day has the trips and at home status of its representative day. """
+    representative_of = get_representative_of(clusters)
+    offsets = {n: n - r for n, r in representative_of.items()}
+
+    at_home = ev_data.at_home.copy()
+    for n, r in representative_of.items():
+        columns = [ev_data.time_position[t] for t in params.T_d[n]]
+        representative_columns = [ev_data.time_position[t] for t in params.T_d[r]]
+        at_home[:, columns] = ev_data.at_home[:, representative_columns]
+
+    t_arr_dict, t_dep_dict, travel_energy_dict = {}, {}, {}
+    for i in ev_data.t_dep_dict:
+        trips = list(zip(ev_data.t_dep_dict[i], ev_data.t_arr_dict[i], ev_data.travel_energy_dict[i]))
+        expanded_trips = [
+            (t_dep + offsets[n], t_arr + offsets[n], energy)
+            for n, r in representative_of.items() for t_dep, t_arr, energy in trips if t_dep.date() == r
+        ]
+        t_dep_dict[i] = [t_dep for t_dep, _, _ in expanded_trips]
+        t_arr_dict[i] = [t_arr for _, t_arr, _ in expanded_trips]
+        travel_energy_dict[i] = [energy for _, _, energy in expanded_trips]
+
+    t_dep_on_day = defaultdict(list)
+    for i, times in t_dep_dict.items():
+        for t in times:
+            t_dep_on_day[t.date()].append((i, t))
+
+    at_home_status_dict = {
+        i: pd.DataFrame(
+            at_home[ev_data.ev_position[i]], index=params.timestamps, columns=ev_data.at_home_status_dict[i].columns
+        )
+        for i in ev_data.at_home_status_dict
+    }
+
+    return replace(
+        ev_data,
+        at_home_status_dict=at_home_status_dict,
+        at_home=at_home,
+        t_arr_dict=t_arr_dict,
+        t_dep_dict=t_dep_dict,
+        travel_energy_dict=travel_energy_dict,
+        t_dep_on_day=t_dep_on_day
+    )
+
+
+def set_expanded_results(results: ModelResults, clusters: dict, ev_data: EVData):
+    """ Replaces the values in results with the representative days repeated over the full horizon. """
+    representative_of = get_representative_of(clusters)
+    offsets = {n: n - r for n, r in representative_of.items()}
+    days_represented = defaultdict(list)
+    for n, r in representative_of.items():
+        days_represented[r].append(n)
+
+    def expand(values):
+        # Values without a TIME or DAY index are kept as they are
+        expanded = {}
+        for key, value in (values.items() if isinstance(values, dict) else ((element, None) for element in values)):
+            day = get_key_day(key)
+            if day is None:
+                expanded[key] = value
+                continue
+            for n in days_represented[day]:
+                expanded[shift_key(key, offsets[n])] = value
+        return dict(sorted(expanded.items()))
+
+    variables = results.variables
+    soc_day_start = variables['soc_day_start']
+    expanded_variables = {
+        name: expand(values) if isinstance(values, dict) else values
+        for name, values in variables.items() if name not in LINKING_VARIABLES
+    }
+
+    # SOC follows the SOC change of the representative day from the start of each day
+    for i in ev_data.t_dep_dict:
+        for n, r in representative_of.items():
+            for t in params.T_d[r]:
+                expanded_variables['soc_ev'][i, t + offsets[n]] = (
+                        soc_day_start[i, n] + variables['soc_ev'][i, t] - soc_day_start[i, r]
+                )
+    expanded_variables['soc_day_start'] = soc_day_start
+
+    recompute_daily_variables(expanded_variables, ev_data)
+    recompute_horizon_variables(expanded_variables, ev_data)
+
+    expanded_sets = {
+        name: tuple(expand(elements)) for name, elements in results.sets.items() if name != 'HORIZON_DAY'
+    }
+    expanded_sets['WEEK'] = tuple(params.D_w.keys())
+
+    # Objective of the reduced model, an estimate of the objective over the full horizon
+    results.representative_objective_components = results.objective_components
+
+    results.variables = expanded_variables
+    results.sets = expanded_sets
+    results.objective_components = horizon_objective_components(results.config, expanded_variables, ev_data)
+    results.ev_data = ev_data
+
+
+def compare_with_full_horizon(results: ModelResults, full_results: ModelResults) -> pd.DataFrame:
+    """ Returns the objective components and investment of the expanded and full horizon solutions, and their error. """
+    def get_values(model_results):
+        values = dict(model_results.objective_components)
+        values['p_cp_rated'] = model_results.variables['p_cp_rated'] * params.charging_power_resolution_factor
+        values['num_cp'] = model_results.variables.get('num_cp', params.num_of_evs)
+        return values
+
+    df = pd.DataFrame({'full_horizon': get_values(full_results), 'representative_days': get_values(results)})
+    df['error_%'] = (df['representative_days'] - df['full_horizon']) / df['full_horizon'].abs() * 100
+
+    return df
+
+
+def run_representative_days_model(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData | None = None,
+        num_representative_days: int = 4,
+        solver='gurobi',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> tuple[ModelResults | None, pd.DataFrame]:
+    """
+    Clusters the days of the horizon in params and solves the model over one representative day per cluster, weighted
+    by the number of days in the cluster. The solution is expanded to the full horizon, where every day repeats the
+    charging of its representative day, with the trips and at home status of its representative day.
+    Returns the expanded results and the representative days with the days they represent.
+    """
+    # Validate config and charging strategy
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+
+    clusters, clustering_time = log_with_runtime(
+        f'Clustering {params.num_of_days} days into {num_representative_days} representative days',
+        cluster_days,
+        ev_data,
+        num_representative_days
+    )
+    clusters_summary = get_clusters_summary(clusters)
+    print(f'\nRepresentative days\n{clusters_summary}')
+
+    # Full horizon values used by the weighted objective
+    horizon_values = {
+        'num_of_days': params.num_of_days,
+        'num_of_weeks': params.num_of_days / params.length_D_w,
+        'max_household_load': params.household_load.iloc[:, 0].max(),
+    }
+
+    timestamps = params.timestamps[np.isin(params.timestamps.date, list(clusters))]
+    reduced_ev_data = get_window_ev_data(ev_data, timestamps, ev_data.soc_init_dict)
+    representative_version = f'{version}_{num_representative_days}repdays'
+
+    try:
+        with temporary_representative_days(list(clusters)):
+            # Build reduced model
+            model_builder, build_time = log_with_runtime(
+                f'Building representative days model',
+                BuildModel,
+                config=config_map[config],
+                charging_strategy=strategy_map[charging_strategy],
+                version=representative_version,
+                obj_weights=obj_weights,
+                ev_data=reduced_ev_data,
+                backend=backend_map[build_backend],
+                symmetry_breaking=symmetry_breaking,
+                aggregated_cps=aggregated_cps
+            )
+            model = model_builder.get_optimisation_model()
+
+            link_representative_days(model, reduced_ev_data, clusters, ev_data.soc_init_dict)
+            weight_objectives(model, config_map[config], reduced_ev_data, clusters, horizon_values)
+            if hasattr(model, 'is_charging_day'):
+                weight_charging_days(model, clusters, horizon_values['num_of_weeks'])
+
+            # Solve reduced model
+            (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+                f'Solving {model.name} model',
+                solve_model,
+                model,
+                representative_version,
+                solver_name=solver,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count
+            )
+
+            log_solver_results(
+                solver_status,
+                termination_condition,
+                solving_time,
+                calc_mip_gap,
+                time_limit,
+                mip_gap
+            )
+
+            results = ModelResults(
+                model=solved_model,
+                config=config_map[config],
+                charging_strategy=strategy_map[charging_strategy],
+                mip_gap=calc_mip_gap,
+                obj_weights=obj_weights,
+                ev_data=reduced_ev_data
+            )
+
+        results.solver_status = solver_status
+        results.termination_condition = termination_condition
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during representative days optimisation: {e}.{params.RESET}')
+        return None, clusters_summary
+
+    set_expanded_results(results, clusters, get_expanded_ev_data(ev_data, clusters))
+
+    results.representative_days_timings = {
+        'clustering_time': clustering_time,
+        'build_time': build_time,
+        'solve_time': solving_time,
+    }
+    print_runtime('Representative days model solved and expanded', clustering_time + build_time + solving_time)
+
+    # Save results to pickle
+    if save_model:
+        results.save_model_to_pickle(version=version)
+
+    return results, clusters_summary
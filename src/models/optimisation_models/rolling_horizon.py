@@ -0,0 +1,463 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from contextlib import contextmanager
+from dataclasses import replace
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import solve_model, log_solver_results
+from src.models.utils.configs import CPConfig
+from src.models.utils.log_model_info import log_with_runtime, print_runtime
+from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults
+
+
+# Investment decisions made in the first window and fixed in every following window
+INVESTMENT_VARIABLES = [
+    'p_cp_rated',
+    'select_cp_rated_power',
+    'num_cp',
+    'num_cp_per_type',
+    'is_cp_installed',
+    'is_ev_permanently_assigned_to_cp',
+    'num_ev_per_cp',
+    'max_ev_per_cp',
+    'min_ev_per_cp',
+]
+
+
+@contextmanager
+def temporary_time_horizon(timestamps: pd.DatetimeIndex):
+    """ Restricts the time settings in params to a window of whole days, so models are built over the window only. """
+    names = ['timestamps', 'num_of_days', 'T_d', 'D_w', 'T_w', 'household_load', 'tariff_dict']
+    original_values = {name: getattr(params, name) for name in names}
+
+    # Time sets are derived from the window timestamps in the same way as in params
+    tmp = pd.DataFrame({'timestamp': timestamps}).set_index('timestamp')
+    tmp['week'] = tmp.index.isocalendar().week
+
+    params.timestamps = timestamps
+    params.num_of_days = len(np.unique(timestamps.date))
+    params.T_d = timestamps.groupby(timestamps.date)
+    params.D_w = tmp.resample('D').first().groupby('week').apply(lambda x: x.index.date.tolist()).to_dict()
+    params.T_w = tmp.groupby('week').apply(lambda x: x.index.tolist()).to_dict()
+    params.household_load = original_values['household_load'].loc[timestamps]
+    params.tariff_dict = {
+        tariff_type: tariff.loc[timestamps] for tariff_type, tariff in original_values['tariff_dict'].items()
+    }
+
+    try:
+        yield
+    finally:
+        for name, value in original_values.items():
+            setattr(params, name, value)
+
+
+def get_windows(window_days: int, overlap_days: int) -> list[tuple[list, list]]:
+    """
+    Returns (window days, committed days) for each window. The overlap of a window is re-solved by the next one.
+    Days left over after the last full window are added to it rather than solved as a shorter window.
+    """
+    if not 0 <= overlap_days < window_days:
+        raise ValueError(f"Overlap must be shorter than the window, got {overlap_days} and {window_days} days")
+
+    days = list(params.T_d.keys())
+    step = window_days - overlap_days
+
+    windows = []
+    for start in range(0, len(days), step):
+        window = days[start:start + window_days]
+
+        # The last window runs to the end of the horizon and commits all of its days
+        if start + step + window_days > len(days):
+            window = days[start:]
+            windows.append((window, window))
+            break
+
+        windows.append((window, window[:step]))
+
+    return windows
+
+
+def get_window_ev_data(ev_data: EVData, timestamps: pd.DatetimeIndex, soc_init_dict: dict) -> EVData:
+    """ Returns EV data restricted to the trips within a window, starting from the SOC carried from the previous window. """
+    window_times = set(timestamps)
+    window_days = set(timestamps.date)
+
+    t_arr_dict, t_dep_dict, travel_energy_dict = {}, {}, {}
+    for i in ev_data.t_dep_dict:
+        t_dep, t_arr = ev_data.t_dep_dict[i], ev_data.t_arr_dict[i]
+
+        if any((t_dep[k] in window_times) != (t_arr[k] in window_times) for k in range(len(t_dep))):
+            raise ValueError(f"EV {i} has a trip crossing the boundary of the window starting at {timestamps[0]}. "
+                             f"Windows must start when all EVs are at home.")
+
+        trips = [k for k, t in enumerate(t_dep) if t in window_times]
+        t_dep_dict[i] = [t_dep[k] for k in trips]
+        t_arr_dict[i] = [t_arr[k] for k in trips]
+        travel_energy_dict[i] = [ev_data.travel_energy_dict[i][k] for k in trips]
+
+    return replace(
+        ev_data,
+        soc_init_dict=soc_init_dict,
+        t_arr_dict=t_arr_dict,
+        t_dep_dict=t_dep_dict,
+        travel_energy_dict=travel_energy_dict,
+        t_dep_on_day={d: deps for d, deps in ev_data.t_dep_on_day.items() if d in window_days}
+    )
+
+
+def fix_investment_decisions(model: pyo.ConcreteModel, investment_values: dict) -> list:
+    """ Returns the variables fixed here that were not already fixed, so they can be freed again. """
+    newly_fixed = []
+    for name, values in investment_values.items():
+        var = model.component(name)
+        if var is None or var.ctype is not pyo.Var:
+            continue
+
+        for index in var:
+            if not var[index].fixed:
+                newly_fixed.append(var[index])
+
+            value = values[index] if var.is_indexed() else values
+            var[index].fix(round(value) if var[index].is_integer() else value)
+
+    return newly_fixed
+
+
+def set_weekly_charging_day_bounds(model: pyo.ConcreteModel, window_days: list, horizon_d_w: dict, is_charging_day: dict):
+    """
+    Windows are cut by day count, so their weeks can be partial. The charging days of each EV in the window part of a
+    week are bounded by the weekly limits minus the days it charged on in the committed days of earlier windows, and
+    the minimum is lowered by the days of the week after the window, which later windows can still charge on.
+    """
+    if not hasattr(model, 'num_charging_days'):
+        return
+
+    last_day = max(window_days)
+    for (i, w), var in model.num_charging_days.items():
+        week_days = horizon_d_w[w]
+        charged_days = sum(round(is_charging_day.get((i, d), 0)) for d in week_days if d not in window_days)
+        later_days = sum(1 for d in week_days if d > last_day)
+
+        var.setlb(max(0, params.min_num_charging_days - charged_days - later_days))
+        var.setub(params.max_num_charging_days - charged_days)
+
+
+def set_window_final_soc(model: pyo.ConcreteModel, ev_data: EVData, is_last_window: bool):
+    """
+    The SOC at the end of the horizon is at least the initial SOC, as in the full model. The window end is not held to
+    the SOC the window started from, and the last window is held to the initial SOC of the horizon.
+    """
+    for i in model.EV_ID:
+        model.final_soc_constraint[i].deactivate()
+
+    if is_last_window:
+        def horizon_final_soc(model, i):
+            return model.soc_ev[i, model.TIME.last()] >= ev_data.soc_init_dict[i]
+
+        model.horizon_final_soc_constraint = pyo.Constraint(model.EV_ID, rule=horizon_final_soc)
+
+
+def get_weekly_charging_day_violations(variables: dict) -> dict:
+    """ Returns the (EV, week) charging days of the stitched solution outside the weekly limits. """
+    return {
+        key: num_days for key, num_days in variables.get('num_charging_days', {}).items()
+        if not params.min_num_charging_days <= num_days <= params.max_num_charging_days
+    }
+
+
+def is_committed(key, committed_timestamps: set, committed_days: set) -> bool | None:
+    """ Returns whether a TIME or DAY indexed key is in the committed part of a window, None for other keys. """
+    for k in (key if isinstance(key, tuple) else (key,)):
+        if isinstance(k, pd.Timestamp):
+            return k in committed_timestamps
+        if isinstance(k, datetime.date):
+            return k in committed_days
+    return None
+
+
+def stitch_window(stitched: dict, window: dict, committed_timestamps: set, committed_days: set, is_first_window: bool):
+    for name, values in window.items():
+        # Scalars and values without a TIME or DAY index are taken from the first window
+        if not isinstance(values, (dict, tuple)):
+            if is_first_window:
+                stitched[name] = values
+            continue
+
+        items = values.items() if isinstance(values, dict) else ((element, None) for element in values)
+        stitched_values = stitched.setdefault(name, {})
+
+        for key, value in items:
+            committed = is_committed(key, committed_timestamps, committed_days)
+            if committed or (committed is None and is_first_window):
+                stitched_values[key] = value
+
+
+def recompute_daily_variables(variables: dict, ev_data: EVData):
+    """ Recomputes the grid power with the household load of each day, and the daily peak and SOC averages. """
+    household_load = params.household_load.iloc[:, 0].to_dict()
+    variables['p_grid'] = {
+        t: household_load[t] + sum(variables['p_ev'].get((i, t), 0) for i in ev_data.t_dep_dict)
+        for t in params.timestamps
+    }
+
+    variables['p_daily_peak'], variables['p_daily_avg'], variables['delta_daily_peak_avg'] = {}, {}, {}
+    for d, times in params.T_d.items():
+        p_grid = [variables['p_grid'][t] for t in times]
+        variables['p_daily_peak'][d] = max(p_grid)
+        variables['p_daily_avg'][d] = sum(p_grid) / len(p_grid)
+        variables['delta_daily_peak_avg'][d] = abs(variables['p_daily_peak'][d] - variables['p_daily_avg'][d])
+
+    variables['daily_soc_avg_t_dep'] = {}
+    variables['soc_avg_deviation'] = {(i, t): 0 for i in ev_data.t_dep_dict for t in params.timestamps}
+    for d, departures in ev_data.t_dep_on_day.items():
+        soc_avg = sum(variables['soc_ev'][i, t] for i, t in departures) / len(departures)
+        variables['daily_soc_avg_t_dep'][d] = soc_avg
+        for i, t in departures:
+            variables['soc_avg_deviation'][i, t] = abs(variables['soc_ev'][i, t] - soc_avg)
+
+
+def recompute_horizon_variables(variables: dict, ev_data: EVData):
+    """ Recomputes the variables linking windows (charging discontinuity and weekly terms) over the full horizon. """
+    # Charging discontinuity, no longer reset at the start of each window
+    for i in ev_data.t_dep_dict:
+        prev_t = None
+        for t in params.timestamps:
+            at_home = ev_data.at_home[ev_data.ev_position[i], ev_data.time_position[t]] == 1
+            variables['delta_p_ev'][i, t] = (
+                abs(variables['p_ev'][i, t] - variables['p_ev'][i, prev_t]) if prev_t is not None and at_home else 0
+            )
+            prev_t = t
+
+    # Weekly peak and average power
+    variables['p_weekly_peak'], variables['p_weekly_avg'], variables['delta_weekly_peak_avg'] = {}, {}, {}
+    for w, times in params.T_w.items():
+        p_grid = [variables['p_grid'][t] for t in times]
+        variables['p_weekly_peak'][w] = max(p_grid)
+        variables['p_weekly_avg'][w] = sum(p_grid) / len(p_grid)
+        variables['delta_weekly_peak_avg'][w] = abs(variables['p_weekly_peak'][w] - variables['p_weekly_avg'][w])
+
+    # Number of charging days over full weeks
+    if 'num_charging_days' in variables:
+        variables['num_charging_days'] = {
+            (i, w): sum(variables['is_charging_day'][i, d] for d in params.D_w[w])
+            for i in ev_data.t_dep_dict for w in params.D_w
+        }
+
+
+def horizon_objective_components(config: CPConfig, variables: dict, ev_data: EVData) -> dict:
+    """ Evaluates the objective components of the stitched solution, as they are defined in BuildModel. """
+    # Economic objective
+    num_cp = params.num_of_evs if config == CPConfig.CONFIG_1 else variables['num_cp']
+    investment_cost = num_cp * sum(
+        params.investment_cost[m] * variables['select_cp_rated_power'][m] for m in params.p_cp_rated_options_scaled
+    )
+    maintenance_cost = (params.annual_maintenance_cost / 365) * params.num_of_days * num_cp
+    tariff = params.tariff_dict[params.tariff_type].to_dict()
+    energy_purchase_cost = params.daily_supply_charge_dict[
+                               params.tariff_type] * params.num_of_evs * params.num_of_days + sum(
+        tariff[t] * variables['p_grid'][t] for t in params.timestamps
+    )
+
+    economic_objective = (investment_cost + maintenance_cost + energy_purchase_cost) / 10
+
+    # Technical objective
+    household_load = params.household_load.iloc[:, 0]
+    high_load_penalty = (household_load / household_load.max()).to_dict()
+
+    technical_objective = (
+            sum(variables['delta_p_ev'].values()) +
+            sum(high_load_penalty[t] * p for (i, t), p in variables['p_ev'].items()) +
+            sum(variables['delta_daily_peak_avg'].values()) +
+            sum(variables['delta_weekly_peak_avg'].values())
+    )
+
+    # Social objective
+    social_objective = (
+            sum(ev_data.soc_max_dict[i] - variables['soc_ev'][i, t] for i in ev_data.t_dep_dict
+                for t in ev_data.t_dep_dict[i]) +
+            sum(variables['soc_avg_deviation'].values())
+    )
+
+    return {
+        'economic_objective': economic_objective,
+        'technical_objective': technical_objective,
+        'social_objective': social_objective,
+        'total_objective_value': economic_objective + technical_objective + social_objective,
+    }
+
+
+def set_stitched_results(results: ModelResults, stitched_variables: dict, stitched_sets: dict, ev_data: EVData):
+    """ Replaces the values in results with the stitched values over the full horizon, in the order of a single model. """
+    stitched_variables = {
+        name: dict(sorted(values.items())) if isinstance(values, dict) else values
+        for name, values in stitched_variables.items()
+    }
+    recompute_horizon_variables(stitched_variables, ev_data)
+
+    stitched_sets = {name: tuple(sorted(elements)) for name, elements in stitched_sets.items()}
+    stitched_sets['WEEK'] = tuple(params.D_w.keys())
+
+    results.variables = stitched_variables
+    results.sets = stitched_sets
+    results.objective_components = horizon_objective_components(results.config, stitched_variables, ev_data)
+    results.ev_data = ev_data
+
+
+def run_rolling_horizon_model(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData | None = None,
+        window_days: int = 7,
+        overlap_days: int = 1,
+        solver='gurobi',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False,
+        investment_values: dict | None = None) -> tuple[ModelResults | None, pd.DataFrame]:
+    """
+    Solves the horizon in params as overlapping windows of whole days and stitches them into one ModelResults.
+    The investment decisions of the first window are fixed in the following windows, or in every window if
+    investment_values are given. Each window starts from the SOC at the end of the committed part of the previous window,
+    and only the last window is held to the initial SOC at its end.
+    Returns the stitched results and the build and solve time of each window.
+    """
+    # Validate config and charging strategy
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+
+    windows = get_windows(window_days, overlap_days)
+    horizon_d_w = params.D_w
+    soc_init_dict = dict(ev_data.soc_init_dict)
+    investment_values = investment_values or {}
+
+    stitched_variables, stitched_sets, window_timings = {}, {}, []
+    results = None
+
+    try:
+        for n, (days, committed_days) in enumerate(windows):
+            timestamps = params.timestamps[np.isin(params.timestamps.date, days)]
+            committed_timestamps = timestamps[np.isin(timestamps.date, committed_days)]
+            window_ev_data = get_window_ev_data(ev_data, timestamps, soc_init_dict)
+            window_version = f'{version}_window{n + 1}'
+
+            with temporary_time_horizon(timestamps):
+                # Build window model
+                model_builder, build_time = log_with_runtime(
+                    f'Building window {n + 1}/{len(windows)} ({days[0]} to {days[-1]})',
+                    BuildModel,
+                    config=config_map[config],
+                    charging_strategy=strategy_map[charging_strategy],
+                    version=window_version,
+                    obj_weights=obj_weights,
+                    ev_data=window_ev_data,
+                    backend=backend_map[build_backend],
+                    symmetry_breaking=symmetry_breaking,
+                    aggregated_cps=aggregated_cps
+                )
+                model = model_builder.get_optimisation_model()
+
+                if investment_values:
+                    fix_investment_decisions(model, investment_values)
+
+                set_window_final_soc(model, ev_data, is_last_window=n == len(windows) - 1)
+
+                # Weekly charging day limits carried over from the committed days of earlier windows
+                set_weekly_charging_day_bounds(model, days, horizon_d_w, stitched_variables.get('is_charging_day', {}))
+
+                # Solve window model
+                (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+                    f'Solving {model.name} model',
+                    solve_model,
+                    model,
+                    window_version,
+                    solver_name=solver,
+                    verbose=verbose,
+                    time_limit=time_limit,
+                    mip_gap=mip_gap,
+                    thread_count=thread_count
+                )
+
+                log_solver_results(
+                    solver_status,
+                    termination_condition,
+                    solving_time,
+                    calc_mip_gap,
+                    time_limit,
+                    mip_gap
+                )
+
+                print_runtime('Window solved', solving_time)
+
+                window_results = ModelResults(
+                    model=solved_model,
+                    config=config_map[config],
+                    charging_strategy=strategy_map[charging_strategy],
+                    mip_gap=calc_mip_gap,
+                    obj_weights=obj_weights,
+                    ev_data=window_ev_data
+                )
+
+            if n == 0:
+                results = window_results
+
+            if not investment_values:
+                investment_values = {
+                    name: window_results.variables[name]
+                    for name in INVESTMENT_VARIABLES if name in window_results.variables
+                }
+
+            # Keep the committed part of the window
+            committed = (set(committed_timestamps), set(committed_days))
+            stitch_window(stitched_variables, window_results.variables, *committed, is_first_window=n == 0)
+            stitch_window(stitched_sets, window_results.sets, *committed, is_first_window=n == 0)
+
+            # Carry SOC forward from the last committed time slot
+            soc_init_dict = {i: window_results.variables['soc_ev'][i, committed_timestamps[-1]] for i in ev_data.soc_init_dict}
+
+            window_timings.append({
+                'window': n + 1,
+                'start_day': days[0],
+                'end_day': days[-1],
+                'build_time': build_time,
+                'solve_time': solving_time,
+                'mip_gap': calc_mip_gap,
+                'termination_condition': str(termination_condition),
+            })
+
+            results.solver_status = solver_status
+            results.termination_condition = termination_condition
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during rolling horizon optimisation: {e}.{params.RESET}')
+        return None, pd.DataFrame(window_timings)
+
+    set_stitched_results(results, stitched_variables, stitched_sets, ev_data)
+
+    violations = get_weekly_charging_day_violations(results.variables)
+    if violations:
+        print(f'{params.RED}The stitched solution breaks the weekly charging day limits for (EV, week) '
+              f'{violations}.{params.RESET}')
+        return None, pd.DataFrame(window_timings)
+
+    # Report the largest MIP gap of all windows
+    window_timings = pd.DataFrame(window_timings)
+    results.mip_gap = window_timings['mip_gap'].max() if window_timings['mip_gap'].notna().any() else None
+
+    print(f'\nRolling horizon window timings\n{window_timings}')
+
+    # Save results to pickle
+    if save_model:
+        results.save_model_to_pickle(version=version)
+
+    return results, window_timings
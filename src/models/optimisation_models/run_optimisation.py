@@ -3,8 +3,30 @@ from src.config import params
 from src.config.ev_params import EVData, load_ev_data
 from src.models.optimisation_models.build_model import BuildModel
 from src.models.utils.log_model_info import log_with_runtime, print_runtime
-from src.models.optimisation_models.optimisation_model import solve_model, log_solver_results
-from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map
+from src.models.optimisation_models.optimisation_model import (
+    solve_model,
+    create_persistent_solver,
+    solve_persistent_model,
+    log_solver_results
+)
+from src.models.optimisation_models.design_enumeration import run_design_enumeration_model
+from src.models.optimisation_models.warm_start import set_warm_start
+from src.models.optimisation_models.relax_and_repair import solve_relax_and_repair
+from src.models.optimisation_models.presolve import presolve_model, print_presolve_report
+from src.models.optimisation_models.feasibility_check import check_ev_feasibility, print_feasibility_report
+from src.models.optimisation_models.model_cache import (
+    get_model_cache_key,
+    is_model_cached,
+    save_model_to_cache,
+    solve_cached_model
+)
+from src.models.utils.mapping import (
+    validate_config_strategy,
+    config_map,
+    strategy_map,
+    backend_map,
+    solver_interface_map
+)
 from src.models.results.model_results import ModelResults
 
 
@@ -20,10 +42,106 @@ def run_optimisation_model(
         time_limit=None,
         mip_gap=None,
         thread_count=None,
-        save_model: bool = True) -> ModelResults:
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False,
+        enumerate_designs: bool = False,
+        num_workers: int | None = None,
+        warm_start: ModelResults | None = None,
+        relax_and_repair: bool = False,
+        solver_interface: str = 'file',
+        model_cache: bool = False,
+        profile_build: bool = False,
+        presolve: bool = False,
+        valid_inequalities: bool = False,
+        check_feasibility: bool = False) -> ModelResults:
     # Validate config and charging strategy
     validate_config_strategy(config, charging_strategy)
 
+    # Skip the solver if some EVs cannot meet their SOC requirements even charging at the highest rated power
+    if check_feasibility:
+        ev_data = ev_data or getattr(model, 'ev_data', None) or load_ev_data()
+        violations = check_ev_feasibility(ev_data)
+        print_feasibility_report(violations)
+        if not violations.empty:
+            return None
+
+    # Solve one model per fixed CP design in parallel and keep the best
+    if enumerate_designs:
+        if model is not None:
+            raise ValueError('enumerate_designs builds its own models, so a prebuilt model cannot be given.')
+
+        unsupported = {
+            'warm_start': warm_start is not None,
+            'relax_and_repair': relax_and_repair,
+            f'solver_interface={solver_interface!r}': solver_interface != 'file',
+            'model_cache': model_cache,
+            'profile_build': profile_build,
+            'presolve': presolve,
+            'valid_inequalities': valid_inequalities,
+        }
+        unsupported = [name for name, is_set in unsupported.items() if is_set]
+        if unsupported:
+            raise ValueError(f'enumerate_designs cannot be combined with {", ".join(unsupported)}.')
+
+        return run_design_enumeration_model(
+            config=config,
+            charging_strategy=charging_strategy,
+            version=version,
+            obj_weights=obj_weights,
+            ev_data=ev_data,
+            solver=solver,
+            verbose=verbose,
+            time_limit=time_limit,
+            mip_gap=mip_gap,
+            thread_count=thread_count,
+            num_workers=num_workers,
+            save_model=save_model,
+            build_backend=build_backend,
+            symmetry_breaking=symmetry_breaking,
+            aggregated_cps=aggregated_cps
+        )
+
+    # Solve the cached compiled model if the same inputs were built before
+    cache_key = None
+    if model_cache:
+        if model is not None or warm_start is not None or relax_and_repair:
+            raise ValueError('model_cache solves compiled models, so it cannot be combined with a prebuilt model, '
+                             'warm_start or relax_and_repair.')
+
+        # Cached MPS files are read straight into gurobipy whatever the solver interface
+        if solver != 'gurobi':
+            raise ValueError(f'model_cache solves cached models with Gurobi, so it cannot be used with {solver}.')
+
+        ev_data = ev_data or load_ev_data()
+        cache_key = get_model_cache_key(
+            config=config_map[config],
+            charging_strategy=strategy_map[charging_strategy],
+            obj_weights=obj_weights,
+            ev_data=ev_data,
+            backend=backend_map[build_backend],
+            symmetry_breaking=symmetry_breaking,
+            aggregated_cps=aggregated_cps,
+            presolve=presolve,
+            valid_inequalities=valid_inequalities
+        )
+
+        if is_model_cached(cache_key):
+            return run_cached_model(
+                cache_key=cache_key,
+                config=config,
+                charging_strategy=charging_strategy,
+                version=version,
+                obj_weights=obj_weights,
+                ev_data=ev_data,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count,
+                save_model=save_model
+            )
+
     # Build model
     if model is None:
         ev_data = ev_data or load_ev_data()
@@ -32,23 +150,129 @@ def run_optimisation_model(
             charging_strategy=strategy_map[charging_strategy],
             version=version,
             obj_weights=obj_weights,
-            ev_data=ev_data
+            ev_data=ev_data,
+            backend=backend_map[build_backend],
+            symmetry_breaking=symmetry_breaking,
+            aggregated_cps=aggregated_cps,
+            profile=profile_build,
+            valid_inequalities=valid_inequalities
         )
         model = model_builder.get_optimisation_model()
     else:
         ev_data = ev_data or getattr(model, 'ev_data', None) or load_ev_data()
 
+    # Remove redundant rows and columns before the model reaches the solver
+    presolve_report = None
+    if presolve:
+        presolve_report, presolve_time = log_with_runtime(f'Presolving {model.name} model', presolve_model, model)
+        print_presolve_report(presolve_report)
+        print_runtime('Model presolved', presolve_time)
+
+    if cache_key is not None:
+        _, caching_time = log_with_runtime(f'Caching compiled {model.name} model', save_model_to_cache, model, cache_key)
+        print_runtime('Model cached', caching_time)
+
+    # MIP start from prior results
+    if warm_start is not None:
+        num_values_set = set_warm_start(model, warm_start)
+        print(f'MIP start set for {num_values_set} variables from {warm_start.charging_strategy.value} results.')
+
     # Define labels
     label = f'Solving {model.name} model'
     finished_label = 'Model solved'
 
     try:
-        (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
-            label,
-            solve_model,
-            model,
-            version,
-            solver_name=solver,
+        # Fast approximate solve, with the gap to the LP relaxation bound
+        if relax_and_repair:
+            (relaxation_bound, (solved_model, calc_mip_gap, solver_status, termination_condition)), solving_time = (
+                log_with_runtime(
+                    f'{label} by LP relaxation and repair',
+                    solve_relax_and_repair,
+                    model,
+                    version,
+                    solver_name=solver,
+                    verbose=verbose,
+                    time_limit=time_limit,
+                    thread_count=thread_count,
+                    solver_interface=solver_interface_map[solver_interface]
+                )
+            )
+            print(f'LP relaxation bound: {relaxation_bound:,.4f}')
+            print(f'Repaired objective value: {pyo.value(solved_model.obj_function):,.4f}')
+
+        else:
+            (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+                label,
+                solve_model,
+                model,
+                version,
+                solver_name=solver,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count,
+                warmstart=warm_start is not None,
+                solver_interface=solver_interface_map[solver_interface]
+            )
+
+        log_solver_results(
+            solver_status,
+            termination_condition,
+            solving_time,
+            calc_mip_gap,
+            time_limit,
+            mip_gap
+        )
+
+        print_runtime(finished_label, solving_time)
+
+        # Save results
+        results = ModelResults(
+            model=solved_model,
+            config=config_map[config],
+            charging_strategy=strategy_map[charging_strategy],
+            mip_gap=calc_mip_gap,
+            obj_weights=obj_weights,
+            ev_data=ev_data
+        )
+
+        results.solver_status = solver_status
+        results.termination_condition = termination_condition
+        results.solve_timings = getattr(solved_model, 'solve_timings', None)
+        results.presolve_report = presolve_report
+
+        if relax_and_repair:
+            results.relaxation_bound = relaxation_bound
+
+        # Save results to pickle
+        if save_model:
+            results.save_model_to_pickle(version=version)
+
+        return results
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during optimisation: {e}.{params.RESET}')
+        return None
+
+
+def run_cached_model(
+        cache_key: str,
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData,
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        save_model: bool = True) -> ModelResults:
+    """ Solves a cached compiled model with Gurobi and maps the solution back, without building the Pyomo model. """
+    try:
+        (solution, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+            f'Solving cached {config}_{charging_strategy} model ({cache_key[:12]})',
+            solve_cached_model,
+            cache_key,
             verbose=verbose,
             time_limit=time_limit,
             mip_gap=mip_gap,
@@ -64,11 +288,11 @@ def run_optimisation_model(
             mip_gap
         )
 
-        print_runtime(finished_label, solving_time)
+        print_runtime('Cached model solved', solving_time)
 
         # Save results
         results = ModelResults(
-            model=solved_model,
+            model=solution,
             config=config_map[config],
             charging_strategy=strategy_map[charging_strategy],
             mip_gap=calc_mip_gap,
@@ -89,3 +313,111 @@ def run_optimisation_model(
         print(f'{params.RED}An error occurred during optimisation: {e}.{params.RESET}')
         return None
 
+
+def run_obj_weights_sweep(
+        config: str,
+        charging_strategy: str,
+        obj_weights_sweep: dict[str, dict[str, int|float]],
+        ev_data: EVData | None = None,
+        solver='gurobi_persistent',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> dict[str, ModelResults | None]:
+    """
+    Builds the model once and re-solves it for each set of objective weights in a persistent solver.
+    obj_weights_sweep maps each results version to its objective weights. Versions solved without a solution are
+    not saved and map to None.
+    """
+    # Validate config and charging strategy
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+
+    # Build model once, with the first objective weights
+    first_obj_weights = next(iter(obj_weights_sweep.values()))
+    model_builder = BuildModel(
+        config=config_map[config],
+        charging_strategy=strategy_map[charging_strategy],
+        version='obj_weights_sweep',
+        obj_weights=first_obj_weights,
+        ev_data=ev_data,
+        backend=backend_map[build_backend],
+        symmetry_breaking=symmetry_breaking,
+        aggregated_cps=aggregated_cps
+    )
+    model = model_builder.get_optimisation_model()
+
+    solver_interface = create_persistent_solver(
+        model,
+        solver_name=solver,
+        time_limit=time_limit,
+        mip_gap=mip_gap,
+        thread_count=thread_count
+    )
+
+    all_results = {}
+    for num_solve, (version, obj_weights) in enumerate(obj_weights_sweep.items()):
+        # Only the objective changes between solves
+        model_builder.set_obj_weights(obj_weights)
+
+        # Define labels
+        label = f'Solving {model.name} model with {version} objective weights'
+        finished_label = 'Model solved'
+
+        try:
+            (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+                label,
+                solve_persistent_model,
+                solver_interface,
+                model,
+                version,
+                verbose=verbose,
+                warmstart=num_solve > 0
+            )
+
+            log_solver_results(
+                solver_status,
+                termination_condition,
+                solving_time,
+                calc_mip_gap,
+                time_limit,
+                mip_gap
+            )
+
+            print_runtime(finished_label, solving_time)
+
+            # Variable values are left from the previous weights when no solution is loaded
+            if not solved_model.number_of_solutions:
+                print(f'{params.RED}No solution found with {version} weights ({termination_condition}), '
+                      f'results are not saved.{params.RESET}')
+                all_results[version] = None
+                continue
+
+            # Save results
+            results = ModelResults(
+                model=solved_model,
+                config=config_map[config],
+                charging_strategy=strategy_map[charging_strategy],
+                mip_gap=calc_mip_gap,
+                obj_weights=obj_weights,
+                ev_data=ev_data
+            )
+
+            results.solver_status = solver_status
+            results.termination_condition = termination_condition
+
+            # Save results to pickle
+            if save_model:
+                results.save_model_to_pickle(version=version)
+
+            all_results[version] = results
+
+        except Exception as e:
+            print(f'{params.RED}An error occurred during optimisation with {version} weights: {e}.{params.RESET}')
+            all_results[version] = None
+
+    return all_results
@@ -0,0 +1,270 @@
+import pandas as pd
+from contextlib import contextmanager
+from dataclasses import replace
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.optimisation_models.build_model import BuildModel
+from src.models.optimisation_models.optimisation_model import solve_model, log_solver_results
+from src.models.optimisation_models.rolling_horizon import (
+    recompute_daily_variables,
+    recompute_horizon_variables,
+    horizon_objective_components
+)
+from src.models.utils.log_model_info import log_with_runtime, print_runtime
+from src.models.utils.mapping import validate_config_strategy, config_map, strategy_map, backend_map
+from src.models.results.model_results import ModelResults
+
+
+def is_in_windows(t: pd.Timestamp, windows: list[tuple[str, str]]) -> bool:
+    return any(pd.Timestamp(start).time() <= t.time() < pd.Timestamp(end).time() for start, end in windows)
+
+
+def get_time_grid(ev_data: EVData,
+                  fine_resolution_windows: list[tuple[str, str]] | None = None,
+                  coarse_time_resolution: int | None = None) -> dict:
+    """
+    Returns {time slot: [timestamps in the time slot]}, where each time slot starts at its first timestamp. Outside the
+    fine resolution windows, consecutive timestamps of a day are merged up to the coarse resolution while the at home
+    status of every EV and the tariff stay the same. Arrival and departure times keep the base resolution.
+    """
+    fine_resolution_windows = params.fine_resolution_windows if fine_resolution_windows is None else fine_resolution_windows
+    max_periods = (coarse_time_resolution or params.coarse_time_resolution) // params.time_resolution
+
+    timestamps = params.timestamps
+    at_home = ev_data.at_home[:, [ev_data.time_position[t] for t in timestamps]].T.tolist()
+    tariff = params.tariff_dict[params.tariff_type].loc[timestamps].tolist()
+    events = {t for times in (*ev_data.t_arr_dict.values(), *ev_data.t_dep_dict.values()) for t in times}
+    is_fixed = [t in events or is_in_windows(t, fine_resolution_windows) for t in timestamps]
+
+    grid = {}
+    slot, start = None, None
+    for k, t in enumerate(timestamps):
+        can_merge = (
+                slot is not None and
+                not is_fixed[k] and
+                not is_fixed[start] and
+                len(grid[slot]) < max_periods and
+                t.date() == slot.date() and
+                at_home[k] == at_home[k - 1] and
+                tariff[k] == tariff[k - 1]
+        )
+
+        if can_merge:
+            grid[slot].append(t)
+        else:
+            slot, start = t, k
+            grid[slot] = [t]
+
+    return grid
+
+
+def get_time_grid_summary(grid: dict) -> pd.DataFrame:
+    summary = pd.DataFrame({
+        'day': [slot.date() for slot in grid],
+        'num_time_slots': 1,
+        'num_base_time_slots': [len(times) for times in grid.values()],
+    })
+
+    return summary.groupby('day', as_index=False).sum()
+
+
+@contextmanager
+def temporary_time_grid(grid: dict):
+    """ Replaces the time settings in params with the time slots of a multi-resolution time grid. """
+    names = ['timestamps', 'T_d', 'T_w', 'household_load', 'tariff_dict', 'slot_duration']
+    original_values = {name: getattr(params, name) for name in names}
+
+    timestamps = pd.DatetimeIndex(list(grid))
+    slot_of = {t: slot for slot, times in grid.items() for t in times}
+
+    # Household load is the average of each time slot, the tariff is the same over each time slot
+    household_load = original_values['household_load']
+    household_load = household_load.groupby(household_load.index.map(slot_of)).mean()
+    household_load.index.name = original_values['household_load'].index.name
+
+    params.timestamps = timestamps
+    params.T_d = timestamps.groupby(timestamps.date)
+    params.T_w = {w: [t for t in times if t in grid] for w, times in original_values['T_w'].items()}
+    params.household_load = household_load
+    params.tariff_dict = {
+        tariff_type: tariff.loc[timestamps] for tariff_type, tariff in original_values['tariff_dict'].items()
+    }
+    params.slot_duration = {slot: len(times) for slot, times in grid.items()}
+
+    try:
+        yield
+    finally:
+        for name, value in original_values.items():
+            setattr(params, name, value)
+
+
+def get_grid_ev_data(ev_data: EVData, grid: dict) -> EVData:
+    """ Returns EV data on the time slots of the grid, the EVs do not arrive or depart within a time slot. """
+    slots = list(grid)
+    columns = [ev_data.time_position[slot] for slot in slots]
+
+    return replace(
+        ev_data,
+        at_home_status_dict={i: status.loc[slots] for i, status in ev_data.at_home_status_dict.items()},
+        at_home=ev_data.at_home[:, columns],
+        time_position={slot: k for k, slot in enumerate(slots)}
+    )
+
+
+def expand_key(key, grid: dict) -> list:
+    """ Returns the keys with the time slot of key replaced by each of its timestamps. """
+    if isinstance(key, tuple):
+        for n, k in enumerate(key):
+            if isinstance(k, pd.Timestamp):
+                return [key[:n] + (t,) + key[n + 1:] for t in grid[k]]
+        return [key]
+
+    return list(grid[key]) if isinstance(key, pd.Timestamp) else [key]
+
+
+def set_expanded_grid_results(results: ModelResults, grid: dict, ev_data: EVData):
+    """
+    Replaces the values in results with their values on every timestamp, as in a model with a uniform time grid.
+    Power is constant over each time slot and the SOC changes linearly over each time slot.
+    """
+    def expand(values):
+        # Values without a TIME index are kept as they are
+        if not isinstance(values, dict):
+            return values
+        return {expanded_key: value for key, value in values.items() for expanded_key in expand_key(key, grid)}
+
+    variables = results.variables
+    expanded_variables = {name: expand(values) for name, values in variables.items()}
+
+    # SOC from the end of the previous time slot to the end of the time slot
+    slots = list(grid)
+    for i in ev_data.t_dep_dict:
+        for n, slot in enumerate(slots):
+            soc_end = variables['soc_ev'][i, slot]
+            soc_start = variables['soc_ev'][i, slots[n - 1]] if n > 0 else soc_end
+            num_periods = len(grid[slot])
+
+            for k, t in enumerate(grid[slot]):
+                expanded_variables['soc_ev'][i, t] = soc_start + (soc_end - soc_start) * (k + 1) / num_periods
+
+    recompute_daily_variables(expanded_variables, ev_data)
+    recompute_horizon_variables(expanded_variables, ev_data)
+
+    expanded_sets = {
+        name: tuple(expanded_key for key in elements for expanded_key in expand_key(key, grid))
+        if any(isinstance(k, pd.Timestamp) for key in elements for k in (key if isinstance(key, tuple) else (key,)))
+        else elements
+        for name, elements in results.sets.items()
+    }
+
+    # Objective of the multi-resolution model
+    results.grid_objective_components = results.objective_components
+
+    results.variables = expanded_variables
+    results.sets = expanded_sets
+    results.objective_components = horizon_objective_components(results.config, expanded_variables, ev_data)
+    results.ev_data = ev_data
+
+
+def run_multi_resolution_model(
+        config: str,
+        charging_strategy: str,
+        version: str,
+        obj_weights: dict[str, int|float],
+        ev_data: EVData | None = None,
+        fine_resolution_windows: list[tuple[str, str]] | None = None,
+        coarse_time_resolution: int | None = None,
+        solver='gurobi',
+        verbose=False,
+        time_limit=None,
+        mip_gap=None,
+        thread_count=None,
+        save_model: bool = True,
+        build_backend: str = 'rules',
+        symmetry_breaking: bool = False,
+        aggregated_cps: bool = False) -> tuple[ModelResults | None, pd.DataFrame]:
+    """
+    Solves the model on a multi-resolution time grid, with time_resolution in the fine resolution windows and at arrival
+    and departure times, and up to the coarse resolution elsewhere. The results are expanded to every timestamp.
+    Returns the expanded results and the number of time slots on each day.
+    """
+    # Validate config and charging strategy
+    validate_config_strategy(config, charging_strategy)
+    ev_data = ev_data or load_ev_data()
+
+    grid = get_time_grid(ev_data, fine_resolution_windows, coarse_time_resolution)
+    grid_summary = get_time_grid_summary(grid)
+    print(f'\nMulti-resolution time grid: {len(grid)} time slots instead of {len(params.timestamps)}')
+
+    grid_ev_data = get_grid_ev_data(ev_data, grid)
+    grid_version = f'{version}_{len(grid)}slots'
+
+    try:
+        with temporary_time_grid(grid):
+            # Build model
+            model_builder, build_time = log_with_runtime(
+                f'Building multi-resolution model',
+                BuildModel,
+                config=config_map[config],
+                charging_strategy=strategy_map[charging_strategy],
+                version=grid_version,
+                obj_weights=obj_weights,
+                ev_data=grid_ev_data,
+                backend=backend_map[build_backend],
+                symmetry_breaking=symmetry_breaking,
+                aggregated_cps=aggregated_cps
+            )
+            model = model_builder.get_optimisation_model()
+
+            # Solve model
+            (solved_model, calc_mip_gap, solver_status, termination_condition), solving_time = log_with_runtime(
+                f'Solving {model.name} model',
+                solve_model,
+                model,
+                grid_version,
+                solver_name=solver,
+                verbose=verbose,
+                time_limit=time_limit,
+                mip_gap=mip_gap,
+                thread_count=thread_count
+            )
+
+            log_solver_results(
+                solver_status,
+                termination_condition,
+                solving_time,
+                calc_mip_gap,
+                time_limit,
+                mip_gap
+            )
+
+            results = ModelResults(
+                model=solved_model,
+                config=config_map[config],
+                charging_strategy=strategy_map[charging_strategy],
+                mip_gap=calc_mip_gap,
+                obj_weights=obj_weights,
+                ev_data=grid_ev_data
+            )
+
+        results.solver_status = solver_status
+        results.termination_condition = termination_condition
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during multi-resolution optimisation: {e}.{params.RESET}')
+        return None, grid_summary
+
+    set_expanded_grid_results(results, grid, ev_data)
+
+    results.time_grid_timings = {
+        'num_time_slots': len(grid),
+        'build_time': build_time,
+        'solve_time': solving_time,
+    }
+    print_runtime('Multi-resolution model solved and expanded', build_time + solving_time)
+
+    # Save results to pickle
+    if save_model:
+        results.save_model_to_pickle(version=version)
+
+    return results, grid_summary
@@ -0,0 +1,193 @@
+import math
+import pyomo.environ as pyo
+from src.config import params
+from src.config.ev_params import EVData
+
+
+TOLERANCE = 1e-6
+
+
+def get_min_count(capacities: list[float], energy: float) -> int | None:
+    """ Returns the fewest capacities that add up to the energy, or None if all of them do not. """
+    total = 0
+    for count, capacity in enumerate(sorted(capacities, reverse=True), start=1):
+        total += capacity
+        if total >= energy - TOLERANCE:
+            return count
+
+    return None
+
+
+def get_charging_slots(model: pyo.ConcreteModel, ev_data: EVData, i) -> list:
+    # Charging only changes the SOC at home slots that are not the first slot or an arrival
+    first = model.TIME.first()
+    arrivals = set(ev_data.t_arr_dict[i])
+
+    return [t for t in model.TIME if (i, t) in model.EV_AT_HOME and t != first and t not in arrivals]
+
+
+def get_dwell_window_requirements(model: pyo.ConcreteModel, ev_data: EVData) -> list[dict]:
+    """
+    Returns the energy each EV must receive between the start of the horizon or an arrival and a later departure or the
+    end of the horizon. From the start, the SOC is soc_init. From an arrival, the SOC is at most soc_max minus the
+    energy of the trip.
+    """
+    end = model.TIME.last()
+    requirements = []
+
+    for i in model.EV_ID:
+        slots = get_charging_slots(model, ev_data, i)
+        trips = list(zip(ev_data.t_dep_dict[i], ev_data.t_arr_dict[i], ev_data.travel_energy_dict[i]))
+        soc_critical, soc_max, soc_init = ev_data.soc_critical_dict[i], ev_data.soc_max_dict[i], ev_data.soc_init_dict[i]
+
+        # (window start, highest SOC at the window start), the first slot does not charge the EV
+        starts = [(model.TIME.first(), soc_init)]
+        starts += [(t_arr, soc_max - travel_energy) for _, t_arr, travel_energy in trips if t_arr in model.TIME]
+
+        # (deadline, lowest SOC at the deadline), the final SOC holds at the end of the last slot
+        deadlines = [(t_dep, soc_critical + travel_energy) for t_dep, _, travel_energy in trips if t_dep in model.TIME]
+        deadlines += [(None, soc_init)]
+
+        for start, start_soc in starts:
+            for deadline, deadline_soc in deadlines:
+                if deadline is not None and deadline <= start:
+                    continue
+
+                def is_in_window(t):
+                    return start < t and (deadline is None or t < deadline) and t <= end
+
+                travel_energy = sum(energy for _, t_arr, energy in trips if is_in_window(t_arr))
+                energy = deadline_soc + travel_energy - start_soc
+                window_slots = [t for t in slots if is_in_window(t)]
+
+                capacities = [
+                    ev_data.charging_efficiency * params.slot_duration[t] * params.p_cp_rated_max for t in window_slots
+                ]
+                num_slots = get_min_count(capacities, energy) if energy > TOLERANCE else None
+                if num_slots is None:
+                    continue
+
+                requirements.append({
+                    'ev': i,
+                    'start': start,
+                    'deadline': deadline,
+                    'energy': energy,
+                    'slots': window_slots,
+                    'num_slots': num_slots,
+                    # Latest slot charging at full power can start and still meet the requirement
+                    'latest_start': window_slots[-num_slots],
+                })
+
+    return requirements
+
+
+def get_undominated_requirements(requirements: list[dict]) -> list[dict]:
+    """ Leaves out the requirements implied by a requirement of the same EV over fewer slots needing as many slots. """
+    strongest = {}
+    for r in requirements:
+        key = (r['ev'], tuple(r['slots']))
+        if key not in strongest or r['num_slots'] > strongest[key]['num_slots']:
+            strongest[key] = r
+
+    # Windows are runs of consecutive charging slots, so a window is within another if its first and last slots are
+    def is_within(window, other):
+        return window['slots'][0] >= other['slots'][0] and window['slots'][-1] <= other['slots'][-1]
+
+    return [
+        r for r in strongest.values()
+        if not any(
+            other is not r and
+            other['ev'] == r['ev'] and
+            other['num_slots'] >= r['num_slots'] and
+            is_within(other, r)
+            for other in strongest.values()
+        )
+    ]
+
+
+def get_connection(model: pyo.ConcreteModel, i, t):
+    if hasattr(model, 'is_ev_cp_connected'):
+        return sum(model.is_ev_cp_connected[i, j, t] for j in model.CP_ID)
+    return model.is_ev_charging[i, t]
+
+
+def add_valid_inequalities(model: pyo.ConcreteModel, ev_data: EVData) -> dict:
+    """
+    Adds valid inequalities from the energy each EV needs in its dwell windows. The EV must be connected in enough
+    slots and charge on enough charging days of each window, and the rated power and the installed capacity must be
+    large enough to deliver the energy. Returns the number of cuts and the lower bounds.
+    """
+    all_requirements = get_dwell_window_requirements(model, ev_data)
+    requirements = get_undominated_requirements(all_requirements)
+    day_of = {t: d for d, times in params.T_d.items() for t in times}
+
+    # EVs are connected in at least as many slots as charging at the highest rated power needs
+    model.dwell_window_connection_cut = pyo.ConstraintList()
+    if hasattr(model, 'is_ev_cp_connected') or hasattr(model, 'is_ev_charging'):
+        for r in requirements:
+            model.dwell_window_connection_cut.add(
+                sum(get_connection(model, r['ev'], t) for t in r['slots']) >= r['num_slots']
+            )
+
+    # EVs charge on at least as many days as the largest daily charging energies in the window need
+    model.dwell_window_charging_day_cut = pyo.ConstraintList()
+    if hasattr(model, 'is_charging_day'):
+        charging_day_cuts = {}
+        for r in requirements:
+            day_capacities = {}
+            for t in r['slots']:
+                day_capacities[day_of[t]] = day_capacities.get(day_of[t], 0) + (
+                        ev_data.charging_efficiency * params.slot_duration[t] * params.p_cp_rated_max
+                )
+
+            key = (r['ev'], tuple(sorted(day_capacities)))
+            num_days = get_min_count(list(day_capacities.values()), r['energy'])
+            charging_day_cuts[key] = max(charging_day_cuts.get(key, 0), num_days)
+
+        for (i, days), num_days in charging_day_cuts.items():
+            model.dwell_window_charging_day_cut.add(sum(model.is_charging_day[i, d] for d in days) >= num_days)
+
+    # Lowest rated power that delivers the energy of every window
+    p_cp_rated_lb = max(
+        (r['energy'] / (ev_data.charging_efficiency * sum(params.slot_duration[t] for t in r['slots']))
+         for r in all_requirements),
+        default=0
+    )
+    rated_power_options = [m for m in params.p_cp_rated_options_scaled if m >= p_cp_rated_lb - TOLERANCE]
+    if len(rated_power_options) < len(params.p_cp_rated_options_scaled):
+        model.cp_rated_power_lower_bound_cut = pyo.Constraint(
+            expr=sum(model.select_cp_rated_power[m] for m in rated_power_options) == 1
+        )
+
+    # Lowest installed capacity that delivers the energy every EV needs from the start of the horizon to each deadline
+    cp_capacity_lb, num_cp_lb = 0, 0
+    if hasattr(model, 'num_cp_per_type'):
+        from_start = [r for r in all_requirements if r['start'] == model.TIME.first()]
+        charging_times = {t for r in from_start for t in r['slots']}
+        deadlines = sorted({r['deadline'] for r in from_start if r['deadline'] is not None}) + [None]
+
+        for deadline in deadlines:
+            energy = sum(
+                max((r['energy'] for r in from_start if r['ev'] == i and
+                     (deadline is None or (r['deadline'] is not None and r['deadline'] <= deadline))), default=0)
+                for i in model.EV_ID
+            )
+            duration = sum(params.slot_duration[t] for t in charging_times if deadline is None or t < deadline)
+            if duration:
+                cp_capacity_lb = max(cp_capacity_lb, energy / (ev_data.charging_efficiency * duration))
+
+        num_cp_lb = math.ceil(cp_capacity_lb / params.p_cp_rated_max - TOLERANCE)
+
+        model.cp_capacity_lower_bound_cut = pyo.Constraint(
+            expr=sum(m * model.num_cp_per_type[m] for m in params.p_cp_rated_options_scaled) >= cp_capacity_lb
+        )
+        model.num_cp_lower_bound_cut = pyo.Constraint(expr=model.num_cp >= num_cp_lb)
+
+    return {
+        'dwell_windows': len(requirements),
+        'connection_cuts': len(model.dwell_window_connection_cut),
+        'charging_day_cuts': len(model.dwell_window_charging_day_cut),
+        'p_cp_rated_lb': p_cp_rated_lb,
+        'cp_capacity_lb': cp_capacity_lb,
+        'num_cp_lb': num_cp_lb,
+    }
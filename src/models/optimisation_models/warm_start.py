@@ -0,0 +1,137 @@
+import math
+import pyomo.environ as pyo
+from src.config import params
+from src.models.results.model_results import ModelResults, assign_connected_evs_to_cps
+
+
+def get_warm_start_values(model: pyo.ConcreteModel, prior: ModelResults) -> dict[str, dict | float]:
+    """
+    Returns the values of the discrete variables of model from prior results, which can come from a model with another
+    charging strategy or from the uncoordinated simulation. Values not in the prior results are derived from the
+    CP design and the charging power.
+    """
+    prior_variables = prior.variables
+    values = {name: prior_variables[name] for name in prior_variables if model.component(name) is not None}
+
+    p_cp_rated = prior_variables['p_cp_rated']
+    num_cp = prior_variables.get('num_cp')
+    num_cp = int(round(num_cp)) if num_cp is not None else None
+
+    # CP design
+    values.setdefault('select_cp_rated_power', {
+        m: int(math.isclose(m, p_cp_rated)) for m in params.p_cp_rated_options_scaled
+    })
+
+    if num_cp is not None:
+        values.setdefault('num_cp_per_type', {
+            m: num_cp * values['select_cp_rated_power'][m] for m in params.p_cp_rated_options_scaled
+        })
+        values.setdefault('is_cp_installed', {j: int(j < num_cp) for j in range(params.num_cp_max)})
+
+    # EVs are connected whenever they charge
+    is_ev_charging = {(i, t): int(p > 1e-6) for (i, t), p in prior_variables['p_ev'].items()}
+
+    # Charging days, limited to the scheduling constraints of the flexible charging strategy
+    if hasattr(model, 'is_charging_day') and 'is_charging_day' not in prior_variables:
+        values['is_charging_day'] = get_charging_days(model, prior_variables['p_ev'])
+        values['num_charging_days'] = {
+            (i, w): sum(values['is_charging_day'][i, d] for d in params.D_w[w]) for i in model.EV_ID for w in model.WEEK
+        }
+
+        # The prior charging times no longer fit the charging days, so the solver completes the connections
+        values.pop('is_ev_charging', None)
+        values.pop('is_ev_cp_connected', None)
+        return values
+
+    if hasattr(model, 'is_ev_charging'):
+        values.setdefault('is_ev_charging', is_ev_charging)
+
+    if hasattr(model, 'is_ev_cp_connected') and 'is_ev_cp_connected' not in values:
+        assignment = values.get('is_ev_permanently_assigned_to_cp')
+
+        # Config 3 EVs connect to their assigned CP, config 2 EVs to the lowest free CP
+        if assignment is not None:
+            values['is_ev_cp_connected'] = {
+                (i, j, t): int(is_ev_charging[i, t] and round(assignment[i, j]) == 1)
+                for (i, j, t) in model.is_ev_cp_connected
+            }
+        elif num_cp is not None and not hasattr(model, 'is_ev_permanently_assigned_to_cp'):
+            try:
+                values['is_ev_cp_connected'] = assign_connected_evs_to_cps(
+                    is_ev_charging, list(model.EV_ID), list(model.TIME), num_cp
+                )
+            except IndexError:
+                # More EVs charge at the same time than there are CPs, the solver completes the connections
+                pass
+
+    return values
+
+
+def get_charging_days(model: pyo.ConcreteModel, p_ev: dict) -> dict:
+    # In each week, the next charging day goes to the EV with the most charged energy per charging day so far, on the
+    # free day it charged the most on (or spent the most time at home), within the limits on charging days
+    max_charged_evs_daily = (
+            (params.num_of_evs * params.max_num_charging_days) / params.length_D_w +
+            params.max_charged_evs_daily_margin
+    )
+    is_charging_day = {(i, d): 0 for i in model.EV_ID for d in model.DAY}
+
+    for w in model.WEEK:
+        days = params.D_w[w]
+        day_priority = {
+            (i, d): (
+                sum(p_ev[i, t] for t in params.T_d[d]),
+                sum((i, t) in model.EV_AT_HOME for t in params.T_d[d])
+            )
+            for i in model.EV_ID for d in days
+        }
+        weekly_energy = {i: sum(day_priority[i, d][0] for d in days) for i in model.EV_ID}
+        num_charged_evs = {d: 0 for d in days}
+        num_charging_days = {i: 0 for i in model.EV_ID}
+
+        while True:
+            free_days = {
+                i: [d for d in days if not is_charging_day[i, d] and num_charged_evs[d] + 1 <= max_charged_evs_daily]
+                for i in model.EV_ID if num_charging_days[i] < params.max_num_charging_days
+            }
+            free_days = {i: free for i, free in free_days.items() if free}
+            if not free_days:
+                break
+
+            i = max(free_days, key=lambda ev: weekly_energy[ev] / (1 + num_charging_days[ev]))
+            d = max(free_days[i], key=lambda day: day_priority[i, day])
+
+            is_charging_day[i, d] = 1
+            num_charging_days[i] += 1
+            num_charged_evs[d] += 1
+
+    return is_charging_day
+
+
+def set_warm_start(model: pyo.ConcreteModel, prior: ModelResults) -> int:
+    """
+    Sets the discrete variables of model to the values from prior results as a MIP start, the solver completes the
+    continuous variables. Returns the number of variables set.
+    """
+    values = get_warm_start_values(model, prior)
+
+    # Values left from the model build are not part of the MIP start
+    for var in model.component_data_objects(pyo.Var):
+        if not var.fixed:
+            var.set_value(None, skip_validation=True)
+
+    num_values_set = 0
+    for name, var_values in values.items():
+        var = model.component(name)
+        if var is None or var.ctype is not pyo.Var:
+            continue
+
+        for index in var:
+            value = var_values.get(index) if var.is_indexed() else var_values
+            if value is None or var[index].fixed or not var[index].is_integer():
+                continue
+
+            var[index].set_value(round(value), skip_validation=True)
+            num_values_set += 1
+
+    return num_values_set
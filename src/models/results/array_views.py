@@ -0,0 +1,42 @@
+import itertools
+import numpy as np
+from collections.abc import Mapping
+
+
+class ArrayView(Mapping):
+    """
+    Read only dict view of an array, keyed by the labels of its axes, e.g. {t: value} for a (TIME,) array or
+    {(i, t): value} for an (EV, TIME) array. Values are looked up in the array when they are read, so the dict of
+    every value is only built if it is iterated.
+    """
+    def __init__(self, array: np.ndarray, *labels: list):
+        self.array = array
+        self.labels = [list(axis_labels) for axis_labels in labels]
+        self.positions = [{label: n for n, label in enumerate(axis_labels)} for axis_labels in self.labels]
+
+    def _position(self, key) -> tuple:
+        key = key if len(self.positions) > 1 else (key,)
+        if len(key) != len(self.positions):
+            raise KeyError(key)
+        return tuple(positions[label] for positions, label in zip(self.positions, key))
+
+    def __getitem__(self, key):
+        return self.array[self._position(key)].item()
+
+    def __contains__(self, key):
+        try:
+            self._position(key)
+            return True
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        if len(self.labels) == 1:
+            return iter(self.labels[0])
+        return itertools.product(*self.labels)
+
+    def __len__(self):
+        return int(np.prod([len(axis_labels) for axis_labels in self.labels]))
+
+    def __repr__(self):
+        return f'{type(self).__name__}(shape={self.array.shape})'
@@ -10,6 +10,27 @@ from src.config.ev_params import EVData, load_ev_data
 from src.models.utils.configs import CPConfig, ChargingStrategy
 
 
+def assign_connected_evs_to_cps(is_ev_charging: dict, ev_ids: list, timestamps: list, num_cp: int) -> dict:
+    """ Returns is_ev_cp_connected for the installed CPs with the lowest CP IDs, from the EVs connected at each time. """
+    cp_ids = list(range(params.num_cp_max))
+
+    # Connected EVs keep their CP from the previous time slot, newly connected EVs take the lowest free CP
+    is_ev_cp_connected = {(i, j, t): 0 for i in ev_ids for j in cp_ids for t in timestamps}
+    assigned_cp = {}
+
+    for t in timestamps:
+        connected = [i for i in ev_ids if round(is_ev_charging[i, t]) == 1]
+        assigned_cp = {i: j for i, j in assigned_cp.items() if i in connected}
+        free_cps = [j for j in cp_ids[:num_cp] if j not in assigned_cp.values()]
+
+        for i in connected:
+            if i not in assigned_cp:
+                assigned_cp[i] = free_cps.pop(0)
+            is_ev_cp_connected[i, assigned_cp[i], t] = 1
+
+    return is_ev_cp_connected
+
+
 class ModelResults:
     def __init__(self, model: pyo.ConcreteModel | dict,
                  config: CPConfig,
@@ -35,21 +56,35 @@ class ModelResults:
         self.objective_components = {}
 
         if charging_strategy.value != 'uncoordinated':
-            # Variables
-            for var in model.component_objects(pyo.Var, active=True):
-                # Check if the variable has indexes
-                if var.is_indexed():
-                    self.variables[var.name] = {index: pyo.value(var[index]) for index in var}
-                # For scalar variables, store the value directly
-                else:
-                    self.variables[var.name] = var.value
-
-            # Sets
-            for model_set in model.component_objects(pyo.Set, active=True):
-                self.sets[model_set.name] = model_set.data()
-
-            for obj in model.component_objects(pyo.Expression, active=True):
-                self.objective_components[obj.name] = pyo.value(obj)
+            if isinstance(model, dict):
+                # Solution values already mapped from a cached compiled model
+                self.variables = model['variables']
+                self.sets = model['sets']
+                self.objective_components = model['objective_components']
+
+            else:
+                # Variables
+                for var in model.component_objects(pyo.Var, active=True):
+                    # Check if the variable has indexes
+                    if var.is_indexed():
+                        self.variables[var.name] = {index: pyo.value(var[index]) for index in var}
+                    # For scalar variables, store the value directly
+                    else:
+                        self.variables[var.name] = var.value
+
+                # Sets
+                for model_set in model.component_objects(pyo.Set, active=True):
+                    self.sets[model_set.name] = model_set.data()
+
+                for obj in model.component_objects(pyo.Expression, active=True):
+                    self.objective_components[obj.name] = pyo.value(obj)
+
+            # Charging variables only exist when EVs are at home, fill away slots with zeros
+            self._fill_away_from_home_slots()
+
+            # The aggregated config 2 formulation does not index CPs, so CP IDs are assigned after the solve
+            if config == CPConfig.CONFIG_2 and 'CP_ID' not in self.sets:
+                self._assign_cp_ids()
 
         else:
             # Variables
@@ -63,6 +98,39 @@ class ModelResults:
                 'WEEK': [_ for _ in params.D_w.keys()]
             }
 
+    def _fill_away_from_home_slots(self):
+        ev_ids, timestamps = self.sets['EV_ID'], self.sets['TIME']
+
+        for name in ['p_ev', 'is_ev_charging']:
+            if name in self.variables:
+                values = self.variables[name]
+                self.variables[name] = {
+                    (i, t): values.get((i, t), 0) for i in ev_ids for t in timestamps
+                }
+
+        for name in ['is_ev_cp_connected', 'p_ev_cp']:
+            if name in self.variables:
+                values = self.variables[name]
+                self.variables[name] = {
+                    (i, j, t): values.get((i, j, t), 0) for i in ev_ids for j in self.sets['CP_ID'] for t in timestamps
+                }
+
+    def _assign_cp_ids(self):
+        cp_ids = list(range(params.num_cp_max))
+        num_cp = int(round(self.variables['num_cp']))
+        is_ev_charging = self.variables.pop('is_ev_charging')
+        ev_ids, timestamps = list(self.sets['EV_ID']), list(self.sets['TIME'])
+        ev_at_home = set(self.sets['EV_AT_HOME'])
+
+        # Installed CPs take the lowest CP IDs
+        self.variables['is_cp_installed'] = {j: int(j < num_cp) for j in cp_ids}
+        self.variables['is_ev_cp_connected'] = assign_connected_evs_to_cps(is_ev_charging, ev_ids, timestamps, num_cp)
+
+        self.sets['CP_ID'] = tuple(cp_ids)
+        self.sets['EV_CP_AT_HOME'] = tuple(
+            (i, j, t) for i in ev_ids for j in cp_ids for t in timestamps if (i, t) in ev_at_home
+        )
+
     def get_config_attributes_for_simulation(self) -> dict[str, int | float | dict[int, list]]:
         config_attributes = {
             'p_cp_rated': self.variables['p_cp_rated'] * params.charging_power_resolution_factor,
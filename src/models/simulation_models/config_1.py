@@ -1,20 +1,106 @@
+import numpy as np
 import pandas as pd
 from src.config import params
 from src.data_processing.electric_vehicle import ElectricVehicle
 
 
+def get_arrival_energy(ev_data: list, time_position: dict, shape: tuple) -> np.ndarray:
+    """ Returns the (EV, TIME) travel energy of the trip ending at each arrival time. """
+    arrival_energy = np.zeros(shape)
+
+    for i, ev in enumerate(ev_data):
+        # The first trip arriving at a time is the one subtracted
+        for t, travel_energy in reversed(list(zip(ev.t_arr, ev.travel_energy))):
+            if t in time_position:
+                arrival_energy[i, time_position[t]] = travel_energy
+
+    return arrival_energy
+
+
+def simulate_arrays(
+        at_home: np.ndarray,
+        arrival_energy: np.ndarray,
+        household_load: np.ndarray,
+        num_ev_at_home: np.ndarray,
+        soc_init: np.ndarray,
+        soc_max: np.ndarray,
+        p_cp_rated_scaled: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the (EV, TIME) charging power and soc of all EVs, advanced together one time step at a time.
+    Follows the per EV loop operation by operation, so the results are bit-identical to it: the travel energy is only
+    subtracted when the EV charges at its arrival time.
+    """
+    num_evs, num_times = at_home.shape
+    p_ev = np.zeros((num_evs, num_times))
+    soc_ev = np.empty((num_evs, num_times))
+
+    # Calculate maximum charging power per EV divided evenly
+    ccp_capacity = params.P_grid_max - household_load
+    available_power_at_cp = np.where(num_ev_at_home > 1, ccp_capacity / np.maximum(num_ev_at_home, 1), ccp_capacity)
+    available_power = np.minimum(available_power_at_cp, p_cp_rated_scaled)
+
+    can_charge = np.array([t.time() not in params.no_charging_time for t in params.timestamps])
+    is_charging = (at_home == 1) & can_charge
+
+    # Assign initial charging power and soc
+    soc_ev[:, 0] = soc_init
+
+    for k in range(1, num_times):
+        prev_soc = soc_ev[:, k - 1]
+        charging = is_charging[:, k]
+
+        # Subtract travel energy at arrival time, zero otherwise
+        arrived_soc = prev_soc - arrival_energy[:, k]
+        potential_soc = arrived_soc + available_power[k]
+        is_full = potential_soc > soc_max
+
+        p_ev[charging, k] = np.where(is_full, soc_max - arrived_soc, available_power[k])[charging]
+        soc_ev[:, k] = np.where(charging, np.where(is_full, soc_max, potential_soc), prev_soc)
+
+    return p_ev, soc_ev
+
+
 class UncoordinatedModelConfig1:
     def __init__(self, ev_data: list,
                  household_load: pd.DataFrame,
                  num_ev_at_home: pd.DataFrame,
-                 p_cp_rated_scaled: float
+                 p_cp_rated_scaled: float,
+                 at_home: np.ndarray,
+                 time_position: dict,
+                 vectorised: bool = True
                  ):
         self.ev_data = ev_data
         self.household_load = household_load
         self.num_ev_at_home = num_ev_at_home
         self.p_cp_rated_scaled = p_cp_rated_scaled
+        self.at_home = at_home
+        self.time_position = time_position
+        self.vectorised = vectorised
 
     def simulate(self) -> list[ElectricVehicle]:
+        if self.vectorised:
+            return self._simulate_arrays()
+        return self._simulate_loop()
+
+    def _simulate_arrays(self) -> list[ElectricVehicle]:
+        p_ev, soc_ev = simulate_arrays(
+            at_home=self.at_home,
+            arrival_energy=get_arrival_energy(self.ev_data, self.time_position, self.at_home.shape),
+            household_load=self.household_load.reindex(params.timestamps).iloc[:, 0].to_numpy(),
+            num_ev_at_home=self.num_ev_at_home.reindex(params.timestamps).iloc[:, 0].to_numpy(),
+            soc_init=np.array([ev.soc_init for ev in self.ev_data]),
+            soc_max=np.array([ev.soc_max for ev in self.ev_data]),
+            p_cp_rated_scaled=self.p_cp_rated_scaled
+        )
+
+        # Assign charging power and soc arrays to dataframes in EV object
+        for i, ev in enumerate(self.ev_data):
+            ev.charging_power['charging_power'] = p_ev[i]
+            ev.soc['soc'] = soc_ev[i]
+
+        return self.ev_data
+
+    def _simulate_loop(self) -> list[ElectricVehicle]:
         for i, ev in enumerate(self.ev_data):
             # Initialise charging power and soc empty list
             p_ev = []
@@ -25,7 +111,7 @@ class UncoordinatedModelConfig1:
                     # Assign initial charging power and soc
                     p_ev.append(0)
                     soc_ev.append(ev.soc_init)
-                elif (self._is_at_home(ev, t)) and (t.time() not in params.no_charging_time):
+                elif (self._is_at_home(i, t)) and (t.time() not in params.no_charging_time):
                     # EV is at home: calculate charging power and soc
                     available_power_at_cp = self._get_available_power_per_cp(t)
                     p, soc = self._compute_power_and_soc(i, ev, t, soc_ev[-1], available_power_at_cp)
@@ -52,9 +138,8 @@ class UncoordinatedModelConfig1:
 
         return (ccp_capacity / evs_at_home) if evs_at_home > 1 else ccp_capacity
 
-    @staticmethod
-    def _is_at_home(ev, t):
-        return ev.at_home_status.loc[t].values == 1
+    def _is_at_home(self, ev_id, t):
+        return self.at_home[ev_id, self.time_position[t]] == 1
 
     def _compute_power_and_soc(self, i, ev, t, prev_soc, available_power_at_cp):
         available_power = min(available_power_at_cp, self.p_cp_rated_scaled)
@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from collections import deque
 from src.config import params
 from src.data_processing.electric_vehicle import ElectricVehicle
+from src.models.simulation_models.event_engine import simulate_charging_events
 
 
 class ChargingPointSlot:
@@ -25,9 +27,12 @@ class ChargingPointSlot:
 
 
 class UncoordinatedModelConfig2:
-    def __init__(self, ev_data: list, household_load: pd.DataFrame, p_cp_rated_scaled: float, num_cp: int):
+    def __init__(self, ev_data: list, household_load: pd.DataFrame, p_cp_rated_scaled: float, num_cp: int,
+                 at_home: np.ndarray, time_position: dict, event_driven: bool = True):
         self.ev_data = ev_data
         self.household_load = household_load
+        self.at_home = at_home
+        self.time_position = time_position
         self.p_cp_rated_scaled = p_cp_rated_scaled
         self.num_cp = num_cp
 
@@ -39,8 +44,26 @@ class UncoordinatedModelConfig2:
         self.charging_queue = deque()
         self.ev_to_cp = {}
         self.delta_t = pd.Timedelta(minutes=params.time_resolution)
+        self.event_driven = event_driven
 
     def simulate(self) -> list[ElectricVehicle]:
+        if self.event_driven:
+            return self._simulate_events()
+        return self._simulate_time_steps()
+
+    def _simulate_events(self) -> list[ElectricVehicle]:
+        # All EVs share one queue for all CPs
+        return simulate_charging_events(
+            ev_data=self.ev_data,
+            groups=[(list(range(self.num_ev)), [cp.cp_id for cp in self.charging_points])],
+            household_load=self.household_load,
+            p_cp_rated_scaled=self.p_cp_rated_scaled,
+            num_cp=self.num_cp,
+            at_home=self.at_home,
+            time_position=self.time_position
+        )
+
+    def _simulate_time_steps(self) -> list[ElectricVehicle]:
         for t in params.timestamps:
             if t == params.start_date_time:
                 self._initialise_soc(t)
@@ -75,10 +98,7 @@ class UncoordinatedModelConfig2:
         return prev_soc, soc_max
 
     def _is_at_home(self, ev_id, t):
-        # Create dataframe for merged EV at home status
-        merged_ev_at_home_status = pd.concat([ev.at_home_status for ev in self.ev_data], axis=1)
-
-        return merged_ev_at_home_status[f'EV_ID{ev_id}'].loc[t] == 1
+        return self.at_home[ev_id, self.time_position[t]] == 1
 
     def _update_charging_queue(self, t):
         # Check if EVs in the idle list need to be added to the charging queue
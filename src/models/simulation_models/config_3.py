@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import copy
@@ -5,6 +6,7 @@ from collections import deque, defaultdict
 from src.config import params
 from src.models.simulation_models.config_2 import ChargingPointSlot
 from src.data_processing.electric_vehicle import ElectricVehicle
+from src.models.simulation_models.event_engine import simulate_charging_events
 
 
 class UncoordinatedModelConfig3:
@@ -12,10 +14,15 @@ class UncoordinatedModelConfig3:
                  ev_data: list,
                  household_load: pd.DataFrame,
                  p_cp_rated_scaled: float,
-                 ev_to_cp_assignment: dict[int, list]  # keys: cp_id, values: list of ev_id
+                 ev_to_cp_assignment: dict[int, list],  # keys: cp_id, values: list of ev_id
+                 at_home: np.ndarray,
+                 time_position: dict,
+                 event_driven: bool = True
                  ):
         self.ev_data = ev_data
         self.household_load = household_load
+        self.at_home = at_home
+        self.time_position = time_position
         self.p_cp_rated_scaled = p_cp_rated_scaled
         self.ev_to_cp_assignment = ev_to_cp_assignment
 
@@ -28,8 +35,26 @@ class UncoordinatedModelConfig3:
         self.is_charging: defaultdict[int, list[int]] = defaultdict(list)
         self.charging_queue: defaultdict[int, deque[int]] = defaultdict(deque)
         self.delta_t = pd.Timedelta(minutes=params.time_resolution)
+        self.event_driven = event_driven
 
     def simulate(self) -> list[ElectricVehicle]:
+        if self.event_driven:
+            return self._simulate_events()
+        return self._simulate_time_steps()
+
+    def _simulate_events(self) -> list[ElectricVehicle]:
+        # Each CP has its own queue of the EVs assigned to it
+        return simulate_charging_events(
+            ev_data=self.ev_data,
+            groups=[(ev_ids, [cp_id]) for cp_id, ev_ids in self.ev_to_cp_assignment.items()],
+            household_load=self.household_load,
+            p_cp_rated_scaled=self.p_cp_rated_scaled,
+            num_cp=self.num_cp,
+            at_home=self.at_home,
+            time_position=self.time_position
+        )
+
+    def _simulate_time_steps(self) -> list[ElectricVehicle]:
         for t in params.timestamps:
             if t == params.start_date_time:
                 self._initialise_soc(t)
@@ -67,10 +92,7 @@ class UncoordinatedModelConfig3:
         return prev_soc, soc_max
 
     def _is_at_home(self, ev_id, t):
-        # Create dataframe for merged EV at home status
-        merged_ev_at_home_status = pd.concat([ev.at_home_status for ev in self.ev_data], axis=1)
-
-        return merged_ev_at_home_status[f'EV_ID{ev_id}'].loc[t] == 1
+        return self.at_home[ev_id, self.time_position[t]] == 1
 
     def _update_charging_queue(self, cp_id, t):
         # Check if EVs in the idle list need to be added to the charging queue
@@ -0,0 +1,205 @@
+import os
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from src.config import params
+from src.config.ev_params import EVData, load_ev_data
+from src.models.simulation_models.simulation_model import simulate_uncoordinated_model, get_trajectory_arrays
+from src.models.utils.log_model_info import print_runtime
+
+
+# EV data of each fleet, set once in each worker process
+_fleets = {}
+
+DESIGN_SWEEP_COLUMNS = [
+    'fleet',
+    'config',
+    'num_of_evs',
+    'num_cp',
+    'p_cp_rated',
+    'investment_cost',
+    'p_peak_increase',
+    'papr',
+    'avg_soc_t_dep_percent',
+    'avg_soc_to_max_deviation',
+    'soc_range',
+    'lowest_soc',
+    'avg_num_charging_days',
+    'simulation_time',
+]
+
+
+def _initialise_worker(fleets: dict[str, EVData]):
+    _fleets.update(fleets)
+
+
+def load_fleets(fleet_sizes: list[int]) -> dict[str, EVData]:
+    """ Returns the EV data of the first num_of_evs EV instances for each fleet size. """
+    original_num_of_evs = params.num_of_evs
+
+    fleets = {}
+    try:
+        for num_of_evs in fleet_sizes:
+            params.num_of_evs = num_of_evs
+            fleets[f'{num_of_evs}EVs'] = load_ev_data()
+
+    finally:
+        params.num_of_evs = original_num_of_evs
+
+    return fleets
+
+
+def get_round_robin_assignment(ev_ids: list, num_cp: int) -> dict[int, list]:
+    """ Assigns the EVs to the CPs in turn, so no CP has more than one EV more than another. """
+    return {cp_id: [i for n, i in enumerate(ev_ids) if n % num_cp == cp_id] for cp_id in range(num_cp)}
+
+
+def get_design_grid(
+        config: str,
+        ev_data: EVData,
+        p_cp_rated_options: list[float] | None = None,
+        num_cp_options: list[int] | None = None) -> list[dict[str, int | float | dict[int, list]]]:
+    """
+    Returns the config attributes of every (CP rated power, number of CPs) design. Config 1 has one CP per EV, and
+    the EVs of config 3 are assigned to the CPs in turn.
+    """
+    ev_ids = list(ev_data.ev_position)
+    p_cp_rated_options = p_cp_rated_options or params.p_cp_rated_options
+
+    if config == 'config_1':
+        num_cp_options = [len(ev_ids)]
+    else:
+        num_cp_options = num_cp_options or range(params.num_cp_min, len(ev_ids))
+
+    return [
+        {
+            'p_cp_rated': p_cp_rated,
+            'num_cp': num_cp,
+            'ev_to_cp_assignment': get_round_robin_assignment(ev_ids, num_cp) if config == 'config_3' else None
+        }
+        for p_cp_rated, num_cp in itertools.product(p_cp_rated_options, num_cp_options)
+    ]
+
+
+def get_design_metrics(
+        p_ev: np.ndarray,
+        soc_ev: np.ndarray,
+        config_attribute: dict[str, int | float | dict[int, list]],
+        ev_data: EVData) -> dict[str, float]:
+    """ Returns the EvaluationMetrics of an uncoordinated design from its (EV, TIME) charging power and soc arrays. """
+    household_load = params.household_load.reindex(params.timestamps).iloc[:, 0].to_numpy()
+    p_grid = household_load + p_ev.sum(axis=0)
+    p_cp_rated_scaled = config_attribute['p_cp_rated'] / params.charging_power_resolution_factor
+
+    # DSO metrics
+    household_peak = round(household_load.max(), 4)
+    agg_demand_peak = round(p_grid.max(), 4)
+    avg_agg_demand = round(p_grid.mean(), 4)
+
+    # EV user metrics, SOC at departure times as a percentage of soc_max
+    soc_t_dep_percent = np.concatenate([
+        soc_ev[n, [ev_data.time_position[t] for t in ev_data.t_dep_dict[i]]] / ev_data.soc_max_dict[i] * 100
+        for i, n in ev_data.ev_position.items()
+    ])
+    avg_soc_t_dep_percent = round(soc_t_dep_percent.mean(), 4)
+
+    # Charging days of each EV per week
+    is_charging_day = {
+        d: (p_ev[:, [ev_data.time_position[t] for t in times]] > 0).any(axis=1) for d, times in params.T_d.items()
+    }
+    num_charging_days = sum(is_charging_day[d] for days in params.D_w.values() for d in days)
+
+    return {
+        'investment_cost': config_attribute['num_cp'] * params.investment_cost[p_cp_rated_scaled],
+        'p_peak_increase': round(float((agg_demand_peak - household_peak) / household_peak), 4) * 100,
+        'papr': round(agg_demand_peak / avg_agg_demand, 4),
+        'avg_soc_t_dep_percent': avg_soc_t_dep_percent,
+        'avg_soc_to_max_deviation': 100 - avg_soc_t_dep_percent,
+        'soc_range': soc_t_dep_percent.max() - soc_t_dep_percent.min(),
+        'lowest_soc': soc_t_dep_percent.min(),
+        'avg_num_charging_days': num_charging_days.sum() / (len(ev_data.ev_position) * len(params.D_w)),
+    }
+
+
+def _simulate_design(design: tuple[str, str, dict]) -> dict:
+    fleet, config, config_attribute = design
+    ev_data = _fleets[fleet]
+
+    # The simulators take the number of EVs from params
+    original_num_of_evs = params.num_of_evs
+    params.num_of_evs = len(ev_data.ev_instance_list)
+
+    start_time = time.time()
+    try:
+        ev_instances = simulate_uncoordinated_model(config, config_attribute, ev_data)
+        p_ev, soc_ev = get_trajectory_arrays(ev_instances)
+        metrics = get_design_metrics(p_ev, soc_ev, config_attribute, ev_data)
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during the {fleet} {config} design simulation: {e}.{params.RESET}')
+        metrics = {}
+
+    finally:
+        params.num_of_evs = original_num_of_evs
+
+    return {
+        'fleet': fleet,
+        'config': config,
+        'num_of_evs': len(ev_data.ev_instance_list),
+        'num_cp': config_attribute['num_cp'],
+        'p_cp_rated': config_attribute['p_cp_rated'],
+        **metrics,
+        'simulation_time': time.time() - start_time,
+    }
+
+
+def get_design_sweep_path(version: str) -> str:
+    filename = f'design_sweep_uncoordinated_{params.num_of_days}days_{version}.csv'
+    return os.path.join(params.compiled_metrics_folder_path, filename)
+
+
+def run_design_sweep(
+        configurations: list[str],
+        version: str,
+        fleets: dict[str, EVData] | None = None,
+        p_cp_rated_options: list[float] | None = None,
+        num_cp_options: list[int] | None = None,
+        num_workers: int | None = None,
+        save_metrics: bool = True) -> pd.DataFrame:
+    """
+    Simulates the uncoordinated model of every (fleet, config, CP rated power, number of CPs) design in a process
+    pool, with the EV data of the fleets shared once per worker. Returns a table of the metrics of each design.
+    """
+    fleets = fleets or {f'{params.num_of_evs}EVs': load_ev_data()}
+    designs = [
+        (fleet, config, config_attribute)
+        for fleet, ev_data in fleets.items()
+        for config in configurations
+        for config_attribute in get_design_grid(config, ev_data, p_cp_rated_options, num_cp_options)
+    ]
+    num_workers = num_workers or min(len(designs), os.cpu_count())
+
+    start_time = time.time()
+    if num_workers == 1:
+        _initialise_worker(fleets)
+        rows = [_simulate_design(design) for design in designs]
+
+    else:
+        with ProcessPoolExecutor(
+                max_workers=num_workers,
+                initializer=_initialise_worker,
+                initargs=(fleets,)) as executor:
+            rows = list(executor.map(_simulate_design, designs))
+
+    print_runtime(f'{len(designs)} designs simulated', time.time() - start_time)
+
+    df = pd.DataFrame(rows, columns=DESIGN_SWEEP_COLUMNS)
+
+    if save_metrics:
+        file_path = get_design_sweep_path(version)
+        df.to_csv(file_path, index=False)
+        print(f'Design sweep metrics saved to: \n{file_path}')
+
+    return df
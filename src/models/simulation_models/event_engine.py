@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import bisect
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from src.config import params
+
+
+# Order of the steps within a time step, as in the time step simulators
+JOIN, LEAVE_QUEUE, DISCONNECT = range(3)
+
+
+class ChargingEventEngine:
+    """
+    Discrete event simulation of EVs queueing for a group of CPs that share the CCP capacity evenly.
+    EVs join the queue when they are at home below soc_max and leave it at departure. The queue is a heap ordered by
+    next departure, then SOC ratio, and free CPs are taken in CP ID order outside no_charging_time. Connected EVs are
+    disconnected at departure, at soc_max or after max_charging_duration, and the next EV in the queue takes the CP.
+
+    Only arrival, departure, disconnection and charge complete events and the connected EVs are handled at each time
+    step, and every queue operation is O(log n). The results are identical to the time step simulators, which read
+    the SOC ratio of the queue order before the SOC of the time step is simulated, so it is the value of the input SOC
+    frames when the EV joins the queue.
+    """
+    def __init__(self,
+                 ev_data: list,
+                 ev_ids: list[int],
+                 cp_ids: list[int],
+                 household_load: np.ndarray,
+                 p_cp_rated_scaled: float,
+                 num_cp: int,
+                 at_home: np.ndarray,
+                 time_position: dict):
+        self.ev_data = ev_data
+        self.ev_ids = ev_ids
+        self.cp_ids = cp_ids
+        self.at_home = at_home
+        self.time_position = time_position
+        self.timestamps = list(params.timestamps)
+
+        # Maximum charging power per CP at each time step
+        self.available_power = [
+            min((params.P_grid_max - load) / num_cp, p_cp_rated_scaled) for load in household_load.tolist()
+        ]
+        self.can_charge = [t.time() not in params.no_charging_time for t in self.timestamps]
+
+        delta_t = pd.Timedelta(minutes=params.time_resolution)
+        self.max_charging_steps = -(-params.max_charging_duration // delta_t)
+
+        # Time steps an idle EV can join the queue from: when it comes home, and after its SOC drops at arrival
+        self.arrivals = defaultdict(list)  # {time step: [(ev_id, travel energy), ...]}
+        self.join_checks = {}
+        self.departures = {}
+        for i in ev_ids:
+            ev = self.ev_data[i]
+            row = self.at_home[i]
+            rising_edges = (np.flatnonzero((row[1:] == 1) & (row[:-1] != 1)) + 1).tolist()
+
+            arrival_steps = []
+            for k, t in enumerate(ev.t_arr):
+                # The first trip arriving at a time is the one subtracted
+                if t in self.time_position and ev.t_arr.index(t) == k:
+                    self.arrivals[self.time_position[t]].append((i, ev.travel_energy[k]))
+                    arrival_steps.append(self.time_position[t] + 1)
+
+            self.join_checks[i] = sorted(set(rising_edges + arrival_steps))
+            self.departures[i] = sorted(ev.t_dep)
+
+        self.events = []  # heap of (time step, step order, sequence, EV ID, token)
+        self.sequence = itertools.count()
+
+    def _push_event(self, k: int, order: int, ev_id: int, token=None):
+        if k < len(self.timestamps):
+            heapq.heappush(self.events, (k, order, next(self.sequence), ev_id, token))
+
+    def _next_departure(self, ev_id: int, t) -> pd.Timestamp:
+        departures = self.departures[ev_id]
+        n = bisect.bisect_right(departures, t)
+        return departures[n] if n < len(departures) else max(self.timestamps)
+
+    def _departure_step(self, ev_id: int, t) -> int | None:
+        """ Returns the time step of the first departure after t, or None if there is none in the horizon. """
+        departures = self.departures[ev_id]
+        n = bisect.bisect_right(departures, t)
+        return self.time_position.get(departures[n]) if n < len(departures) else None
+
+    def _next_join_check(self, ev_id: int, k: int):
+        checks = self.join_checks[ev_id]
+        n = bisect.bisect_right(checks, k)
+        if n < len(checks):
+            self._push_event(checks[n], JOIN, ev_id)
+
+    def _set_idle(self, ev_id: int, k: int):
+        self.idle[ev_id] = next(self.idle_order)
+        self._push_event(k + 1, JOIN, ev_id)
+
+    def _join_queue(self, ev_id: int, k: int):
+        t = self.timestamps[k]
+        next_departure = self._next_departure(ev_id, t)
+        priority = self.input_soc[ev_id][k] / self.ev_data[ev_id].soc_max
+        key = (next_departure, priority, next(self.queue_order))
+
+        del self.idle[ev_id]
+        self.queued[ev_id] = key
+        heapq.heappush(self.queue, (*key, ev_id))
+
+        # EVs leave the queue at their next departure time step
+        departure_step = self._departure_step(ev_id, self.timestamps[k - 1])
+        if departure_step is not None:
+            self._push_event(departure_step, LEAVE_QUEUE, ev_id, key)
+
+    def _pop_queue(self) -> int | None:
+        while self.queue:
+            *key, ev_id = heapq.heappop(self.queue)
+            if self.queued.get(ev_id) == tuple(key):
+                del self.queued[ev_id]
+                return ev_id
+        return None
+
+    def _connect(self, ev_id: int, cp_id: int, k: int):
+        connection = next(self.connection_order)
+        self.connected[ev_id] = (connection, cp_id)
+
+        # Disconnect at the next departure, unless it is the last time step, or after max_charging_duration
+        departure_step = self._departure_step(ev_id, self.timestamps[k])
+        if departure_step is not None and departure_step != len(self.timestamps) - 1:
+            self._push_event(departure_step, DISCONNECT, ev_id, connection)
+        self._push_event(k + self.max_charging_steps, DISCONNECT, ev_id, connection)
+
+    def simulate(self, p_ev: np.ndarray, soc_ev: np.ndarray):
+        """ Writes the charging power and soc of the EVs to their rows of p_ev and soc_ev. """
+        num_times = len(self.timestamps)
+        p_ev[self.ev_ids] = 0
+        self.input_soc = {i: self.ev_data[i].soc['soc'].reindex(self.timestamps).tolist() for i in self.ev_ids}
+
+        self.idle = {}  # {ev_id: position in the idle list}
+        self.idle_order = itertools.count()
+        self.queue = []  # heap of (next departure, soc ratio, queue order, ev_id)
+        self.queued = {}  # {ev_id: queue key}, EVs popped or removed from the queue are skipped in the heap
+        self.queue_order = itertools.count()
+        self.connected = {}  # {ev_id: (connection order, cp_id)}
+        self.connection_order = itertools.count()
+        self.free_cps = list(self.cp_ids)
+        heapq.heapify(self.free_cps)
+
+        soc = {i: self.ev_data[i].soc_init for i in self.ev_ids}
+        soc_changes = np.full(soc_ev.shape, np.nan)
+        for i in self.ev_ids:
+            soc_changes[i, 0] = soc[i]
+            self._set_idle(i, 0)
+
+        for k in range(1, num_times):
+            events = defaultdict(list)
+            while self.events and self.events[0][0] == k:
+                _, order, _, ev_id, token = heapq.heappop(self.events)
+                events[order].append((ev_id, token))
+
+            # Idle EVs at home below soc_max join the queue, in idle list order
+            joining = []
+            for ev_id in dict.fromkeys(ev_id for ev_id, _ in events[JOIN]):
+                if ev_id not in self.idle:
+                    continue
+                if self.at_home[ev_id, k] == 1 and soc[ev_id] < self.ev_data[ev_id].soc_max:
+                    joining.append(ev_id)
+                else:
+                    self._next_join_check(ev_id, k)
+
+            joined = set()
+            for ev_id in sorted(joining, key=self.idle.get):
+                self._join_queue(ev_id, k)
+                joined.add(ev_id)
+
+            # EVs leave the queue at departure, EVs joined earlier first in queue order
+            leaving = [ev_id for ev_id, key in events[LEAVE_QUEUE] if self.queued.get(ev_id) == key]
+            for ev_id in sorted(leaving, key=lambda i: (i in joined, self.queued[i])):
+                del self.queued[ev_id]
+                self._set_idle(ev_id, k)
+
+            # Connect EVs to free CPs
+            if self.can_charge[k]:
+                while self.free_cps and self.queued:
+                    ev_id = self._pop_queue()
+                    self._connect(ev_id, heapq.heappop(self.free_cps), k)
+
+            # Disconnect EVs in connection order, the next EV in the queue takes the CP
+            disconnecting = {
+                ev_id for ev_id, connection in events[DISCONNECT]
+                if self.connected.get(ev_id, (None,))[0] == connection
+            }
+            for ev_id in sorted(disconnecting, key=lambda i: self.connected[i][0]):
+                _, cp_id = self.connected.pop(ev_id)
+                self._set_idle(ev_id, k)
+
+                next_ev_in_queue = self._pop_queue() if self.queued else None
+                if next_ev_in_queue is not None:
+                    self._connect(next_ev_in_queue, cp_id, k)
+                else:
+                    heapq.heappush(self.free_cps, cp_id)
+
+            # Subtract travel energy at arrival time
+            prev_soc = {}
+            for ev_id, travel_energy in self.arrivals.get(k, []):
+                prev_soc[ev_id] = soc[ev_id] - travel_energy
+                if ev_id not in self.connected:
+                    soc[ev_id] = prev_soc[ev_id]
+                    soc_changes[ev_id, k] = soc[ev_id]
+
+            # Charge the connected EVs with the available power, up to soc_max
+            available_power = self.available_power[k]
+            for ev_id, (connection, _) in self.connected.items():
+                soc_max = self.ev_data[ev_id].soc_max
+                ev_prev_soc = prev_soc.get(ev_id, soc[ev_id])
+                potential_soc = ev_prev_soc + available_power
+
+                if potential_soc > soc_max:
+                    p_ev[ev_id, k] = soc_max - ev_prev_soc
+                    soc[ev_id] = soc_max
+                else:
+                    p_ev[ev_id, k] = available_power
+                    soc[ev_id] = potential_soc
+                soc_changes[ev_id, k] = soc[ev_id]
+
+                # EVs at soc_max are disconnected at the next time step
+                if soc[ev_id] == soc_max:
+                    self._push_event(k + 1, DISCONNECT, ev_id, connection)
+
+        # SOC is carried over between changes
+        rows = self.ev_ids
+        soc_ev[rows] = pd.DataFrame(soc_changes[rows].T).ffill().to_numpy().T
+
+
+def simulate_charging_events(
+        ev_data: list,
+        groups: list[tuple[list[int], list[int]]],
+        household_load: pd.DataFrame,
+        p_cp_rated_scaled: float,
+        num_cp: int,
+        at_home: np.ndarray,
+        time_position: dict) -> list:
+    """
+    Simulates each (EV IDs, CP IDs) group with its own queue in a ChargingEventEngine. EVs in no group only have their
+    initial soc set.
+    """
+    household_load = household_load.reindex(params.timestamps).iloc[:, 0].to_numpy()
+    p_ev = np.vstack([ev.charging_power['charging_power'].to_numpy(dtype=float) for ev in ev_data])
+    soc_ev = np.vstack([ev.soc['soc'].to_numpy(dtype=float) for ev in ev_data])
+
+    # Initial charging power and soc
+    p_ev[:, 0] = 0
+    soc_ev[:, 0] = [ev.soc_init for ev in ev_data]
+
+    for ev_ids, cp_ids in groups:
+        engine = ChargingEventEngine(
+            ev_data=ev_data,
+            ev_ids=ev_ids,
+            cp_ids=cp_ids,
+            household_load=household_load,
+            p_cp_rated_scaled=p_cp_rated_scaled,
+            num_cp=num_cp,
+            at_home=at_home,
+            time_position=time_position
+        )
+        engine.simulate(p_ev, soc_ev)
+
+    # Assign charging power and soc arrays to dataframes in EV object
+    for i, ev in enumerate(ev_data):
+        ev.charging_power['charging_power'] = p_ev[i]
+        ev.soc['soc'] = soc_ev[i]
+
+    return ev_data
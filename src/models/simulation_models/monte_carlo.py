@@ -0,0 +1,191 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from copy import deepcopy
+from scipy import stats
+from alive_progress import alive_bar
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.config import params
+from src.config.ev_params import EVData, build_ev_data, get_ev_instances_path, load_ev_instance_pool
+from src.models.simulation_models.design_sweep import get_design_grid, get_design_metrics
+from src.models.simulation_models.simulation_model import simulate_uncoordinated_model, get_trajectory_arrays
+from src.models.utils.log_model_info import print_runtime
+
+
+# EV instance pool and simulation settings, set once in each worker process
+_monte_carlo_settings = {}
+
+METRICS = [
+    'investment_cost',
+    'p_peak_increase',
+    'papr',
+    'avg_soc_t_dep_percent',
+    'avg_soc_to_max_deviation',
+    'soc_range',
+    'lowest_soc',
+    'avg_num_charging_days',
+]
+
+
+def _initialise_worker(settings: dict):
+    _monte_carlo_settings.update(settings)
+
+
+def get_fleet_sample(sample_id: int, num_of_evs: int, pool_size: int, seed: int = 0) -> list[int]:
+    """
+    Returns the positions in the EV instance pool of a random fleet, drawn without replacement. Each sample is seeded
+    by (seed, sample_id), so a sample is the same however many samples are drawn, and runs with different seeds draw
+    independent fleets.
+    """
+    rng = np.random.default_rng([seed, sample_id])
+    return sorted(rng.choice(pool_size, size=num_of_evs, replace=False).tolist())
+
+
+def get_sample_ev_data(ev_instance_pool: list, pool_positions: list[int]) -> EVData:
+    # The simulators and metrics use EV IDs 0 to num_of_evs - 1
+    ev_instance_list = deepcopy([ev_instance_pool[n] for n in pool_positions])
+    for ev_id, ev in enumerate(ev_instance_list):
+        ev.ev_id = ev_id
+
+    return build_ev_data(ev_instance_list, get_ev_instances_path())
+
+
+def _simulate_sample(sample: tuple[int, list[int]]) -> dict:
+    settings = _monte_carlo_settings
+    sample_id, pool_positions = sample
+
+    # The simulators take the number of EVs from params
+    params.num_of_evs = len(pool_positions)
+
+    start_time = time.time()
+    try:
+        ev_data = get_sample_ev_data(settings['ev_instance_pool'], pool_positions)
+        config_attribute = get_design_grid(
+            settings['config'], ev_data, [settings['p_cp_rated']], [settings['num_cp']]
+        )[0]
+
+        ev_instances = simulate_uncoordinated_model(settings['config'], config_attribute, ev_data)
+        p_ev, soc_ev = get_trajectory_arrays(ev_instances)
+        metrics = get_design_metrics(p_ev, soc_ev, config_attribute, ev_data)
+
+    except Exception as e:
+        print(f'{params.RED}An error occurred during the simulation of sample {sample_id}: {e}.{params.RESET}')
+        metrics = {}
+
+    return {
+        'sample_id': sample_id,
+        'ev_instances': ' '.join(str(n) for n in pool_positions),
+        **metrics,
+        'simulation_time': time.time() - start_time,
+    }
+
+
+def get_monte_carlo_path(
+        config: str,
+        version: str,
+        num_of_evs: int,
+        p_cp_rated: float,
+        num_cp: int,
+        seed: int) -> str:
+    filename = (f'monte_carlo_{config}_uncoordinated_{num_of_evs}EVs_{num_cp}CPs_{p_cp_rated:.2f}kW_'
+                f'{params.num_of_days}days_seed{seed}_{version}.csv')
+    return os.path.join(params.compiled_metrics_folder_path, filename)
+
+
+def get_confidence_intervals(samples: pd.DataFrame, confidence: float = 0.95) -> pd.DataFrame:
+    """ Returns the mean, standard deviation and Student's t confidence interval of the mean of each metric. """
+    samples = samples[METRICS].dropna()
+    num_samples = len(samples)
+
+    mean = samples.mean()
+    std = samples.std()
+    half_width = (
+        stats.t.ppf((1 + confidence) / 2, num_samples - 1) * std / np.sqrt(num_samples)
+        if num_samples > 1 else np.nan
+    )
+
+    return pd.DataFrame({
+        'mean': mean,
+        'std': std,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'num_samples': num_samples,
+    })
+
+
+def run_monte_carlo_simulation(
+        config: str,
+        version: str,
+        num_samples: int,
+        p_cp_rated: float,
+        num_cp: int | None = None,
+        num_of_evs: int | None = None,
+        seed: int = 0,
+        confidence: float = 0.95,
+        num_workers: int | None = None) -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """
+    Simulates the uncoordinated model of num_samples random fleets of num_of_evs EVs drawn from the EV instance
+    pool, in a process pool. Each sample is appended to the results CSV as it finishes, and samples already in the
+    CSV are skipped, so an interrupted run resumes where it stopped.
+    Returns the metrics of every sample and their confidence intervals.
+    """
+    num_of_evs = num_of_evs or params.num_of_evs
+    num_cp = num_of_evs if config == 'config_1' else num_cp or params.num_cp_min
+    ev_instance_pool = load_ev_instance_pool()
+
+    if num_of_evs > len(ev_instance_pool):
+        raise ValueError(f'Fleets of {num_of_evs} EVs cannot be drawn from {len(ev_instance_pool)} EV instances.')
+
+    # Samples finished in an earlier run
+    file_path = get_monte_carlo_path(config, version, num_of_evs, p_cp_rated, num_cp, seed)
+    finished = set(pd.read_csv(file_path)['sample_id']) if os.path.exists(file_path) else set()
+    finished &= set(range(num_samples))
+
+    samples = [
+        (sample_id, get_fleet_sample(sample_id, num_of_evs, len(ev_instance_pool), seed))
+        for sample_id in range(num_samples) if sample_id not in finished
+    ]
+
+    monte_carlo_settings = {
+        'ev_instance_pool': ev_instance_pool,
+        'config': config,
+        'p_cp_rated': p_cp_rated,
+        'num_cp': num_cp,
+    }
+
+    start_time = time.time()
+    with alive_bar(num_samples, title=f'{config} Monte Carlo samples') as bar:
+        bar(len(finished), skipped=True)
+
+        if samples:
+            with ProcessPoolExecutor(
+                    max_workers=num_workers or min(len(samples), os.cpu_count()),
+                    initializer=_initialise_worker,
+                    initargs=(monte_carlo_settings,)) as executor:
+
+                futures = [executor.submit(_simulate_sample, sample) for sample in samples]
+                for future in as_completed(futures):
+                    # Stream each sample to the CSV, failed samples are simulated again when the run is resumed
+                    row = future.result()
+                    if 'papr' in row:
+                        pd.DataFrame([row]).to_csv(
+                            file_path, mode='a', header=not os.path.exists(file_path), index=False
+                        )
+                    bar()
+
+    print_runtime(f'{len(samples)} samples simulated', time.time() - start_time)
+
+    if not os.path.exists(file_path):
+        print(f'{params.RED}No sample could be simulated.{params.RESET}')
+        return None
+
+    results = pd.read_csv(file_path)
+    results = results[results['sample_id'] < num_samples].sort_values('sample_id', ignore_index=True)
+    confidence_intervals = get_confidence_intervals(results, confidence)
+
+    print(f'\n{config} uncoordinated metrics over {len(results)} fleets of {num_of_evs} EVs '
+          f'({confidence:.0%} confidence intervals)\n{confidence_intervals}')
+    print(f'Monte Carlo samples saved to: \n{file_path}')
+
+    return results, confidence_intervals
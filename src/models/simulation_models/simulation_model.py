@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
 from copy import deepcopy
 from src.config import params
 from src.config.ev_params import EVData
 from src.models.simulation_models import config_1, config_2, config_3
+from src.models.results.array_views import ArrayView
 from src.data_processing.electric_vehicle import ElectricVehicle
 
 
@@ -24,24 +26,19 @@ def simulate_uncoordinated_model(
         raise ValueError('Demand is higher than the maximum grid capacity.')
 
     # Calculate the total number of EVs at time t
-    num_ev_at_home_list = []
-    for t in params.timestamps:
-        num_ev_at_home = sum(
-            ev.at_home_status.loc[t].values.item() for ev in ev_instances
-        )
-        num_ev_at_home_list.append({
-            'timestamp': t,
-            'num_ev_at_home': num_ev_at_home
-        })
-
-    num_ev_at_home_df = pd.DataFrame(num_ev_at_home_list).set_index('timestamp')
+    num_ev_at_home_df = pd.DataFrame(
+        {'num_ev_at_home': ev_data.at_home.sum(axis=0)},
+        index=pd.Index(params.timestamps, name='timestamp')
+    )
 
     if config == 'config_1':
         config_1_simulator = config_1.UncoordinatedModelConfig1(
             ev_data=ev_instances,
             household_load=household_load,
             num_ev_at_home=num_ev_at_home_df,
-            p_cp_rated_scaled=p_cp_rated_scaled
+            p_cp_rated_scaled=p_cp_rated_scaled,
+            at_home=ev_data.at_home,
+            time_position=ev_data.time_position
         )
         return config_1_simulator.simulate()
 
@@ -51,7 +48,9 @@ def simulate_uncoordinated_model(
                 ev_data=ev_instances,
                 household_load=household_load,
                 p_cp_rated_scaled=p_cp_rated_scaled,
-                num_cp=config_attribute['num_cp']
+                num_cp=config_attribute['num_cp'],
+                at_home=ev_data.at_home,
+                time_position=ev_data.time_position
             )
             return config_2_simulator.simulate()
 
@@ -64,7 +63,9 @@ def simulate_uncoordinated_model(
                 ev_data=ev_instances,
                 household_load=household_load,
                 p_cp_rated_scaled=p_cp_rated_scaled,
-                ev_to_cp_assignment=config_attribute['ev_to_cp_assignment']
+                ev_to_cp_assignment=config_attribute['ev_to_cp_assignment'],
+                at_home=ev_data.at_home,
+                time_position=ev_data.time_position
             )
             return config_3_simulator.simulate()
 
@@ -72,31 +73,33 @@ def simulate_uncoordinated_model(
             raise ValueError('Provide a dictionary of EV to CP assignment for configuration 3 simulation.')
 
 
+def get_trajectory_arrays(model: list[ElectricVehicle]) -> tuple[np.ndarray, np.ndarray]:
+    """ Returns the (EV, TIME) charging power and soc arrays of the simulated EVs. """
+    p_ev = np.vstack([ev.charging_power['charging_power'].reindex(params.timestamps).to_numpy(dtype=float)
+                      for ev in model])
+    soc_ev = np.vstack([ev.soc['soc'].reindex(params.timestamps).to_numpy(dtype=float) for ev in model])
+
+    return p_ev, soc_ev
+
+
 def process_model_results(
         model: list[ElectricVehicle],
         config_attribute: dict[str, int | float | dict[int, list]]) -> dict[str, float | dict]:
-    household_load = params.household_load
+    household_load = params.household_load.reindex(params.timestamps).iloc[:, 0].to_numpy(dtype=float)
     p_cp_rated_scaled = config_attribute['p_cp_rated'] / params.charging_power_resolution_factor
 
+    p_ev, soc_ev = get_trajectory_arrays(model)
+    ev_ids = range(len(model))
+
+    # Results are kept as arrays, read as {t: value} and {(i, t): value} dicts
     all_results = {
-        'p_grid': {},
+        'p_grid': ArrayView(household_load + p_ev.sum(axis=0), params.timestamps),
         'p_cp_rated': p_cp_rated_scaled,
         'num_cp': config_attribute['num_cp'],
-        'p_ev': {},
-        'soc_ev': {},
+        'p_ev': ArrayView(p_ev, ev_ids, params.timestamps),
+        'soc_ev': ArrayView(soc_ev, ev_ids, params.timestamps),
     }
 
-    for i, ev in enumerate(model):
-        for t in params.timestamps:
-            # Extract p_grid
-            all_results['p_grid'][t] = household_load.loc[t].values.item() + sum(e.charging_power.loc[t].values.item() for e in model)
-
-            # Extract charging power
-            all_results['p_ev'][(i, t)] = ev.charging_power.loc[t].values.item()
-
-            # Extract SOC
-            all_results['soc_ev'][(i, t)] = ev.soc.loc[t].values.item()
-
     return all_results
 
 
@@ -23,3 +23,25 @@ class ChargingStrategy(Enum):
         if charging_strategy not in cls:
             allowed_values = [f"{cls.__name__}.{member.name}" for member in cls]  # Format as ChargingMode.DAILY_CHARGE
             raise ValueError(f"Invalid CP configuration: {charging_strategy}. Allowed values: {allowed_values}")
+
+
+class BuildBackend(Enum):
+    RULES = 'rules'
+    ARRAY = 'array'
+
+    @classmethod
+    def validate(cls, backend):
+        if backend not in cls:
+            allowed_values = [f"{cls.__name__}.{member.name}" for member in cls]  # Format as BuildBackend.RULES
+            raise ValueError(f"Invalid build backend: {backend}. Allowed values: {allowed_values}")
+
+
+class SolverInterface(Enum):
+    FILE = 'file'
+    DIRECT = 'direct'
+
+    @classmethod
+    def validate(cls, solver_interface):
+        if solver_interface not in cls:
+            allowed_values = [f"{cls.__name__}.{member.name}" for member in cls]  # Format as SolverInterface.FILE
+            raise ValueError(f"Invalid solver interface: {solver_interface}. Allowed values: {allowed_values}")
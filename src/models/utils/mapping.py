@@ -1,4 +1,4 @@
-from src.models.utils.configs import CPConfig, ChargingStrategy
+from src.models.utils.configs import CPConfig, ChargingStrategy, BuildBackend, SolverInterface
 
 config_map = {
     'config_1': CPConfig.CONFIG_1,
@@ -12,6 +12,16 @@ strategy_map = {
     'flexible': ChargingStrategy.FLEXIBLE
 }
 
+backend_map = {
+    'rules': BuildBackend.RULES,
+    'array': BuildBackend.ARRAY,
+}
+
+solver_interface_map = {
+    'file': SolverInterface.FILE,
+    'direct': SolverInterface.DIRECT,
+}
+
 
 def validate_config_strategy(config: str, charging_strategy: str):
     if config not in config_map or charging_strategy not in strategy_map:
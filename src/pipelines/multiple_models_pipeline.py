@@ -11,7 +11,11 @@ def run_multiple_models(configurations: list,
                         charging_strategies: list,
                         version: str,
                         solver_settings: dict,
-                        obj_weights: dict[str, int|float] | None = None):
+                        obj_weights: dict[str, int|float] | None = None,
+                        warm_start: bool = False,
+                        solver_interface: str = 'file',
+                        model_cache: bool = False,
+                        profile_build: bool = False):
 
     # Check if version is unique
     for config in configurations:
@@ -41,6 +45,11 @@ def run_multiple_models(configurations: list,
             verbose = solver_settings[model_name][2]
             thread_count = solver_settings[model_name][3]
 
+            # Start from the solution of the previous charging strategy for the same config
+            prior_results = next(
+                (result for result in reversed(opt_results_per_config.values()) if result is not None), None
+            )
+
             # Run optimisation model
             opt_result = run_optimisation_model(
                 config=config,
@@ -51,7 +60,11 @@ def run_multiple_models(configurations: list,
                 mip_gap=mip_gap,
                 obj_weights=obj_weights,
                 thread_count=thread_count,
-                ev_data=ev_data
+                ev_data=ev_data,
+                warm_start=prior_results if warm_start else None,
+                solver_interface=solver_interface,
+                model_cache=model_cache and not warm_start,
+                profile_build=profile_build
             )
 
             # Store optimisation model results